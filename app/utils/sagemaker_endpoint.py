@@ -13,6 +13,8 @@ from typing import Dict, Any, Optional
 import asyncio
 import aiohttp
 
+from orchestrator.tools.llm_clients import get_sagemaker_client
+
 logger = logging.getLogger(__name__)
 
 class SageMakerEndpointManager:
@@ -268,18 +270,13 @@ class SageMakerEndpointManager:
                 }
             }
             
-            # Invoke endpoint
+            # Invoke endpoint on the shared SageMaker thread pool (boto3 blocks)
             start_time = datetime.now()
             
-            response = self.runtime_client.invoke_endpoint(
-                EndpointName=endpoint_name,
-                ContentType='application/json',
-                Body=json.dumps(payload)
+            result = await get_sagemaker_client().run_blocking(
+                self._invoke_runtime, endpoint_name, payload
             )
             
-            # Parse response
-            result = json.loads(response['Body'].read().decode())
-            
             inference_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
             return {
@@ -297,6 +294,16 @@ class SageMakerEndpointManager:
                 "endpoint_name": endpoint_name
             }
     
+    def _invoke_runtime(self, endpoint_name: str, payload: Dict[str, Any]) -> Any:
+        """Blocking runtime invocation; run off the event loop"""
+        
+        response = self.runtime_client.invoke_endpoint(
+            EndpointName=endpoint_name,
+            ContentType='application/json',
+            Body=json.dumps(payload)
+        )
+        return json.loads(response['Body'].read().decode())
+    
     def get_endpoint_status(self) -> Dict[str, Any]:
         """Get current endpoint status"""
         
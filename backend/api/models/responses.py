@@ -72,6 +72,9 @@ class QueryResponse(BaseModel):
     errors: List[str] = Field(default_factory=list, description="Non-fatal errors during processing")
     warnings: List[str] = Field(default_factory=list, description="Warning messages")
     
+    # Response cache: "hit", "coalesced", "miss" or "bypass"
+    cache_status: Optional[str] = Field(None, description="How the response cache served this query")
+    
     class Config:
         json_schema_extra = {
             "example": {
@@ -6,17 +6,21 @@ API endpoints for serving video clips and thumbnails with role-based access cont
 """
 
 import os
+import asyncio
 import logging
 from pathlib import Path
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import FileResponse, StreamingResponse
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, status
+from fastapi.responses import StreamingResponse
 from starlette.background import BackgroundTask
 
 from orchestrator.utils.state import UserContext
-from orchestrator.models.clip_models import ClipIndexManager, ClipSearchParams
+from orchestrator.models.clip_models import get_clip_index_manager, ClipSearchParams
 from orchestrator.utils.thumbnail_generator import thumbnail_generator
+from orchestrator.utils.hls_packager import get_hls_packager
 from ..dependencies import get_current_user_context, get_user_context_allow_query
+from ..services.media_streaming import build_file_response, content_etag, IMMUTABLE_CACHE_CONTROL
 from ..models.responses import ClipData
 
 logger = logging.getLogger(__name__)
@@ -26,7 +30,13 @@ router = APIRouter(prefix="/api/v1/clips", tags=["clips"])
 # Initialize clip index manager using absolute path from orchestrator settings
 from orchestrator.config.settings import settings
 clips_base_path = settings.clips_base_path
-clip_index = ClipIndexManager(clips_base_path)
+clip_index = get_clip_index_manager(clips_base_path)
+
+# Thumbnail URLs are not versioned; a week of caching plus content-hash ETags
+THUMBNAIL_CACHE_CONTROL = "private, max-age=604800"
+MAX_SPRITE_CLIPS = 100
+MAX_REEL_CLIPS = 50
+HLS_PLAYLIST_TYPE = "application/vnd.apple.mpegurl"
 
 @router.get("/", response_model=list[ClipData])
 async def list_clips(
@@ -93,26 +103,22 @@ async def list_clips(
             detail="Failed to retrieve clips"
         )
 
-@router.get("/{clip_id}/video")
+@router.api_route("/{clip_id}/video", methods=["GET", "HEAD"])
 async def serve_video(
     clip_id: str,
+    request: Request,
     user_context: UserContext = Depends(get_user_context_allow_query)
 ):
     """
     Serve a video clip file with access control.
     
-    Returns the actual video file for playback.
+    Supports Range requests (206), ETag/Last-Modified revalidation (304)
+    and optional X-Accel-Redirect / X-Sendfile offload.
     """
     
     try:
-        # Find the clip metadata
-        all_clips = clip_index.discover_clips("2024-2025")  # TODO: Make season dynamic
-        clip_metadata = None
-        
-        for clip in all_clips:
-            if clip.clip_id == clip_id:
-                clip_metadata = clip
-                break
+        # Find the clip metadata (indexed catalog lookup)
+        clip_metadata = clip_index.get_clip(clip_id)
         
         if not clip_metadata:
             raise HTTPException(
@@ -141,11 +147,15 @@ async def serve_video(
         
         logger.info(f"Serving video {clip_id} to user {user_context.role.value}")
         
-        # Return video file
-        return FileResponse(
-            path=str(video_path),
+        # Return (partial) video content
+        return build_file_response(
+            request,
+            video_path,
             media_type=content_type,
-            filename=f"{clip_metadata.player_name}_{clip_metadata.event_type}.mp4"
+            filename=f"{clip_metadata.player_name}_{clip_metadata.event_type}{video_path.suffix.lower()}",
+            sendfile_mode=settings.media_sendfile_mode,
+            internal_prefix=settings.media_internal_prefix,
+            internal_root=Path(clips_base_path)
         )
         
     except HTTPException:
@@ -157,26 +167,29 @@ async def serve_video(
             detail="Failed to serve video"
         )
 
-@router.get("/{clip_id}/thumbnail")
+@router.api_route("/{clip_id}/thumbnail", methods=["GET", "HEAD"])
 async def serve_thumbnail(
     clip_id: str,
+    request: Request,
+    size: str = "md",
     user_context: UserContext = Depends(get_user_context_allow_query)
 ):
     """
     Serve a video thumbnail image.
     
-    Returns a thumbnail image for the video clip.
+    Returns a WebP variant (size: sm, md, lg) when the client accepts it,
+    otherwise the JPEG thumbnail.
     """
     
     try:
-        # Find the clip metadata
-        all_clips = clip_index.discover_clips("2024-2025")
-        clip_metadata = None
+        if size not in thumbnail_generator.variant_sizes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown thumbnail size: {size}"
+            )
         
-        for clip in all_clips:
-            if clip.clip_id == clip_id:
-                clip_metadata = clip
-                break
+        # Find the clip metadata (indexed catalog lookup)
+        clip_metadata = clip_index.get_clip(clip_id)
         
         if not clip_metadata:
             raise HTTPException(
@@ -205,12 +218,23 @@ async def serve_thumbnail(
                 detail="Failed to generate thumbnail"
             )
         
-        logger.info(f"Serving thumbnail for clip {clip_id}")
+        # Negotiate WebP vs JPEG
+        image_path, media_type = Path(thumbnail_path), "image/jpeg"
+        if "image/webp" in request.headers.get("accept", ""):
+            variant_path = thumbnail_generator.variant_path(clip_id, size)
+            if variant_path.exists():
+                image_path, media_type = variant_path, "image/webp"
+        
+        logger.debug(f"Serving thumbnail for clip {clip_id}")
         
-        return FileResponse(
-            path=thumbnail_path,
-            media_type="image/jpeg",
-            filename=f"thumb_{clip_id}.jpg"
+        return build_file_response(
+            request,
+            image_path,
+            media_type=media_type,
+            filename=f"thumb_{clip_id}{image_path.suffix}",
+            cache_control=THUMBNAIL_CACHE_CONTROL,
+            etag=content_etag(image_path),
+            vary="Accept"
         )
         
     except HTTPException:
@@ -222,6 +246,311 @@ async def serve_thumbnail(
             detail="Failed to serve thumbnail"
         )
 
+@router.api_route("/{clip_id}/strip", methods=["GET", "HEAD"])
+async def serve_scrub_strip(
+    clip_id: str,
+    request: Request,
+    frames: int = 8,
+    user_context: UserContext = Depends(get_user_context_allow_query)
+):
+    """
+    Serve a hover-scrub strip: evenly spaced frames tiled left to right.
+    
+    Frame width and count are returned in X-Frame-Width / X-Strip-Frames.
+    """
+    
+    try:
+        clip_metadata = clip_index.get_clip(clip_id)
+        
+        if not clip_metadata:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Clip not found"
+            )
+        
+        if not _user_can_access_clip(user_context, clip_metadata):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this clip"
+            )
+        
+        frames = max(2, min(frames, 24))
+        strip_path = await thumbnail_generator.generate_scrub_strip(
+            video_path=clip_metadata.file_path,
+            clip_id=clip_id,
+            duration_seconds=clip_metadata.duration_seconds,
+            frames=frames
+        )
+        
+        if not strip_path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Scrub strip unavailable for this clip"
+            )
+        
+        response = build_file_response(
+            request,
+            Path(strip_path),
+            media_type="image/webp",
+            cache_control=THUMBNAIL_CACHE_CONTROL,
+            etag=content_etag(Path(strip_path))
+        )
+        response.headers["x-strip-frames"] = str(frames)
+        response.headers["x-frame-width"] = str(thumbnail_generator.strip_frame_size[0])
+        return response
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving scrub strip {clip_id}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to serve scrub strip"
+        )
+
+@router.get("/sprites")
+async def get_sprite_sheet(
+    clip_ids: str,
+    size: str = "sm",
+    columns: int = 10,
+    user_context: UserContext = Depends(get_current_user_context)
+):
+    """
+    Build (or reuse) one sprite sheet for a gallery of clips.
+    
+    Query parameters:
+    - clip_ids: Comma-separated clip ids, in gallery order
+    - size: Thumbnail size (sm, md, lg)
+    - columns: Tiles per row
+    
+    Returns the sprite URL plus each clip's tile offset, so a gallery of
+    N clips costs one image request instead of N.
+    """
+    
+    try:
+        if size not in thumbnail_generator.variant_sizes:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown thumbnail size: {size}"
+            )
+        
+        requested = [clip_id for clip_id in clip_ids.split(",") if clip_id][:MAX_SPRITE_CLIPS]
+        clips = []
+        for clip_id in requested:
+            clip_metadata = clip_index.get_clip(clip_id)
+            if clip_metadata and _user_can_access_clip(user_context, clip_metadata):
+                clips.append(clip_metadata)
+        
+        if not clips:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No accessible clips"
+            )
+        
+        # Fill in any missing thumbnails, then pack
+        await thumbnail_generator.pregenerate(clips)
+        manifest = await asyncio.to_thread(
+            thumbnail_generator.build_sprite_sheet,
+            [clip.clip_id for clip in clips],
+            size,
+            max(1, min(columns, 20))
+        )
+        
+        if not manifest:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to build sprite sheet"
+            )
+        
+        manifest.pop("path")
+        manifest["sprite_url"] = f"/api/v1/clips/sprites/{manifest['sprite_id']}.webp"
+        return manifest
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building sprite sheet: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build sprite sheet"
+        )
+
+@router.api_route("/sprites/{sprite_id}.webp", methods=["GET", "HEAD"])
+async def serve_sprite_sheet(
+    sprite_id: str,
+    request: Request,
+    user_context: UserContext = Depends(get_user_context_allow_query)
+):
+    """
+    Serve a sprite sheet image.
+    
+    Sprite ids are content hashes, so responses are cacheable forever.
+    """
+    
+    clip_ids = thumbnail_generator.sprite_clip_ids(sprite_id)
+    if clip_ids is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sprite sheet not found"
+        )
+    
+    if not all(_user_can_access_clip_id(user_context, clip_id) for clip_id in clip_ids):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this sprite sheet"
+        )
+    
+    sprite_path = thumbnail_generator.sprites_dir / f"{sprite_id}.webp"
+    if not sprite_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sprite sheet not found"
+        )
+    
+    return build_file_response(
+        request,
+        sprite_path,
+        media_type="image/webp",
+        cache_control=IMMUTABLE_CACHE_CONTROL,
+        etag=f'"{sprite_id}"'
+    )
+
+@router.get("/reel")
+async def create_clip_reel(
+    clip_ids: str,
+    request: Request,
+    user_context: UserContext = Depends(get_user_context_allow_query)
+):
+    """
+    Build an HLS reel stitching several clips.
+    
+    Query parameters:
+    - clip_ids: Comma-separated clip ids, in playback order
+    
+    The first clip is segmented before returning and the rest in the
+    background; segments are cached per clip file and shared across reels.
+    """
+    
+    try:
+        requested = [clip_id for clip_id in clip_ids.split(",") if clip_id][:MAX_REEL_CLIPS]
+        clips = []
+        for clip_id in requested:
+            clip_metadata = clip_index.get_clip(clip_id)
+            if clip_metadata and _user_can_access_clip(user_context, clip_metadata) and Path(clip_metadata.file_path).exists():
+                clips.append(clip_metadata)
+        
+        if not clips:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No accessible clips"
+            )
+        
+        hls_packager = get_hls_packager()
+        reel = hls_packager.create_reel([
+            {"clip_id": clip.clip_id, "file_path": clip.file_path} for clip in clips
+        ])
+        
+        if not await hls_packager.prepare_reel(reel):
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to package reel"
+            )
+        
+        logger.info(f"Reel {reel['reel_id']} with {len(clips)} clips for user {user_context.role.value}")
+        
+        return {
+            "reel_id": reel["reel_id"],
+            "playlist_url": f"/api/v1/clips/reels/{reel['reel_id']}.m3u8{_token_suffix(request)}",
+            "clip_ids": [clip.clip_id for clip in clips]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating reel: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create reel"
+        )
+
+@router.get("/reels/{reel_id}.m3u8")
+async def serve_reel_playlist(
+    reel_id: str,
+    request: Request,
+    user_context: UserContext = Depends(get_user_context_allow_query)
+):
+    """
+    Serve a reel's HLS media playlist.
+    
+    While clips are still being segmented this is an EVENT playlist that
+    players re-poll; once complete it ends with EXT-X-ENDLIST.
+    """
+    
+    hls_packager = get_hls_packager()
+    reel = hls_packager.get_reel(reel_id)
+    if not reel:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Reel not found"
+        )
+    
+    # Reel ids are shareable; every clip in the reel must be accessible to this user
+    for entry in reel["clips"]:
+        if not _user_can_access_clip_id(user_context, entry["clip_id"]):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied to this reel"
+            )
+    
+    # Resumes background packaging (e.g. after a restart); cached clips return immediately
+    await hls_packager.prepare_reel(reel)
+    
+    token_suffix = _token_suffix(request)
+    playlist, complete = hls_packager.reel_playlist(
+        reel, lambda key, name: f"/api/v1/clips/hls/{key}/{name}{token_suffix}"
+    )
+    
+    return Response(
+        content=playlist,
+        media_type=HLS_PLAYLIST_TYPE,
+        headers={"cache-control": IMMUTABLE_CACHE_CONTROL if complete else "no-cache"}
+    )
+
+@router.api_route("/hls/{package_key}/{segment_name}", methods=["GET", "HEAD"])
+async def serve_hls_segment(
+    package_key: str,
+    segment_name: str,
+    request: Request,
+    user_context: UserContext = Depends(get_user_context_allow_query)
+):
+    """
+    Serve a cached HLS segment.
+    
+    Package keys change with the source file, so segments never go stale.
+    """
+    
+    hls_packager = get_hls_packager()
+    clip_id = hls_packager.clip_id_for_key(package_key)
+    if clip_id and not _user_can_access_clip_id(user_context, clip_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this clip"
+        )
+    
+    segment_path = hls_packager.segment_path(package_key, segment_name) if clip_id else None
+    if not segment_path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Segment not found"
+        )
+    
+    return build_file_response(
+        request,
+        segment_path,
+        media_type="video/mp2t",
+        cache_control=IMMUTABLE_CACHE_CONTROL
+    )
+
 @router.get("/{clip_id}/metadata")
 async def get_clip_metadata(
     clip_id: str,
@@ -234,14 +563,8 @@ async def get_clip_metadata(
     """
     
     try:
-        # Find the clip metadata
-        all_clips = clip_index.discover_clips("2024-2025")
-        clip_metadata = None
-        
-        for clip in all_clips:
-            if clip.clip_id == clip_id:
-                clip_metadata = clip
-                break
+        # Find the clip metadata (indexed catalog lookup)
+        clip_metadata = clip_index.get_clip(clip_id)
         
         if not clip_metadata:
             raise HTTPException(
@@ -267,6 +590,8 @@ async def get_clip_metadata(
             "file_path": clip_metadata.file_path,
             "file_size_mb": clip_metadata.file_size_mb,
             "duration_seconds": clip_metadata.duration_seconds,
+            "resolution": clip_metadata.resolution,
+            "media": _media_info(clip_metadata.file_path),
             "tags": clip_metadata.tags,
             "created_at": clip_metadata.created_at,
             "indexed_at": clip_metadata.indexed_at
@@ -281,6 +606,34 @@ async def get_clip_metadata(
             detail="Failed to get clip metadata"
         )
 
+def _token_suffix(request: Request) -> str:
+    """Carry a ?token= media credential over to URLs inside playlists"""
+    
+    token = request.query_params.get("token")
+    return f"?token={quote(token)}" if token else ""
+
+def _media_info(file_path: str) -> Optional[dict]:
+    """Stored ffprobe fields (codec, bitrate, keyframe interval) for a clip file"""
+    
+    probe = clip_index.catalog.get_probe(file_path)
+    if not probe or probe.get("error"):
+        return None
+    
+    # A probe of an older version of the file is as good as none
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+    if probe["file_mtime_ns"] != file_stat.st_mtime_ns or probe["file_bytes"] != file_stat.st_size:
+        return None
+    return {
+        "codec": probe["codec"],
+        "width": probe["width"],
+        "height": probe["height"],
+        "bitrate": probe["bitrate"],
+        "keyframe_interval": probe["keyframe_interval"]
+    }
+
 def _user_can_access_clip(user_context: UserContext, clip_metadata) -> bool:
     """Check if user has access to a specific clip"""
     
@@ -301,6 +654,12 @@ def _user_can_access_clip(user_context: UserContext, clip_metadata) -> bool:
     
     return False  # Default deny
 
+def _user_can_access_clip_id(user_context: UserContext, clip_id: str) -> bool:
+    """Access check by clip id; clips no longer in the catalog are denied"""
+    
+    clip_metadata = clip_index.get_clip(clip_id)
+    return clip_metadata is not None and _user_can_access_clip(user_context, clip_metadata)
+
 def _get_content_type(file_extension: str) -> str:
     """Get content type for video file"""
     
@@ -45,7 +45,8 @@ async def process_query(
         # Process query through existing orchestrator
         orchestrator_result = await orchestrator.process_query(
             query=request.query,
-            user_context=user_context
+            user_context=user_context,
+            bypass_cache=request.bypass_cache
         )
         
         # Convert orchestrator result to API response format
@@ -90,7 +91,8 @@ async def stream_query(
             # Process query through orchestrator
             result = await orchestrator.process_query(
                 query=request.query,
-                user_context=user_context
+                user_context=user_context,
+                bypass_cache=request.bypass_cache
             )
             
             # Send partial results as they become available
@@ -201,7 +203,8 @@ def _convert_orchestrator_result(
         user_role=user_context.role.value,
         timestamp=datetime.now(),
         errors=orchestrator_result.get("errors", []),
-        warnings=orchestrator_result.get("warnings", [])
+        warnings=orchestrator_result.get("warnings", []),
+        cache_status=orchestrator_result.get("cache_status")
     )
 
 def _extract_all_citations(tool_results: list) -> list:
@@ -0,0 +1,273 @@
+"""
+HeartBeat Engine - Media Streaming Service
+Montreal Canadiens Advanced Analytics Assistant
+
+Byte-range and conditional-GET responses for clip video files.
+Supports 206 Partial Content, ETag/Last-Modified revalidation, ASGI
+zero-copy sends, and X-Accel-Redirect / X-Sendfile offload to a
+fronting web server.
+"""
+
+from typing import Dict, Optional, Tuple
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import quote
+import hashlib
+import logging
+import os
+import stat
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+
+# Long-lived caching for content-addressed or versioned images
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# (path, mtime_ns, size) -> content hash ETag for small image files
+_content_etags: Dict[Tuple[str, int, int], str] = {}
+_CONTENT_ETAG_LIMIT = 4096
+
+
+class FileRangeResponse(Response):
+    """
+    Streams [start, end] of a file.
+
+    Uses the ASGI http.response.zerocopy extension (sendfile) when the
+    server advertises it, otherwise reads chunks in a worker thread.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        start: int,
+        end: int,
+        status_code: int,
+        headers: Dict[str, str],
+        media_type: str,
+        send_body: bool = True
+    ):
+        super().__init__(content=None, status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.send_body = send_body
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        if not self.send_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        count = self.end - self.start + 1
+        if count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+
+        with open(self.path, "rb") as file:
+            if zerocopy:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+                return
+
+            await anyio.to_thread.run_sync(file.seek, self.start)
+            remaining = count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(file.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank underneath us; close the body cleanly
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def file_etag(file_stat: os.stat_result) -> str:
+    """Strong validator from size and mtime (ranges require a strong ETag)"""
+    return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+
+def content_etag(path: Path) -> str:
+    """
+    Strong ETag from a hash of the file's bytes (for small images).
+
+    Hashes are memoized per (path, mtime, size), so a regenerated file with
+    identical pixels keeps its ETag and clients revalidate with a 304.
+    """
+    file_stat = path.stat()
+    key = (str(path), file_stat.st_mtime_ns, file_stat.st_size)
+    etag = _content_etags.get(key)
+    if etag is None:
+        digest = hashlib.sha1()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:32]}"'
+        if len(_content_etags) >= _CONTENT_ETAG_LIMIT:
+            _content_etags.clear()
+        _content_etags[key] = etag
+    return etag
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    # Weak comparison for If-None-Match
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, then If-Modified-Since (RFC 9110 precedence)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range.
+
+    Returns:
+        (start, end) inclusive; None when the header is malformed or lists
+        several ranges (served as a full 200); raises ValueError when the
+        range is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    if not (first.isdigit() or first == "") or not (last.isdigit() or last == "") or not (first or last):
+        return None
+
+    if first == "":
+        # Suffix range: last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def _if_range_allows(request: Request, etag: str, last_modified: str) -> bool:
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    return if_range == etag or if_range == last_modified
+
+
+def build_file_response(
+    request: Request,
+    path: Path,
+    media_type: str,
+    filename: Optional[str] = None,
+    sendfile_mode: str = "",
+    internal_prefix: str = "/internal-clips/",
+    internal_root: Optional[Path] = None,
+    cache_control: str = "private, max-age=3600",
+    etag: Optional[str] = None,
+    vary: Optional[str] = None
+) -> Response:
+    """
+    Build a range-aware, conditional response for a media file.
+
+    Args:
+        request: Incoming request (Range / If-* headers)
+        path: File to serve
+        media_type: Content type
+        filename: Download name for Content-Disposition (inline)
+        sendfile_mode: "" to stream from Python, "x-accel" for nginx
+            X-Accel-Redirect, "x-sendfile" for Apache/lighttpd X-Sendfile
+        internal_prefix: nginx internal location mapped to internal_root
+        internal_root: Directory that internal_prefix serves
+        cache_control: Cache-Control header value
+        etag: Validator to use instead of the mtime/size ETag (e.g. content_etag)
+        vary: Vary header value when the representation was negotiated
+    """
+    file_stat = path.stat()
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise FileNotFoundError(str(path))
+
+    size = file_stat.st_size
+    etag = etag or file_etag(file_stat)
+    last_modified = formatdate(file_stat.st_mtime, usegmt=True)
+
+    headers = {
+        "accept-ranges": "bytes",
+        "etag": etag,
+        "last-modified": last_modified,
+        "cache-control": cache_control,
+    }
+    if vary:
+        headers["vary"] = vary
+    if filename:
+        headers["content-disposition"] = f"inline; filename*=utf-8''{quote(filename)}"
+
+    if _not_modified(request, etag, file_stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    # Offload byte pushing (including Range handling) to the fronting server
+    if sendfile_mode == "x-accel" and internal_root is not None:
+        try:
+            relative = path.resolve().relative_to(internal_root.resolve()).as_posix()
+        except ValueError:
+            # Outside the internal location nginx can serve: stream it ourselves
+            logger.warning(f"{path} is outside {internal_root}, streaming instead of X-Accel-Redirect")
+        else:
+            headers["x-accel-redirect"] = internal_prefix.rstrip("/") + "/" + quote(relative)
+            return Response(status_code=200, headers=headers, media_type=media_type)
+    if sendfile_mode == "x-sendfile":
+        headers["x-sendfile"] = str(path.resolve())
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    send_body = request.method != "HEAD"
+    range_header = request.headers.get("range")
+
+    if range_header and size > 0 and _if_range_allows(request, etag, last_modified):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{size}"})
+
+        if byte_range is not None:
+            start, end = byte_range
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            return FileRangeResponse(path, start, end, 206, headers, media_type, send_body)
+
+    return FileRangeResponse(path, 0, size - 1, 200, headers, media_type, send_body)
@@ -12,6 +12,7 @@ from datetime import datetime
 from orchestrator.agents.heartbeat_orchestrator import HeartBeatOrchestrator
 from orchestrator.utils.state import UserContext, QueryType
 from orchestrator.config.settings import UserRole
+from orchestrator.utils.semantic_cache import get_semantic_cache
 
 logger = logging.getLogger(__name__)
 
@@ -23,18 +24,18 @@ class OrchestrationService:
     - Handles query processing through the orchestrator
     - Manages user context and permissions
     - Formats responses for API consumption
-    - Provides caching and error handling
+    - Provides caching (the orchestrator's response cache) and error handling
     """
     
     def __init__(self, orchestrator: HeartBeatOrchestrator):
         self.orchestrator = orchestrator
-        self.query_cache = {}  # Simple in-memory cache
     
     async def process_hockey_query(
         self,
         query: str,
         user_context: UserContext,
-        context: Optional[str] = None
+        context: Optional[str] = None,
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Process a hockey analytics query through the orchestrator.
@@ -43,6 +44,7 @@ class OrchestrationService:
             query: User's hockey question
             user_context: User identity and permissions
             context: Optional additional context
+            bypass_cache: Recompute instead of serving a cached response
             
         Returns:
             Structured response with analytics data
@@ -53,16 +55,11 @@ class OrchestrationService:
         try:
             logger.info(f"Processing query for {user_context.role.value}: {query[:100]}...")
             
-            # Check cache first (simple implementation)
-            cache_key = f"{user_context.user_id}:{hash(query)}"
-            if cache_key in self.query_cache:
-                logger.info("Returning cached response")
-                return self.query_cache[cache_key]
-            
-            # Process through orchestrator
+            # Process through orchestrator (serves repeats from its response cache)
             result = await self.orchestrator.process_query(
                 query=query,
-                user_context=user_context
+                user_context=user_context,
+                bypass_cache=bypass_cache
             )
             
             # Add processing metadata
@@ -71,10 +68,6 @@ class OrchestrationService:
             result["user_role"] = user_context.role.value
             result["timestamp"] = datetime.now().isoformat()
             
-            # Cache successful results (simple TTL would be better)
-            if result.get("success", False) and len(self.query_cache) < 100:
-                self.query_cache[cache_key] = result
-            
             logger.info(f"Query processed successfully in {processing_time:.0f}ms")
             return result
             
@@ -135,12 +128,11 @@ class OrchestrationService:
     
     def clear_cache(self):
         """Clear the query cache"""
-        self.query_cache.clear()
-        logger.info("Query cache cleared")
+        self.orchestrator.response_cache.clear()
+        get_semantic_cache().clear()
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        return {
-            "cache_size": len(self.query_cache),
-            "cache_keys": list(self.query_cache.keys())[:10]  # First 10 keys
-        }
+        stats = self.orchestrator.response_cache.get_stats()
+        stats["semantic"] = get_semantic_cache().get_stats()
+        return stats
@@ -24,6 +24,11 @@ sys.path.append(os.path.dirname(__file__))
 from orchestrator.agents.heartbeat_orchestrator import HeartBeatOrchestrator
 from orchestrator.config.settings import UserRole, settings
 from orchestrator.utils.state import UserContext
+from orchestrator.tools.data_executor import get_data_executor
+from orchestrator.utils.coalesce import get_coalescing_stats
+from orchestrator.tools.llm_clients import get_llm_client_stats, close_llm_clients
+from orchestrator.tools.llm_batch_gateway import get_batch_gateway
+from orchestrator.tools.table_prefetcher import get_table_prefetcher
 
 # Import API routes
 from api.routes.auth import router as auth_router
@@ -72,6 +77,9 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down HeartBeat Engine API...")
+    get_data_executor().shutdown(wait=False)
+    get_table_prefetcher().shutdown(wait=False)
+    await close_llm_clients()
 
 # Create FastAPI application
 app = FastAPI(
@@ -127,7 +135,12 @@ async def health_check():
         "orchestrator": orchestrator is not None,
         "pinecone_configured": bool(settings.pinecone.api_key),
         "data_directory_exists": os.path.exists(settings.parquet.data_directory),
-        "configuration_valid": settings.validate_config()
+        "configuration_valid": settings.validate_config(),
+        "data_executor": get_data_executor().get_metrics(),
+        "coalescing": get_coalescing_stats(),
+        "llm_clients": get_llm_client_stats(),
+        "llm_batching": get_batch_gateway().get_metrics(),
+        "prefetch": get_table_prefetcher().get_metrics()
     }
     
     return health_status
@@ -9,6 +9,7 @@ Pinecone RAG, and Parquet analytics tools.
 from typing import Dict, Any, List, Optional
 import asyncio
 import logging
+import time
 from datetime import datetime
 
 from langgraph.graph import StateGraph, END
@@ -24,8 +25,11 @@ from orchestrator.utils.state import (
     ToolType
 )
 from orchestrator.config.settings import settings
+from orchestrator.utils.response_cache import get_response_cache
+from orchestrator.utils.result_store import close_result_store, resolve_result
 from orchestrator.nodes.intent_analyzer import IntentAnalyzerNode
 from orchestrator.nodes.router import RouterNode
+from orchestrator.nodes.semantic_cache import SemanticCacheNode
 from orchestrator.nodes.pinecone_retriever import PineconeRetrieverNode
 from orchestrator.nodes.parquet_analyzer import ParquetAnalyzerNode
 from orchestrator.nodes.clip_retriever import ClipRetrieverNode
@@ -33,6 +37,13 @@ from orchestrator.nodes.response_synthesizer import ResponseSynthesizerNode
 
 logger = logging.getLogger(__name__)
 
+# Tool payload fields returned to API clients, by tool type (None = whole payload).
+# Parquet sample rows and column lists only feed the synthesis prompt.
+RESPONSE_FIELD_EXCLUDES = {
+    ToolType.PARQUET_QUERY: ("sample_data", "columns", "data_files"),
+    ToolType.VECTOR_SEARCH: ("metadata",),
+}
+
 class HeartBeatOrchestrator:
     """
     Main orchestrator for the HeartBeat Engine.
@@ -45,6 +56,7 @@ class HeartBeatOrchestrator:
     
     def __init__(self):
         self.graph = None
+        self.response_cache = get_response_cache()
         self._build_workflow()
     
     def _build_workflow(self) -> None:
@@ -56,22 +68,26 @@ class HeartBeatOrchestrator:
         # Add nodes
         workflow.add_node("intent_analysis", self._intent_analysis_node)
         workflow.add_node("router", self._router_node)
+        workflow.add_node("semantic_cache", self._semantic_cache_node)
         workflow.add_node("pinecone_retrieval", self._pinecone_retrieval_node)
         workflow.add_node("parquet_analysis", self._parquet_analysis_node)
         workflow.add_node("clip_retrieval", self._clip_retrieval_node)
         workflow.add_node("response_synthesis", self._response_synthesis_node)
+        workflow.add_node("semantic_cache_store", self._semantic_cache_store_node)
         
         # Define entry point
         workflow.set_entry_point("intent_analysis")
         
         # Add edges (workflow routing)
         workflow.add_edge("intent_analysis", "router")
+        workflow.add_edge("router", "semantic_cache")
         
-        # Conditional routing from router
+        # Paraphrase hits end here; everything else follows the router's plan
         workflow.add_conditional_edges(
-            "router",
-            self._route_decision,
+            "semantic_cache",
+            self._after_semantic_cache_decision,
             {
+                "cached": END,
                 "pinecone": "pinecone_retrieval",
                 "parquet": "parquet_analysis", 
                 "clips": "clip_retrieval",
@@ -105,8 +121,9 @@ class HeartBeatOrchestrator:
             }
         )
         
-        # End at synthesis
-        workflow.add_edge("response_synthesis", END)
+        # Remember the synthesized answer, then end
+        workflow.add_edge("response_synthesis", "semantic_cache_store")
+        workflow.add_edge("semantic_cache_store", END)
         
         # Compile the graph
         self.graph = workflow.compile()
@@ -117,26 +134,66 @@ class HeartBeatOrchestrator:
         self, 
         query: str, 
         user_context: UserContext,
-        query_type: Optional[QueryType] = None
+        query_type: Optional[QueryType] = None,
+        bypass_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Process a user query through the complete orchestrator workflow.
         
+        Repeat questions (same normalized query, role/permission scope and
+        data version) are answered from the response cache; concurrent
+        identical questions share one workflow run. Paraphrases of recent
+        questions are answered inside the workflow by the semantic cache.
+        
         Args:
             query: User's hockey analytics query
             user_context: User identity and permissions
             query_type: Optional hint about query type
+            bypass_cache: Run the full workflow even if a cached response exists
             
         Returns:
             Complete response with data, citations, and metadata
         """
         
+        if not settings.orchestration.response_cache_enabled:
+            return await self._run_workflow(query, user_context, query_type, bypass_cache)
+        
+        start_time = time.perf_counter()
+        key = self.response_cache.make_key(query, user_context, query_type)
+        cached, cache_status, cached_at = await self.response_cache.get_or_compute(
+            key,
+            lambda: self._run_workflow(query, user_context, query_type, bypass_cache),
+            bypass=bypass_cache
+        )
+        
+        # Shallow copy: the cached/shared dict must not pick up per-request fields
+        response = dict(cached)
+        if cache_status == "miss" and response.get("semantic_cache_status") == "hit":
+            cache_status = "semantic_hit"
+        response["cache_status"] = cache_status
+        if cache_status in ("hit", "coalesced"):
+            response["processing_time_ms"] = int((time.perf_counter() - start_time) * 1000)
+        if cache_status == "hit":
+            response["cache_age_seconds"] = int(time.time() - cached_at)
+            logger.info(f"Response cache hit for {user_context.role.value}: {query[:100]}")
+        return response
+    
+    async def _run_workflow(
+        self,
+        query: str,
+        user_context: UserContext,
+        query_type: Optional[QueryType] = None,
+        bypass_cache: bool = False
+    ) -> Dict[str, Any]:
+        """Run the LangGraph workflow for one query (no response caching)"""
+        
         start_time = datetime.now()
         
+        # Create initial state (its request_id keys the per-request result store)
+        initial_state = create_initial_state(user_context, query, query_type)
+        initial_state["debug_info"]["bypass_cache"] = bypass_cache
+        
         try:
-            # Create initial state
-            initial_state = create_initial_state(user_context, query, query_type)
-            
             logger.info(f"Processing query for {user_context.role.value}: {query[:100]}...")
             
             # Execute the workflow
@@ -146,7 +203,7 @@ class HeartBeatOrchestrator:
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
             result["processing_time_ms"] = int(processing_time)
             
-            # Format final response
+            # Format final response (tool payloads resolved from the result store)
             response = {
                 "response": result["final_response"],
                 "query_type": result["query_type"].value,
@@ -155,7 +212,7 @@ class HeartBeatOrchestrator:
                     {
                         "tool": r.tool_type.value,
                         "success": r.success,
-                        "data": r.data,
+                        "data": resolve_result(result, r.data, exclude=RESPONSE_FIELD_EXCLUDES.get(r.tool_type, ())),
                         "processing_time_ms": r.execution_time_ms,
                         "citations": r.citations,
                         "error": r.error
@@ -163,7 +220,8 @@ class HeartBeatOrchestrator:
                 ],
                 "processing_time_ms": result["processing_time_ms"],
                 "user_role": user_context.role.value,
-                "errors": result["error_messages"]
+                "errors": result["error_messages"],
+                "semantic_cache_status": result["debug_info"].get("semantic_cache", {}).get("status")
             }
             
             logger.info(f"Query processed successfully in {processing_time:.0f}ms")
@@ -177,6 +235,8 @@ class HeartBeatOrchestrator:
                 "processing_time_ms": int((datetime.now() - start_time).total_seconds() * 1000),
                 "success": False
             }
+        finally:
+            close_result_store(initial_state["request_id"])
     
     def _intent_analysis_node(self, state: AgentState) -> AgentState:
         """Analyze user intent and classify query type"""
@@ -188,6 +248,16 @@ class HeartBeatOrchestrator:
         node = RouterNode()
         return node.process(state)
     
+    def _semantic_cache_node(self, state: AgentState) -> AgentState:
+        """Answer paraphrases of recent questions from the semantic cache"""
+        node = SemanticCacheNode()
+        return node.process(state)
+    
+    def _semantic_cache_store_node(self, state: AgentState) -> AgentState:
+        """Add the synthesized answer to the semantic cache"""
+        node = SemanticCacheNode()
+        return node.store(state)
+    
     async def _pinecone_retrieval_node(self, state: AgentState) -> AgentState:
         """Retrieve relevant hockey context from Pinecone"""
         node = PineconeRetrieverNode()
@@ -234,6 +304,12 @@ class HeartBeatOrchestrator:
         else:
             return "synthesis"  # Direct to response if no tools needed
     
+    def _after_semantic_cache_decision(self, state: AgentState) -> str:
+        """End on a semantic cache hit, otherwise route to tools"""
+        if SemanticCacheNode.is_hit(state):
+            return "cached"
+        return self._route_decision(state)
+    
     def _after_pinecone_decision(self, state: AgentState) -> str:
         """Decide next step after Pinecone retrieval"""
         required_tools = state["required_tools"]
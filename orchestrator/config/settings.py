@@ -22,7 +22,7 @@ class UserRole(Enum):
 class ModelConfig:
     """Model configuration for different deployment scenarios"""
     # Primary model (when training completes)
-    primary_model_endpoint: str = ""  # SageMaker endpoint URL
+    primary_model_endpoint: str = os.getenv("PRIMARY_MODEL_ENDPOINT", "")  # SageMaker endpoint name
     primary_model_name: str = "heartbeat-deepseek-r1-qwen-32b"
     
     # Fallback model for development/testing
@@ -33,6 +33,22 @@ class ModelConfig:
     temperature: float = 0.1
     max_tokens: int = 4096
     top_p: float = 0.95
+    
+    # Shared LLM client layer (orchestrator/tools/llm_clients.py)
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    sagemaker_region: str = os.getenv("SAGEMAKER_REGION", "ca-central-1")
+    sagemaker_runtime_url: str = os.getenv("SAGEMAKER_RUNTIME_URL", "")  # plain HTTP runtime, e.g. the local stand-in
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    llm_retry_base_delay: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    llm_retry_max_delay: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    openai_max_concurrency: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    sagemaker_max_concurrency: int = int(os.getenv("SAGEMAKER_MAX_CONCURRENCY", "4"))
+    
+    # Micro-batching of SageMaker synthesis calls (orchestrator/tools/llm_batch_gateway.py)
+    llm_batch_enabled: bool = os.getenv("LLM_BATCH_ENABLED", "true").lower() == "true"
+    llm_batch_window_ms: float = float(os.getenv("LLM_BATCH_WINDOW_MS", "5"))
+    llm_batch_max_size: int = int(os.getenv("LLM_BATCH_MAX_SIZE", "8"))
 
 @dataclass
 class PineconeConfig:
@@ -51,6 +67,14 @@ class ParquetConfig:
     cache_enabled: bool = True
     cache_ttl_seconds: int = 300  # 5 minutes
     max_query_results: int = 1000
+    
+    # Data access executor (keeps parquet/Arrow work off the event loop)
+    io_workers: int = int(os.getenv("PARQUET_IO_WORKERS", "8"))
+    max_concurrent_queries: int = int(os.getenv("PARQUET_MAX_CONCURRENT", "4"))
+    
+    # Speculative table warm-up once intent analysis has seen the entities
+    prefetch_enabled: bool = os.getenv("PARQUET_PREFETCH_ENABLED", "true").lower() == "true"
+    prefetch_workers: int = int(os.getenv("PARQUET_PREFETCH_WORKERS", "1"))
 
 @dataclass
 class OrchestrationConfig:
@@ -66,6 +90,17 @@ class OrchestrationConfig:
     # Response generation
     max_response_length: int = 2000
     require_citations: bool = True
+    
+    # Full-response cache in front of process_query
+    response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    response_cache_ttl_seconds: int = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "600"))
+    response_cache_max_entries: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+    
+    # Semantic (paraphrase) cache inside the workflow, before retrieval
+    semantic_cache_enabled: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    semantic_cache_threshold: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+    semantic_cache_ttl_seconds: int = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "600"))
+    semantic_cache_max_entries: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
 
 class OrchestratorSettings:
     """Main settings class for HeartBeat orchestrator"""
@@ -82,6 +117,13 @@ class OrchestratorSettings:
         default_clips_path = os.getenv("CLIPS_BASE_PATH", str(repo_root / "data" / "clips"))
         self.clips_base_path: str = default_clips_path
         
+        # Clip video delivery: "" streams from Python, "x-accel" hands bytes to
+        # nginx via X-Accel-Redirect (internal location serving clips_base_path),
+        # "x-sendfile" emits X-Sendfile for Apache/lighttpd
+        self.media_sendfile_mode: str = os.getenv("MEDIA_SENDFILE_MODE", "").lower()
+        self.media_internal_prefix: str = os.getenv("MEDIA_INTERNAL_PREFIX", "/internal-clips/")
+        self.media_probe_workers: int = int(os.getenv("MEDIA_PROBE_WORKERS", "4"))
+        
         # Role-based data access permissions
         self.role_permissions = {
             UserRole.COACH: {
@@ -115,11 +157,28 @@ class OrchestratorSettings:
                 "tactical_analysis": True
             }
         }
+        
+        # Synthesis prompt token budget per role (PROMPT_TOKEN_BUDGET_<ROLE> overrides)
+        default_budgets = {
+            UserRole.COACH: 3000,
+            UserRole.PLAYER: 1500,
+            UserRole.ANALYST: 4000,
+            UserRole.STAFF: 2000,
+            UserRole.SCOUT: 3000
+        }
+        self.prompt_token_budgets = {
+            role: int(os.getenv(f"PROMPT_TOKEN_BUDGET_{role.name}", str(budget)))
+            for role, budget in default_budgets.items()
+        }
     
     def get_user_permissions(self, role: UserRole) -> Dict[str, Any]:
         """Get permissions for a specific user role"""
         return self.role_permissions.get(role, self.role_permissions[UserRole.STAFF])
     
+    def get_prompt_token_budget(self, role: UserRole) -> int:
+        """Synthesis prompt token budget for a user role"""
+        return self.prompt_token_budgets.get(role, self.prompt_token_budgets[UserRole.STAFF])
+    
     def validate_config(self) -> bool:
         """Validate configuration settings"""
         issues = []
@@ -0,0 +1,433 @@
+"""
+HeartBeat Engine - Clip Catalog
+Montreal Canadiens Advanced Analytics Assistant
+
+Persistent SQLite catalog of discovered video clips.
+Provides primary-key lookup by clip_id and indexed filtering by
+player, event type, opponent and game date, plus a directory-mtime
+manifest so rescans only touch directories that changed, and ffprobe
+results keyed by file path + mtime so each file is probed once.
+"""
+
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import sqlite3
+import threading
+
+from orchestrator.models.clip_models import ClipMetadata
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever clip rows or clip ids change shape (the catalog is rebuilt)
+SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    clip_id TEXT PRIMARY KEY,
+    season TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    player_id TEXT,
+    game_date TEXT NOT NULL DEFAULT '',
+    opponent TEXT NOT NULL DEFAULT '',
+    event_type TEXT NOT NULL DEFAULT '',
+    period INTEGER,
+    game_time TEXT NOT NULL DEFAULT '',
+    situation TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    file_path TEXT NOT NULL,
+    file_size_mb REAL NOT NULL DEFAULT 0,
+    duration_seconds REAL NOT NULL DEFAULT 0,
+    resolution TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT,
+    indexed_at TEXT,
+    source_dir TEXT NOT NULL DEFAULT '',
+    file_mtime_ns INTEGER NOT NULL DEFAULT 0,
+    file_bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_clips_player ON clips (player_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_clips_event ON clips (event_type COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_clips_opponent ON clips (opponent COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_clips_game_date ON clips (game_date);
+CREATE INDEX IF NOT EXISTS idx_clips_season ON clips (season);
+CREATE INDEX IF NOT EXISTS idx_clips_source_dir ON clips (source_dir);
+CREATE TABLE IF NOT EXISTS dir_manifest (
+    dir_path TEXT PRIMARY KEY,
+    season TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    subdirs TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_manifest_season ON dir_manifest (season);
+CREATE TABLE IF NOT EXISTS media_probe (
+    file_path TEXT PRIMARY KEY,
+    file_mtime_ns INTEGER NOT NULL,
+    file_bytes INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL DEFAULT 0,
+    width INTEGER NOT NULL DEFAULT 0,
+    height INTEGER NOT NULL DEFAULT 0,
+    resolution TEXT NOT NULL DEFAULT '',
+    codec TEXT NOT NULL DEFAULT '',
+    bitrate INTEGER NOT NULL DEFAULT 0,
+    keyframe_interval REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    probed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COLUMNS = [
+    "clip_id", "season", "player_name", "player_id", "game_date", "opponent",
+    "event_type", "period", "game_time", "situation", "description", "file_path",
+    "file_size_mb", "duration_seconds", "resolution", "tags", "created_at", "indexed_at",
+    "source_dir", "file_mtime_ns", "file_bytes"
+]
+
+_PROBE_FIELDS = ["duration_seconds", "width", "height", "resolution", "codec", "bitrate", "keyframe_interval"]
+_PROBE_DEFAULTS = {"resolution": "", "codec": ""}
+
+# Copy probe results onto clip rows whose file still matches (path, mtime, size)
+_ATTACH_PROBES_SQL = """
+UPDATE clips SET
+    duration_seconds = p.duration_seconds,
+    resolution = p.resolution
+FROM media_probe p
+WHERE clips.file_path = p.file_path
+  AND clips.file_mtime_ns = p.file_mtime_ns
+  AND clips.file_bytes = p.file_bytes
+  AND p.error IS NULL
+  AND (clips.duration_seconds != p.duration_seconds OR clips.resolution != p.resolution)
+"""
+
+# (clip, source_dir, file_mtime_ns, file_bytes)
+ClipRecord = Tuple[ClipMetadata, str, int, int]
+
+# (file_path, file_mtime_ns, file_bytes, probe result or {"error": ...})
+ProbeRecord = Tuple[str, int, int, Dict[str, Any]]
+
+
+class ClipCatalog:
+    """
+    SQLite-backed clip catalog.
+
+    One connection per process guarded by a lock; WAL mode lets several
+    API workers read while a rescan writes.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._ensure_schema()
+            self._conn.commit()
+
+    def _ensure_schema(self) -> None:
+        """Create tables; the catalog is derived data, so older layouts are rebuilt"""
+        has_meta = self._conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='catalog_meta'"
+        ).fetchone()
+        version = None
+        if has_meta:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = 'schema_version'").fetchone()
+            version = row[0] if row else None
+        if has_meta and version != str(SCHEMA_VERSION):
+            logger.info("Clip catalog schema changed, rebuilding")
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS clips; DROP TABLE IF EXISTS dir_manifest; "
+                "DROP TABLE IF EXISTS media_probe; DROP TABLE IF EXISTS catalog_meta;"
+            )
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+
+    # Reads
+
+    def get(self, clip_id: str) -> Optional[ClipMetadata]:
+        """Primary-key lookup"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM clips WHERE clip_id = ?", (clip_id,)).fetchone()
+        return self._row_to_clip(row) if row else None
+
+    def all_clips(self, season: Optional[str] = None) -> List[ClipMetadata]:
+        """Every catalogued clip, optionally for one season"""
+        sql = "SELECT * FROM clips"
+        args: List[Any] = []
+        if season:
+            sql += " WHERE season = ?"
+            args.append(season)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY clip_id", args).fetchall()
+        return [self._row_to_clip(row) for row in rows]
+
+    def query(
+        self,
+        player_names: Optional[List[str]] = None,
+        event_types: Optional[List[str]] = None,
+        opponents: Optional[List[str]] = None,
+        game_dates: Optional[List[str]] = None,
+        season: Optional[str] = None
+    ) -> List[ClipMetadata]:
+        """Filter clips using the secondary indexes (exact, case-insensitive)"""
+        clauses = []
+        args: List[Any] = []
+
+        for column, values in (
+            ("player_name", player_names),
+            ("event_type", event_types),
+            ("opponent", opponents),
+        ):
+            if values:
+                clauses.append(f"{column} COLLATE NOCASE IN ({','.join('?' * len(values))})")
+                args.extend(values)
+        if game_dates:
+            clauses.append(f"game_date IN ({','.join('?' * len(game_dates))})")
+            args.extend(game_dates)
+        if season:
+            clauses.append("season = ?")
+            args.append(season)
+
+        sql = "SELECT * FROM clips"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY game_date DESC, clip_id", args).fetchall()
+        return [self._row_to_clip(row) for row in rows]
+
+    def count(self, season: Optional[str] = None) -> int:
+        sql = "SELECT COUNT(*) FROM clips"
+        args = (season,) if season else ()
+        if season:
+            sql += " WHERE season = ?"
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def version(self) -> int:
+        """Monotonic counter bumped on every clip change (shared across processes)"""
+        value = self.get_meta("version")
+        return int(value) if value else 0
+
+    def get_manifest(self, season: str) -> Dict[str, Tuple[int, List[str]]]:
+        """Directory -> (mtime_ns, child directories) as of the last sync"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dir_path, mtime_ns, subdirs FROM dir_manifest WHERE season = ?", (season,)
+            ).fetchall()
+        return {row["dir_path"]: (row["mtime_ns"], json.loads(row["subdirs"])) for row in rows}
+
+    def files_in_dirs(self, dir_paths: Iterable[str]) -> Dict[str, Dict[str, Tuple[str, int, int]]]:
+        """Directory -> {file_path: (clip_id, file_mtime_ns, file_bytes)}"""
+        result: Dict[str, Dict[str, Tuple[str, int, int]]] = {}
+        dir_paths = list(dir_paths)
+        with self._lock:
+            for start in range(0, len(dir_paths), 500):
+                chunk = dir_paths[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT source_dir, file_path, clip_id, file_mtime_ns, file_bytes FROM clips "
+                    f"WHERE source_dir IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    result.setdefault(row["source_dir"], {})[row["file_path"]] = (
+                        row["clip_id"], row["file_mtime_ns"], row["file_bytes"]
+                    )
+        return result
+
+    def pending_probes(self, season: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, int, int]]:
+        """(file_path, file_mtime_ns, file_bytes) of clips with no probe for their current file"""
+        sql = (
+            "SELECT c.file_path, c.file_mtime_ns, c.file_bytes FROM clips c "
+            "LEFT JOIN media_probe p ON p.file_path = c.file_path "
+            "AND p.file_mtime_ns = c.file_mtime_ns AND p.file_bytes = c.file_bytes "
+            "WHERE p.file_path IS NULL"
+        )
+        args: List[Any] = []
+        if season:
+            sql += " AND c.season = ?"
+            args.append(season)
+        sql += " ORDER BY c.game_date DESC"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    def get_probe(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Stored probe result for a file (None if never probed)"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM media_probe WHERE file_path = ?", (file_path,)).fetchone()
+        return dict(row) if row else None
+
+    # Writes
+
+    def apply_probes(self, probes: List[ProbeRecord]) -> int:
+        """
+        Store probe results and copy duration/resolution onto matching clips.
+
+        Failed probes are stored with their error so broken files are not
+        re-probed until they change on disk.
+
+        Returns:
+            Number of clip rows updated
+        """
+        if not probes:
+            return 0
+        now = datetime.now().isoformat()
+        rows = []
+        for file_path, mtime_ns, size, result in probes:
+            error = result.get("error")
+            rows.append((
+                file_path, mtime_ns, size,
+                *[result.get(field) or _PROBE_DEFAULTS.get(field, 0) for field in _PROBE_FIELDS],
+                error, now
+            ))
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO media_probe (file_path, file_mtime_ns, file_bytes, "
+                    f"{', '.join(_PROBE_FIELDS)}, error, probed_at) "
+                    f"VALUES ({','.join('?' * (len(_PROBE_FIELDS) + 5))})",
+                    rows
+                )
+                updated = self._conn.execute(_ATTACH_PROBES_SQL).rowcount
+                if updated:
+                    self._bump_version()
+        return updated
+
+    def apply_changes(
+        self,
+        season: str,
+        upserts: List[ClipRecord],
+        deletes: List[str],
+        manifest_updates: Dict[str, Tuple[int, List[str]]],
+        manifest_deletes: List[str]
+    ) -> bool:
+        """
+        Apply one sync pass in a single transaction.
+
+        Returns:
+            True when any clip row changed (the catalog version was bumped)
+        """
+        changed = bool(upserts or deletes)
+        with self._lock:
+            with self._conn:
+                if deletes:
+                    self._conn.executemany("DELETE FROM clips WHERE clip_id = ?", [(d,) for d in deletes])
+                if upserts:
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO clips ({','.join(_COLUMNS)}) VALUES ({','.join('?' * len(_COLUMNS))})",
+                        [self._clip_to_row(clip, season, source_dir, mtime_ns, size)
+                         for clip, source_dir, mtime_ns, size in upserts]
+                    )
+                if manifest_deletes:
+                    self._conn.executemany(
+                        "DELETE FROM dir_manifest WHERE dir_path = ?", [(d,) for d in manifest_deletes]
+                    )
+                if manifest_updates:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO dir_manifest (dir_path, season, mtime_ns, subdirs) VALUES (?, ?, ?, ?)",
+                        [(path, season, mtime_ns, json.dumps(subdirs))
+                         for path, (mtime_ns, subdirs) in manifest_updates.items()]
+                    )
+                if upserts:
+                    # Re-attach probes for files that were already probed (e.g. after a full rescan)
+                    self._conn.execute(_ATTACH_PROBES_SQL)
+                if changed:
+                    self._bump_version()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+                    (f"indexed_at:{season}", datetime.now().isoformat())
+                )
+        return changed
+
+    def clear_season(self, season: str) -> None:
+        """Drop a season's clips and manifest so the next sync rescans everything"""
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM clips WHERE season = ?", (season,))
+                self._conn.execute("DELETE FROM dir_manifest WHERE season = ?", (season,))
+                self._conn.execute("DELETE FROM catalog_meta WHERE key = ?", (f"indexed_at:{season}",))
+                self._bump_version()
+
+    def _bump_version(self) -> None:
+        """Increment the shared version counter (caller holds the lock and a transaction)"""
+        self._conn.execute(
+            "INSERT INTO catalog_meta (key, value) VALUES ('version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)", (key, value))
+
+    # Row mapping
+
+    def _clip_to_row(
+        self,
+        clip: ClipMetadata,
+        season: str,
+        source_dir: str = "",
+        file_mtime_ns: int = 0,
+        file_bytes: int = 0
+    ) -> tuple:
+        return (
+            clip.clip_id,
+            season,
+            clip.player_name,
+            clip.player_id,
+            clip.game_date,
+            clip.opponent,
+            clip.event_type,
+            clip.period,
+            clip.game_time,
+            clip.situation,
+            clip.description,
+            clip.file_path,
+            clip.file_size_mb,
+            clip.duration_seconds,
+            clip.resolution,
+            json.dumps(clip.tags),
+            clip.created_at.isoformat() if clip.created_at else None,
+            (clip.indexed_at or datetime.now()).isoformat(),
+            source_dir,
+            file_mtime_ns,
+            file_bytes,
+        )
+
+    def _row_to_clip(self, row: sqlite3.Row) -> ClipMetadata:
+        return ClipMetadata(
+            clip_id=row["clip_id"],
+            player_name=row["player_name"],
+            player_id=row["player_id"],
+            game_date=row["game_date"],
+            opponent=row["opponent"],
+            event_type=row["event_type"],
+            period=row["period"],
+            game_time=row["game_time"],
+            situation=row["situation"],
+            description=row["description"],
+            file_path=row["file_path"],
+            file_size_mb=row["file_size_mb"],
+            duration_seconds=row["duration_seconds"],
+            resolution=row["resolution"],
+            tags=json.loads(row["tags"]) if row["tags"] else [],
+            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else datetime.now(),
+            indexed_at=datetime.fromisoformat(row["indexed_at"]) if row["indexed_at"] else None,
+        )
@@ -9,7 +9,17 @@ from typing import Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
+import asyncio
+import bisect
+import hashlib
+import logging
 import os
+import threading
+import time
+
+from orchestrator.utils.entity_extractor import get_entity_extractor
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class ClipMetadata:
@@ -61,124 +71,229 @@ class ClipResult:
 class ClipIndexManager:
     """Manages video clip indexing and retrieval"""
     
+    VIDEO_EXTENSIONS = {'.mp4', '.mov', '.avi', '.mkv', '.webm'}
+    SYNC_ROOTS = ("players", "games", "vs_opponents")
+    
     def __init__(self, clips_base_path: str = "data/clips"):
         # Ensure absolute path to avoid dependency on working directory
         base_path = Path(clips_base_path)
         self.clips_base_path = base_path if base_path.is_absolute() else (Path.cwd() / base_path).resolve()
-        self.clip_cache = {}
-        self.index_cache_ttl = 300  # 5 minutes
-        self.last_indexed = None
-        
-    def discover_clips(self, season: str = "2024-2025") -> List[ClipMetadata]:
-        """Discover all video clips in the directory structure"""
-        
-        clips = []
+        self.clip_cache: List[ClipMetadata] = []
+        self._cached_version: Optional[int] = None
+        
+        # Inverted indexes over clip_cache, rebuilt when the catalog version changes
+        self._clips_by_id: Dict[str, ClipMetadata] = {}
+        self._player_index: Dict[str, set] = {}
+        self._event_index: Dict[str, set] = {}
+        self._opponent_index: Dict[str, set] = {}
+        self._date_index: Dict[str, set] = {}
+        self._sorted_dates: List[str] = []
+        # Same postings keyed by canonical player_id / team_abbr, so "Tor",
+        # "Toronto" and "Toronto Maple Leafs" land on one key
+        self._player_id_index: Dict[str, set] = {}
+        self._opponent_team_index: Dict[str, set] = {}
+        self._clip_player_id: Dict[str, str] = {}
+        self._clip_opponent_team: Dict[str, str] = {}
+        self.default_season = "2024-2025"
+        
+        # Incremental sync: directories are re-listed only when their mtime changes
+        self.sync_interval = 5.0  # seconds between manifest checks
+        self._last_sync: Dict[str, float] = {}
+        
+        # Persistent catalog: media routes resolve clip_id with one indexed lookup
+        from orchestrator.models.clip_catalog import ClipCatalog
+        self.catalog = ClipCatalog(self.clips_base_path / "metadata" / "clip_catalog.sqlite")
+        self._refresh_lock = threading.Lock()
+        
+        # Syncs walk the filesystem, so lookups only start them on a background
+        # thread and read whatever the catalog holds
+        self._sync_threads: Dict[str, threading.Thread] = {}
+        self._sync_threads_lock = threading.Lock()
+        self._maybe_sync()
+    
+    def sync_catalog(self, season: Optional[str] = None) -> Dict[str, int]:
+        """
+        Incrementally sync the catalog with the clips tree.
+        
+        Walks directories using the stored manifest: a directory whose mtime
+        is unchanged reuses its recorded children without being listed, so
+        the cost tracks changed directories/files rather than library size.
+        Only clips in added, removed or modified directories are touched.
+        A file rewritten in place does not change its directory's mtime;
+        refresh_catalog forces a full rescan for that case.
+        """
+        season = season or self.default_season
         season_path = self.clips_base_path / season
         
-        if not season_path.exists():
-            return clips
-        
-        # Search in players directories
-        players_path = season_path / "players"
-        if players_path.exists():
-            clips.extend(self._discover_player_clips(players_path, season))
-        
-        # Search in game directories
-        games_path = season_path / "games"
-        if games_path.exists():
-            clips.extend(self._discover_game_clips(games_path, season))
+        with self._refresh_lock:
+            manifest = self.catalog.get_manifest(season)
+            seen = set()
+            changed_dirs: Dict[str, List[os.DirEntry]] = {}
+            manifest_updates: Dict[str, Any] = {}
             
-        # Search in opponent directories
-        opponents_path = season_path / "vs_opponents"
-        if opponents_path.exists():
-            clips.extend(self._discover_opponent_clips(opponents_path, season))
-        
-        return clips
-    
-    def _discover_player_clips(self, players_path: Path, season: str) -> List[ClipMetadata]:
-        """Discover clips in player directories"""
-        
-        clips = []
-        
-        for player_dir in players_path.iterdir():
-            if not player_dir.is_dir():
-                continue
+            stack = [str(season_path / root) for root in self.SYNC_ROOTS]
+            while stack:
+                directory = stack.pop()
+                try:
+                    dir_stat = os.stat(directory)
+                except OSError:
+                    continue
+                seen.add(directory)
                 
-            player_name = player_dir.name.replace('_', ' ').title()
-            
-            # Search in subdirectories - prioritize vs_ directories as game-specific
-            for event_dir in player_dir.iterdir():
-                if not event_dir.is_dir():
+                known = manifest.get(directory)
+                if known and known[0] == dir_stat.st_mtime_ns:
+                    stack.extend(known[1])
                     continue
-                    
-                # Handle vs_ directories as game-specific (not generic event types)
-                if event_dir.name.startswith('vs_'):
-                    event_type = event_dir.name  # Keep the full vs_opponent_date format
-                else:
-                    event_type = event_dir.name  # Regular event types like 'goals', 'assists'
                 
-                clips.extend(self._scan_directory_for_clips(
-                    event_dir, player_name, event_type, season
-                ))
-        
-        return clips
-    
-    def _discover_game_clips(self, games_path: Path, season: str) -> List[ClipMetadata]:
-        """Discover clips in game directories"""
-        
-        clips = []
-        
-        for game_dir in games_path.iterdir():
-            if not game_dir.is_dir():
-                continue
+                subdirs, files = [], []
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in self.VIDEO_EXTENSIONS:
+                            files.append(entry)
+                manifest_updates[directory] = (dir_stat.st_mtime_ns, subdirs)
+                changed_dirs[directory] = files
+                stack.extend(subdirs)
+            
+            removed_dirs = [d for d in manifest if d not in seen]
+            existing = self.catalog.files_in_dirs(list(changed_dirs) + removed_dirs)
+            
+            upserts, deletes = [], []
+            for directory in removed_dirs:
+                deletes.extend(clip_id for clip_id, _, _ in existing.get(directory, {}).values())
+            
+            for directory, entries in changed_dirs.items():
+                known_files = existing.get(directory, {})
+                context = self._clip_context(Path(directory), season_path)
+                present = set()
                 
-            clips.extend(self._scan_directory_for_clips(
-                game_dir, "team", "game_highlights", season
-            ))
-        
-        return clips
-    
-    def _discover_opponent_clips(self, opponents_path: Path, season: str) -> List[ClipMetadata]:
-        """Discover clips in opponent directories"""
-        
-        clips = []
-        
-        for opponent_dir in opponents_path.iterdir():
-            if not opponent_dir.is_dir():
-                continue
+                if context:
+                    player_name, event_type, opponent = context
+                    for entry in entries:
+                        try:
+                            file_stat = entry.stat()
+                            present.add(entry.path)
+                            previous = known_files.get(entry.path)
+                            if previous and previous[1] == file_stat.st_mtime_ns and previous[2] == file_stat.st_size:
+                                continue
+                            clip = self._create_clip_metadata(
+                                Path(entry.path), player_name, event_type, season, opponent
+                            )
+                            upserts.append((clip, directory, file_stat.st_mtime_ns, file_stat.st_size))
+                        except OSError:
+                            continue
                 
-            opponent = opponent_dir.name.replace('vs_', '').replace('_', ' ').title()
-            clips.extend(self._scan_directory_for_clips(
-                opponent_dir, "team", "matchup", season, opponent=opponent
-            ))
-        
-        return clips
+                deletes.extend(clip_id for path, (clip_id, _, _) in known_files.items() if path not in present)
+            
+            self.catalog.apply_changes(season, upserts, deletes, manifest_updates, removed_dirs)
+            self._last_sync[season] = time.monotonic()
+        
+        if upserts or deletes:
+            logger.info(f"Clip catalog sync ({season}): {len(upserts)} upserted, {len(deletes)} removed, "
+                        f"{len(changed_dirs)} directories rescanned")
+        
+        return {
+            "upserted": len(upserts),
+            "removed": len(deletes),
+            "directories_scanned": len(changed_dirs),
+            "directories_total": len(seen)
+        }
     
-    def _scan_directory_for_clips(
-        self, 
-        directory: Path, 
-        player_name: str, 
-        event_type: str, 
-        season: str,
-        opponent: str = ""
-    ) -> List[ClipMetadata]:
-        """Scan a directory for video clip files"""
-        
-        clips = []
-        video_extensions = {'.mp4', '.mov', '.avi', '.mkv', '.webm'}
-        
-        for file_path in directory.rglob('*'):
-            if file_path.suffix.lower() in video_extensions:
-                try:
-                    clip_metadata = self._create_clip_metadata(
-                        file_path, player_name, event_type, season, opponent
-                    )
-                    clips.append(clip_metadata)
-                except Exception as e:
-                    # Log error but continue processing other clips
-                    continue
-        
-        return clips
+    def refresh_catalog(self, season: Optional[str] = None) -> int:
+        """Force a full rescan of a season's clip tree"""
+        season = season or self.default_season
+        self.catalog.clear_season(season)
+        self.sync_catalog(season)
+        return self.catalog.count(season)
+    
+    async def probe_pending(self, season: Optional[str] = None, limit: Optional[int] = None,
+                            probe=None) -> Dict[str, int]:
+        """
+        Probe clips whose current file (path + mtime + size) has no stored
+        ffprobe result, and write duration/resolution back to the catalog.
+        
+        Args:
+            season: Season to probe (default season when omitted)
+            limit: Max files this pass
+            probe: MediaProbe to use (shared instance by default)
+        """
+        from orchestrator.utils.media_probe import get_media_probe
+        
+        season = season or self.default_season
+        probe = probe or get_media_probe()
+        pending = self.catalog.pending_probes(season, limit)
+        if not pending or not probe.available:
+            return {"probed": 0, "failed": 0, "clips_updated": 0, "pending": len(pending)}
+        
+        results = await probe.probe_many(path for path, _, _ in pending)
+        records = [(path, mtime_ns, size, results[path]) for path, mtime_ns, size in pending]
+        failed = sum(1 for *_, result in records if "error" in result)
+        updated = self.catalog.apply_probes(records)
+        
+        logger.info(f"Probed {len(records)} clip files ({failed} failed), {updated} clips updated")
+        return {"probed": len(records), "failed": failed, "clips_updated": updated, "pending": 0}
+    
+    def _maybe_sync(self, season: Optional[str] = None, max_age: Optional[float] = None) -> None:
+        """
+        Start a background sync when the last manifest check is older than
+        max_age seconds. Never blocks: at most one sync per season runs at a
+        time, and callers keep reading the catalog while it does.
+        """
+        season = season or self.default_season
+        max_age = self.sync_interval if max_age is None else max_age
+        if time.monotonic() - self._last_sync.get(season, float("-inf")) < max_age:
+            return
+        
+        with self._sync_threads_lock:
+            running = self._sync_threads.get(season)
+            if running is not None and running.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._background_sync, args=(season,), name=f"clip-sync-{season}", daemon=True
+            )
+            self._sync_threads[season] = thread
+            thread.start()
+    
+    def _background_sync(self, season: str) -> None:
+        try:
+            self.sync_catalog(season)
+        except Exception as e:
+            logger.error(f"Clip catalog sync failed ({season}): {str(e)}")
+            # Wait a full interval before trying again
+            self._last_sync[season] = time.monotonic()
+    
+    def _clip_context(self, directory: Path, season_path: Path) -> Optional[tuple]:
+        """(player_name, event_type, opponent) for clips in a directory, None if not a clip location"""
+        parts = directory.relative_to(season_path).parts
+        
+        if len(parts) >= 3 and parts[0] == "players":
+            return parts[1].replace('_', ' ').title(), parts[2], ""
+        if len(parts) >= 2 and parts[0] == "games":
+            return "team", "game_highlights", ""
+        if len(parts) >= 2 and parts[0] == "vs_opponents":
+            return "team", "matchup", parts[1].replace('vs_', '').replace('_', ' ').title()
+        
+        return None
+    
+    def get_clip(self, clip_id: str) -> Optional[ClipMetadata]:
+        """Look up a single clip by id (primary-key lookup, no filesystem walk)"""
+        self._maybe_sync()
+        clip = self.catalog.get(clip_id)
+        if clip is None:
+            # Possibly a newly written clip: allow an early manifest check
+            self._maybe_sync(max_age=1.0)
+        return clip
+    
+    def catalog_version(self) -> int:
+        """Catalog version (background manifest checks bump it whenever clips change)"""
+        self._maybe_sync()
+        return self.catalog.version()
+    
+    def catalog_size(self, season: Optional[str] = None) -> int:
+        """Number of catalogued clips"""
+        self._maybe_sync(season)
+        return self.catalog.count(season)
     
     def _create_clip_metadata(
         self, 
@@ -200,8 +315,15 @@ class ClipIndexManager:
         if not opponent:
             opponent = self._extract_opponent_from_path(str(file_path))
         
-        # Generate clip ID
-        clip_id = f"{season}_{player_name.replace(' ', '_')}_{file_name}"
+        # Generate clip ID: readable prefix plus a digest of the path under the
+        # season root, since games/ and vs_opponents/ clips all share
+        # player_name "team" and file names repeat across directories
+        try:
+            relative_path = file_path.relative_to(self.clips_base_path / season).as_posix()
+        except ValueError:
+            relative_path = str(file_path)
+        path_digest = hashlib.sha1(relative_path.encode("utf-8")).hexdigest()[:10]
+        clip_id = f"{season}_{player_name.replace(' ', '_')}_{file_name}_{path_digest}"
         
         # Get file stats
         file_size_mb = file_path.stat().st_size / (1024 * 1024)
@@ -229,185 +351,242 @@ class ClipIndexManager:
         return match.group(0) if match else ""
     
     def _extract_opponent_from_path(self, path: str) -> str:
-        """Extract opponent from file path"""
+        """Extract opponent from file path (canonical team name when recognized)"""
+        
+        import re
+        extractor = get_entity_extractor()
         
-        # Look for vs_team patterns or team names in path
+        # Look for vs_team patterns (vs_tor_2024-10-09, vs_new_jersey)
         if 'vs_' in path:
             parts = path.split('vs_')
             if len(parts) > 1:
-                opponent_part = parts[1].split('/')[0].split('_')[0]
+                segment = re.sub(r'_?20\d{2}-\d{2}-\d{2}.*$', '', parts[1].split('/')[0])
+                team = extractor.resolve_team(segment)
+                if team:
+                    return team.name
+                opponent_part = segment.split('_')[0]
                 return opponent_part.replace('_', ' ').title()
         
         # Look for known team names in path
-        nhl_teams = [
-            'toronto', 'boston', 'buffalo', 'ottawa', 'detroit',
-            'florida', 'tampa', 'washington', 'carolina', 'columbus',
-            'pittsburgh', 'philadelphia', 'new_jersey', 'ny_rangers',
-            'ny_islanders', 'colorado', 'vegas', 'minnesota', 'winnipeg',
-            'calgary', 'edmonton', 'vancouver', 'seattle', 'anaheim',
-            'los_angeles', 'san_jose', 'arizona', 'utah', 'st_louis',
-            'chicago', 'dallas', 'nashville'
-        ]
-        
-        path_lower = path.lower()
-        for team in nhl_teams:
-            if team in path_lower:
-                return team.replace('_', ' ').title()
-        
-        return ""
+        opponents = extractor.opponents(path, fuzzy=False)
+        return opponents[0].name if opponents else ""
     
     async def search_clips(self, search_params: ClipSearchParams) -> List[ClipResult]:
         """Search for clips based on parameters"""
         
-        # Get all available clips (with caching)
-        all_clips = self._get_cached_clips()
+        # First search in this process: wait for the initial sync, off the event loop
+        if self.default_season not in self._last_sync:
+            await asyncio.to_thread(self.sync_catalog)
         
-        # Filter clips based on search parameters
-        filtered_clips = self._filter_clips(all_clips, search_params)
+        # Refresh clips and indexes (no-op unless the catalog changed)
+        self._get_cached_clips()
         
-        # Convert to ClipResult objects
-        results = []
-        for clip in filtered_clips[:search_params.limit]:
-            result = self._create_clip_result(clip)
-            results.append(result)
+        # Filter via inverted indexes, then rank
+        candidate_ids = self._filter_clip_ids(search_params)
+        ranked = self._rank_clips(candidate_ids, search_params)
         
-        return results
+        return [
+            self._create_clip_result(self._clips_by_id[clip_id], score)
+            for clip_id, score in ranked[:search_params.limit]
+        ]
     
     def _get_cached_clips(self) -> List[ClipMetadata]:
-        """Get clips with caching"""
+        """Get clips, reloading from the catalog only when its version changes"""
         
-        now = datetime.now()
+        self._maybe_sync()
+        version = self.catalog.version()
         
-        # Check if cache is still valid
-        if (self.last_indexed and 
-            (now - self.last_indexed).seconds < self.index_cache_ttl and
-            self.clip_cache):
-            return self.clip_cache
-        
-        # Rebuild cache
-        self.clip_cache = self.discover_clips()
-        self.last_indexed = now
+        if self._cached_version != version:
+            self.clip_cache = self.catalog.all_clips(self.default_season)
+            self._build_indexes(self.clip_cache)
+            self._cached_version = version
         
         return self.clip_cache
     
-    def _filter_clips(self, clips: List[ClipMetadata], params: ClipSearchParams) -> List[ClipMetadata]:
-        """Filter clips based on search parameters"""
-        
-        import logging
-        logger = logging.getLogger(__name__)
+    def _build_indexes(self, clips: List[ClipMetadata]) -> None:
+        """Build player/event/opponent/date inverted indexes"""
+        by_id, players, events, opponents, dates = {}, {}, {}, {}, {}
+        
+        for clip in clips:
+            by_id[clip.clip_id] = clip
+            players.setdefault(clip.player_name.lower(), set()).add(clip.clip_id)
+            events.setdefault(clip.event_type.lower(), set()).add(clip.clip_id)
+            opponents.setdefault(clip.opponent.lower(), set()).add(clip.clip_id)
+            if clip.game_date:
+                dates.setdefault(clip.game_date, set()).add(clip.clip_id)
+        
+        # Canonical keys: one resolution per distinct name, not per clip
+        extractor = get_entity_extractor()
+        player_ids, opponent_teams, clip_player_id, clip_opponent_team = {}, {}, {}, {}
+        for name, clip_ids in players.items():
+            player = extractor.resolve_player(name)
+            if player:
+                player_ids.setdefault(player.entity_id, set()).update(clip_ids)
+                for clip_id in clip_ids:
+                    clip_player_id[clip_id] = player.entity_id
+        for name, clip_ids in opponents.items():
+            team = extractor.resolve_team(name) if name else None
+            if team:
+                opponent_teams.setdefault(team.entity_id, set()).update(clip_ids)
+                for clip_id in clip_ids:
+                    clip_opponent_team[clip_id] = team.entity_id
+        
+        self._clips_by_id = by_id
+        self._player_index = players
+        self._event_index = events
+        self._opponent_index = opponents
+        self._date_index = dates
+        self._sorted_dates = sorted(dates)
+        self._player_id_index = player_ids
+        self._opponent_team_index = opponent_teams
+        self._clip_player_id = clip_player_id
+        self._clip_opponent_team = clip_opponent_team
+    
+    def _filter_clip_ids(self, params: ClipSearchParams) -> set:
+        """Intersect index postings for each active filter"""
         
-        filtered = clips
-        logger.info(f"Starting with {len(filtered)} clips")
+        candidates = set(self._clips_by_id)
         
-        # Filter by player names
+        # Filter by player names (exact name, or same canonical player)
         if params.player_names:
-            player_names_lower = [name.lower() for name in params.player_names]
-            logger.info(f"Filtering by players: {player_names_lower}")
-            
-            before_count = len(filtered)
-            filtered = [
-                clip for clip in filtered 
-                if clip.player_name.lower() in player_names_lower
-            ]
-            logger.info(f"After player filter: {len(filtered)} clips (was {before_count})")
-            
-            # Debug player matching
-            if len(filtered) == 0 and before_count > 0:
-                logger.warning("Player filter eliminated all clips!")
-                for clip in clips:
-                    logger.info(f"Available clip player: '{clip.player_name.lower()}' vs search: {player_names_lower}")
+            extractor = get_entity_extractor()
+            matched = set()
+            for name in params.player_names:
+                matched |= self._player_index.get(name.lower(), set())
+                player = extractor.resolve_player(name)
+                if player:
+                    matched |= self._player_id_index.get(player.entity_id, set())
+            candidates &= matched
+            if not candidates:
+                logger.info(f"No clips for players {params.player_names} "
+                            f"({len(self._player_index)} players indexed)")
         
         # Filter by event types (skip if generic terms like "shifts")
-        if params.event_types:
+        if params.event_types and candidates:
             event_types_lower = [event.lower() for event in params.event_types]
-            
-            # Skip event filtering for generic terms that should match all clips
             generic_terms = ['shifts', 'highlights', 'clips', 'video', 'footage']
-            is_generic_query = any(term in event_types_lower for term in generic_terms)
             
-            if not is_generic_query:
-                before_count = len(filtered)
-                filtered = [
-                    clip for clip in filtered 
-                    if clip.event_type.lower() in event_types_lower
-                ]
-                logger.info(f"After event filter: {len(filtered)} clips (was {before_count})")
-            else:
-                logger.info(f"Skipping event filter - generic query for all clips")
-        
-        # Filter by opponents
-        if params.opponents:
-            opponents_lower = [opp.lower() for opp in params.opponents]
-            before_count = len(filtered)
-            filtered = [
-                clip for clip in filtered 
-                if any(opp in clip.opponent.lower() for opp in opponents_lower)
-            ]
-            logger.info(f"After opponent filter: {len(filtered)} clips (was {before_count})")
+            if not any(term in event_types_lower for term in generic_terms):
+                matched = set()
+                for event in event_types_lower:
+                    matched |= self._event_index.get(event, set())
+                candidates &= matched
+        
+        # Filter by opponents: canonical team postings, else substring match
+        # over distinct opponent keys
+        if params.opponents and candidates:
+            extractor = get_entity_extractor()
+            matched = set()
+            unresolved = []
+            for opp in params.opponents:
+                team = extractor.resolve_team(opp)
+                if team:
+                    matched |= self._opponent_team_index.get(team.entity_id, set())
+                else:
+                    unresolved.append(opp.lower())
+            if unresolved:
+                for opponent_key, clip_ids in self._opponent_index.items():
+                    if any(opp in opponent_key for opp in unresolved):
+                        matched |= clip_ids
+            candidates &= matched
         
         # Filter by game dates
-        if params.game_dates:
-            before_count = len(filtered)
-            filtered = [
-                clip for clip in filtered 
-                if clip.game_date in params.game_dates
-            ]
-            logger.info(f"After date filter: {len(filtered)} clips (was {before_count})")
+        if params.game_dates and candidates:
+            matched = set()
+            for game_date in params.game_dates:
+                matched |= self._date_index.get(game_date, set())
+            candidates &= matched
         
         # Apply time filter
-        if params.time_filter:
-            before_count = len(filtered)
-            filtered = self._apply_time_filter(filtered, params.time_filter)
-            logger.info(f"After time filter '{params.time_filter}': {len(filtered)} clips (was {before_count})")
+        if params.time_filter and candidates:
+            candidates = self._apply_time_filter(candidates, params.time_filter)
         
-        logger.info(f"Final filtered result: {len(filtered)} clips")
-        return filtered
+        logger.debug(f"Clip search matched {len(candidates)} of {len(self._clips_by_id)} clips")
+        return candidates
     
-    def _apply_time_filter(self, clips: List[ClipMetadata], time_filter: str) -> List[ClipMetadata]:
-        """Apply time-based filtering with smart game identification"""
-        
-        import logging
-        logger = logging.getLogger(__name__)
+    def _apply_time_filter(self, candidates: set, time_filter: str) -> set:
+        """Keep clips from the most recent game dates among the candidates"""
         
         if time_filter == "last_game":
-            # Get clips from the most recent game date
-            if clips:
-                # Find all unique game dates
-                game_dates = [clip.game_date for clip in clips if clip.game_date]
-                
-                if game_dates:
-                    latest_date = max(game_dates)
-                    logger.info(f"Identified last game date: {latest_date}")
-                    
-                    last_game_clips = [clip for clip in clips if clip.game_date == latest_date]
-                    logger.info(f"Found {len(last_game_clips)} clips from last game ({latest_date})")
-                    
-                    return last_game_clips
-                else:
-                    logger.warning("No game dates found in clips")
-                    # If no dates, return all clips (fallback)
-                    return clips
+            num_games = 1
         elif time_filter in ["last_2_games", "last_3_games", "last_5_games", "last_10_games"]:
-            # Extract number of games
             num_games = int(time_filter.split('_')[1])
+        else:
+            # this_season and unrecognized filters keep every clip
+            return candidates
+        
+        # Walk the pre-sorted date index newest-first
+        selected = set()
+        games_found = 0
+        for game_date in reversed(self._sorted_dates):
+            hits = self._date_index[game_date] & candidates
+            if hits:
+                selected |= hits
+                games_found += 1
+                if games_found == num_games:
+                    break
+        
+        if not games_found:
+            logger.warning("No game dates found in clips")
+            # If no dates, return all clips (fallback)
+            return candidates
+        
+        return selected
+    
+    def _rank_clips(self, clip_ids: set, params: ClipSearchParams) -> List[tuple]:
+        """
+        Score candidates in [0, 1] and sort best-first.
+        
+        Weights: requested player (0.35), requested event type (0.2),
+        exact vs partial opponent match (0.15 / 0.08), requested date (0.1),
+        and recency of the game date across the library (up to 0.2).
+        """
+        players = {name.lower() for name in params.player_names}
+        events = {event.lower() for event in params.event_types}
+        opponents = [opp.lower() for opp in params.opponents]
+        extractor = get_entity_extractor()
+        player_ids = set()
+        for name in params.player_names:
+            player = extractor.resolve_player(name)
+            if player:
+                player_ids.add(player.entity_id)
+        opponent_teams = set()
+        for opp in params.opponents:
+            team = extractor.resolve_team(opp)
+            if team:
+                opponent_teams.add(team.entity_id)
+        dates = set(params.game_dates)
+        n_dates = len(self._sorted_dates)
+        
+        ranked = []
+        for clip_id in clip_ids:
+            clip = self._clips_by_id[clip_id]
+            score = 0.0
             
-            if clips:
-                # Get unique game dates and sort
-                game_dates = sorted(set(clip.game_date for clip in clips if clip.game_date), reverse=True)
-                recent_dates = game_dates[:num_games]
-                
-                logger.info(f"Found {len(recent_dates)} recent game dates for {time_filter}")
-                
-                return [clip for clip in clips if clip.game_date in recent_dates]
-        elif time_filter == "this_season":
-            # For now, return all clips (assuming they're all from current season)
-            logger.info("Returning all clips for 'this_season' filter")
-            return clips
-        
-        # Default: return all clips for unrecognized filters
-        return clips
+            if clip.player_name.lower() in players or self._clip_player_id.get(clip_id) in player_ids:
+                score += 0.35
+            if clip.event_type.lower() in events:
+                score += 0.2
+            if opponents:
+                opponent = clip.opponent.lower()
+                if opponent in opponents or self._clip_opponent_team.get(clip_id) in opponent_teams:
+                    score += 0.15
+                elif any(opp in opponent for opp in opponents):
+                    score += 0.08
+            if clip.game_date in dates:
+                score += 0.1
+            if clip.game_date and n_dates:
+                position = bisect.bisect_left(self._sorted_dates, clip.game_date)
+                score += 0.2 * (position + 1) / n_dates
+            
+            ranked.append((clip_id, round(min(score, 1.0), 4)))
+        
+        # Best score first; clip_id keeps ties deterministic
+        ranked.sort(key=lambda item: item[0])
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
     
-    def _create_clip_result(self, clip: ClipMetadata) -> ClipResult:
+    def _create_clip_result(self, clip: ClipMetadata, relevance_score: float = 0.0) -> ClipResult:
         """Create a ClipResult from ClipMetadata"""
         
         # Generate web-accessible URLs (this would be handled by your API)
@@ -440,5 +619,20 @@ class ClipIndexManager:
             thumbnail_url=thumbnail_url,
             duration=clip.duration_seconds,
             metadata=clip,
-            relevance_score=1.0  # Basic relevance, can be enhanced later
+            relevance_score=relevance_score
         )
+
+
+_clip_index_managers: Dict[str, ClipIndexManager] = {}
+_clip_index_lock = threading.Lock()
+
+
+def get_clip_index_manager(clips_base_path: str = "data/clips") -> ClipIndexManager:
+    """Shared ClipIndexManager per clips directory (one catalog connection per process)"""
+    key = str(Path(clips_base_path).resolve())
+    with _clip_index_lock:
+        manager = _clip_index_managers.get(key)
+        if manager is None:
+            manager = ClipIndexManager(clips_base_path)
+            _clip_index_managers[key] = manager
+        return manager
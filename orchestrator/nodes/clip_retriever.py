@@ -22,8 +22,11 @@ from orchestrator.utils.state import (
     add_error
 )
 from orchestrator.config.settings import settings
+from orchestrator.utils.cache import TTLCache
+from orchestrator.utils.entity_extractor import get_entity_extractor
+from orchestrator.utils.result_store import put_result
 from orchestrator.models.clip_models import (
-    ClipIndexManager,
+    get_clip_index_manager,
     ClipSearchParams,
     ClipResult,
     ClipMetadata
@@ -31,6 +34,15 @@ from orchestrator.models.clip_models import (
 
 logger = logging.getLogger(__name__)
 
+# Search results shared across node instances (the orchestrator builds a
+# node per step); keys include the catalog version, so clip changes miss
+_clip_search_cache = TTLCache(max_entries=256, ttl_seconds=300)
+
+
+def _canonical_values(values: List[str]) -> tuple:
+    """Order- and case-insensitive form of a filter list"""
+    return tuple(sorted({value.strip().lower() for value in values if value and value.strip()}))
+
 class ClipRetrieverNode:
     """
     Retrieves video clips based on natural language queries.
@@ -46,46 +58,20 @@ class ClipRetrieverNode:
     def __init__(self):
         # Initialize clip index manager
         clips_base_path = getattr(settings, 'clips_base_path', 'data/clips')
-        self.clip_index = ClipIndexManager(clips_base_path)
+        self.clip_index = get_clip_index_manager(clips_base_path)
         
         # Cache for recent queries
-        self.query_cache = {}
-        self.cache_ttl = 300  # 5 minutes
-        
-        # Montreal Canadiens players for name matching
-        self.mtl_players = {
-            # Forwards
-            'nick suzuki', 'cole caufield', 'juraj slafkovsky', 'kirby dach',
-            'alex newhook', 'brendan gallagher', 'josh anderson', 'jake evans',
-            'joel armia', 'christian dvorak', 'emil heineman', 'oliver kapanen',
-            'owen beck', 'joshua roy', 'rafael harvey-pinard',
-            
-            # Defensemen
-            'lane hutson', 'kaiden guhle', 'mike matheson', 'david savard',
-            'arber xhekaj', 'jayden struble', 'justin barron', 'logan mailloux',
-            'adam engstrom',
-            
-            # Goalies
-            'samuel montembeault', 'cayden primeau', 'jakub dobes',
-            
-            # Common short names and nicknames
-            'suzuki', 'caufield', 'slafkovsky', 'dach', 'hutson', 'guhle',
-            'matheson', 'gallagher', 'anderson', 'montembeault', 'primeau'
-        }
-        
-        # NHL opponents for filtering
-        self.nhl_teams = {
-            'toronto', 'boston', 'buffalo', 'ottawa', 'detroit', 'florida',
-            'tampa bay', 'washington', 'carolina', 'columbus', 'pittsburgh',
-            'philadelphia', 'new jersey', 'ny rangers', 'ny islanders',
-            'colorado', 'vegas', 'minnesota', 'winnipeg', 'calgary',
-            'edmonton', 'vancouver', 'seattle', 'anaheim', 'los angeles',
-            'san jose', 'arizona', 'utah', 'st louis', 'chicago',
-            'dallas', 'nashville'
-        }
+        self.query_cache = _clip_search_cache
+        self.cache_ttl = self.query_cache.ttl_seconds  # 5 minutes
         
         self._validate_clips_directory()
     
+    @property
+    def entity_extractor(self):
+        """League-wide player/team recognition (shared automaton, reloaded
+        once the dimension tables become available)"""
+        return get_entity_extractor()
+    
     def _validate_clips_directory(self) -> None:
         """Validate that clips directory exists"""
         
@@ -93,9 +79,8 @@ class ClipRetrieverNode:
         if not clips_path.exists():
             logger.warning(f"Clips directory not found: {clips_path}")
         else:
-            # Count available clips for logging
-            available_clips = self.clip_index.discover_clips()
-            logger.info(f"Clips directory validated - {len(available_clips)} clips found at {clips_path}")
+            # Count catalogued clips for logging (no filesystem walk)
+            logger.info(f"Clips directory validated - {self.clip_index.catalog_size()} clips found at {clips_path}")
     
     async def process(self, state: AgentState) -> AgentState:
         """Process video clip retrieval queries"""
@@ -128,23 +113,22 @@ class ClipRetrieverNode:
             # Calculate execution time
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
-            # Create tool result
+            # Create tool result (the clip list lives in the result store)
+            handle = put_result(state, ToolType.CLIP_RETRIEVAL, {
+                "clips": [self._clip_result_to_dict(clip) for clip in clip_results],
+                "search_params": self._search_params_to_dict(search_params),
+                "total_found": len(clip_results)
+            })
             tool_result = ToolResult(
                 tool_type=ToolType.CLIP_RETRIEVAL,
                 success=len(clip_results) > 0,
-                data={
-                    "clips": [self._clip_result_to_dict(clip) for clip in clip_results],
-                    "search_params": self._search_params_to_dict(search_params),
-                    "total_found": len(clip_results)
-                },
+                data=handle,
                 execution_time_ms=execution_time,
                 citations=self._generate_citations(clip_results)
             )
             
             # Update state (ensure analytics_data is properly initialized)
-            if "analytics_data" not in state:
-                state["analytics_data"] = {}
-            state["analytics_data"]["clips"] = clip_results
+            state.setdefault("analytics_data", {})["clips"] = handle
             state = add_tool_result(state, tool_result)
             
             logger.info(f"Clip retrieval completed in {execution_time}ms - found {len(clip_results)} clips")
@@ -175,14 +159,14 @@ class ClipRetrieverNode:
         
         query_lower = query.lower()
         
-        # Extract player names
-        player_names = self._extract_player_names(query_lower, user_context)
+        # Extract player names (original casing: "Power" vs "power play")
+        player_names = self._extract_player_names(query, user_context)
         
         # Extract event types
         event_types = self._extract_event_types(query_lower)
         
         # Extract opponents
-        opponents = self._extract_opponents(query_lower)
+        opponents = self._extract_opponents(query)
         
         # Extract time filter
         time_filter = self._extract_time_filter(query_lower)
@@ -200,25 +184,23 @@ class ClipRetrieverNode:
         )
     
     def _extract_player_names(self, query: str, user_context) -> List[str]:
-        """Extract player names from query"""
+        """Extract player names from query (canonical full names)"""
         
         found_players = []
+        query_lower = query.lower()
         
         # Check for "my" or "me" indicating user's own clips
-        if any(word in query for word in ['my', 'me', 'i ']):
-            user_name = getattr(user_context, 'name', '').lower()
+        if any(word in query_lower for word in ['my', 'me', 'i ']):
+            user_name = getattr(user_context, 'name', '')
             if user_name:
-                # Convert user name to match clip naming convention
-                formatted_name = user_name.replace(' ', '_').lower()
-                if formatted_name in [p.replace(' ', '_') for p in self.mtl_players]:
-                    found_players.append(user_name.title())
+                player = self.entity_extractor.resolve_player(user_name)
+                if player:
+                    found_players.append(player.name)
         
         # Check for explicit player names
-        for player in self.mtl_players:
-            if player in query:
-                found_players.append(player.title())
+        found_players.extend(self.entity_extractor.player_names(query))
         
-        return list(set(found_players))  # Remove duplicates
+        return list(dict.fromkeys(found_players))  # Remove duplicates
     
     def _extract_event_types(self, query: str) -> List[str]:
         """Extract event types from query with enhanced hockey terminology"""
@@ -271,24 +253,9 @@ class ClipRetrieverNode:
         return found_events
     
     def _extract_opponents(self, query: str) -> List[str]:
-        """Extract opponent team names from query"""
-        
-        found_opponents = []
-        
-        for team in self.nhl_teams:
-            if team in query:
-                found_opponents.append(team.title())
-        
-        # Check for "vs" or "against" patterns
-        vs_patterns = [r'vs\s+(\w+)', r'against\s+(\w+)', r'versus\s+(\w+)']
-        
-        for pattern in vs_patterns:
-            matches = re.findall(pattern, query, re.IGNORECASE)
-            for match in matches:
-                if match.lower() in self.nhl_teams:
-                    found_opponents.append(match.title())
+        """Extract opponent team names from query (canonical team names)"""
         
-        return list(set(found_opponents))  # Remove duplicates
+        return [team.name for team in self.entity_extractor.opponents(query)]
     
     def _extract_time_filter(self, query: str) -> str:
         """Extract time-based filters from query with enhanced hockey terminology"""
@@ -353,13 +320,44 @@ class ClipRetrieverNode:
         # Apply user-based permissions
         filtered_params = self._apply_user_permissions(search_params, user_context)
         
+        # Serve repeated searches from memory
+        cache_key = self._search_cache_key(filtered_params, user_context)
+        cached_results = self.query_cache.get(cache_key)
+        if cached_results is not None:
+            logger.info(f"Clip search cache hit ({len(cached_results)} clips)")
+            return list(cached_results)
+        
         # Execute search
         clip_results = await self.clip_index.search_clips(filtered_params)
         
         # Sort by relevance (basic implementation)
         clip_results.sort(key=lambda x: x.relevance_score, reverse=True)
         
-        return clip_results
+        self.query_cache.set(cache_key, clip_results)
+        return list(clip_results)
+    
+    def _search_cache_key(self, search_params: ClipSearchParams, user_context) -> tuple:
+        """
+        Canonical cache key: catalog version, permission scope and the
+        normalized search filters (case and order do not matter to search).
+        """
+        
+        user_role = getattr(user_context, 'role', None)
+        role_value = user_role.value if user_role else ''
+        # Players are scoped to their own clips; staff roles share results
+        scope_name = getattr(user_context, 'name', '').lower() if role_value == 'player' else ''
+        
+        return (
+            self.clip_index.catalog_version(),
+            role_value,
+            scope_name,
+            _canonical_values(search_params.player_names),
+            _canonical_values(search_params.event_types),
+            _canonical_values(search_params.opponents),
+            _canonical_values(search_params.game_dates),
+            search_params.time_filter.strip().lower(),
+            search_params.limit
+        )
     
     def _apply_user_permissions(
         self, 
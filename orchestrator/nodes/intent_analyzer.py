@@ -6,7 +6,8 @@ Analyzes user queries to determine intent, required tools, and processing approa
 """
 
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Tuple, Union
 import logging
 
 from orchestrator.utils.state import AgentState, QueryType, ToolType, update_state_step
@@ -14,6 +15,196 @@ from orchestrator.config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Phrase groups shared by every intent rule. A trailing "s?" means the plural
+# is optional and "#" stands for any number ("last # games").
+PHRASE_GROUPS: Dict[str, List[str]] = {
+    # Query types
+    "player_role": ["player", "skater", "goalie", "forward", "defenseman", "center", "wing"],
+    "player_performance": ["performance", "stats", "analytics", "metrics"],
+    "core_players": ["suzuki", "caufield", "hutson", "slafkovsky", "guhle", "matheson"],
+    "team": ["team", "canadiens", "habs", "mtl", "montreal"],
+    "team_record": ["record", "standings", "performance", "season"],
+    "special_teams": ["powerplay", "penalty kill", "special teams"],
+    "game": ["game", "match", "vs", "against"],
+    "game_review": ["recap", "analysis", "breakdown", "review"],
+    "game_when": ["last game", "tonight", "yesterday"],
+    "compare": ["compare", "vs", "versus", "against"],
+    "matchup": ["matchup", "head to head", "h2h"],
+    "better_worse": ["better", "worse", "advantage"],
+    "strategy": ["strategy", "tactics", "system", "scheme"],
+    "zone_play": ["zone entry", "exit", "forecheck", "backcheck"],
+    "deployment": ["line combinations", "deployment"],
+    "stats": ["stats", "statistics", "numbers", "data"],
+    "advanced_stats": ["xg", "corsi", "fenwick", "pdo", "shooting percentage"],
+    "stat_question": ["how many", "what is", "show me"],
+    "clip_media": ["clips?", "highlights?", "video", "footage", "replay", "shifts?"],
+    "clip_view": ["show me", "watch", "see", "display"],
+    "clip_target": ["clips?", "video", "shifts?"],
+    "clip_target_highlights": ["clips?", "video", "highlights?", "shifts?"],
+    "my_clips": ["my clips?", "my highlights?", "my video", "my shifts?"],
+    "recent_games": ["from last game", "last # games"],
+    # Tools
+    "explain": ["explain", "what is", "how does", "definition", "rules"],
+    "context": ["context", "background", "history"],
+    "hockey_domain": ["hockey", "nhl", "strategy", "tactics"],
+    "data_terms": ["stats", "statistics", "numbers", "data", "metrics"],
+    "time_span": ["last # games", "this season", "career"],
+    "box_score": ["goals", "assists", "points", "shots", "hits"],
+    "expected_goals": ["xg", "expected goals", "corsi", "fenwick", "pdo"],
+    "percentages": ["shooting percentage", "save percentage"],
+    "possession": ["zone entry", "exit", "possession"],
+    "versus": ["vs", "versus", "against", "compared to"],
+    "opponent": ["matchup", "head to head", "opponent"],
+    "edge": ["advantage", "disadvantage", "better", "worse"],
+    "chart": ["show", "chart", "graph", "plot", "heatmap"],
+    "visualize": ["visualize", "display", "see"],
+    "event_words": ["goals?", "assists?", "saves?", "hits?"],
+    "visual_verbs": ["show", "display", "watch", "see"],
+    # Complexity / context / data needs
+    "simple": ["what is", "who is", "when"],
+    "moderate": ["how", "why", "compare", "analyze"],
+    "complex": ["strategy", "tactical", "multi-step", "correlation", "trend"],
+    "context_question": ["explain", "what is", "how does", "definition", "rules", "strategy", "tactics"],
+    "context_why": ["why", "context", "background", "meaning"],
+    "data_metrics": ["stats", "statistics", "numbers", "metrics", "data"],
+    "data_analysis": ["performance", "analysis", "compare", "vs"],
+}
+
+# A rule is a phrase group (scored by occurrence count) or an ordered pair
+# (a phrase from the first group followed later by one from the second,
+# scored 0/1)
+Rule = Union[str, Tuple[str, str]]
+
+QUERY_TYPE_RULES: Dict[QueryType, List[Rule]] = {
+    QueryType.PLAYER_ANALYSIS: ["player_role", "player_performance", "core_players"],
+    QueryType.TEAM_PERFORMANCE: ["team", "team_record", "special_teams"],
+    QueryType.GAME_ANALYSIS: ["game", "game_review", "game_when"],
+    QueryType.MATCHUP_COMPARISON: ["compare", "matchup", "better_worse"],
+    QueryType.TACTICAL_ANALYSIS: ["strategy", "zone_play", "deployment"],
+    QueryType.STATISTICAL_QUERY: ["stats", "advanced_stats", "stat_question"],
+    QueryType.CLIP_RETRIEVAL: [
+        "clip_media",
+        ("clip_view", "clip_target"),
+        "my_clips",
+        ("recent_games", "clip_target"),
+    ],
+}
+
+TOOL_RULES: Dict[ToolType, List[Rule]] = {
+    ToolType.VECTOR_SEARCH: ["explain", "context", "hockey_domain"],
+    ToolType.PARQUET_QUERY: ["data_terms", "time_span", "box_score"],
+    ToolType.CALCULATE_METRICS: ["expected_goals", "percentages", "possession"],
+    ToolType.MATCHUP_ANALYSIS: ["versus", "opponent", "edge"],
+    ToolType.VISUALIZATION: ["chart", "visualize"],
+    ToolType.CLIP_RETRIEVAL: [
+        "clip_media",
+        ("clip_view", "clip_target_highlights"),
+        "my_clips",
+        ("recent_games", "clip_target"),
+        ("event_words", "clip_target"),
+    ],
+}
+
+COMPLEXITY_LEVELS = ["simple", "moderate", "complex"]
+
+# Anchored at the start of the query, so these fail fast as plain regexes
+_PURE_STATS_RE = re.compile(
+    r'^\s*(?:(?:what|how many|show me).*\b(?:goals|assists|points|games)\b'
+    r'|\b(?:stats|statistics)\b.*\b(?:for|of)\b)',
+    re.IGNORECASE
+)
+
+_TOKEN_RE = re.compile(r"\w+")
+_PHRASE_TOKEN_RE = re.compile(r"\w+|#")
+
+
+def _phrase_variants(phrase: str) -> List[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+    """(tokens, separators) per phrase variant ("clips?" -> clip, clips)"""
+    variants = [phrase[:-1], phrase[:-2]] if phrase.endswith("s?") else [phrase]
+    compiled = []
+    for variant in variants:
+        parts = list(_PHRASE_TOKEN_RE.finditer(variant.lower()))
+        tokens = tuple(part.group() for part in parts)
+        separators = tuple(variant[prev.end():part.start()] for prev, part in zip(parts, parts[1:]))
+        compiled.append((tokens, separators))
+    return compiled
+
+
+class IntentMatcher:
+    """
+    Single-pass phrase matcher for intent rules.
+
+    All phrase groups are compiled at import time into one table keyed by
+    each phrase's first token. A query is tokenized once and each token is
+    looked up once, so a single scan yields every group's match spans;
+    query-type scores, tool rules, complexity and data/context needs are
+    then derived from those spans.
+    """
+
+    def __init__(self, phrase_groups: Dict[str, List[str]]):
+        # first token -> [(phrase tokens, separators, groups)]
+        self._table: Dict[str, List[Tuple[Tuple[str, ...], Tuple[str, ...], List[str]]]] = {}
+        groups_by_phrase: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], List[str]] = {}
+        for group, phrases in phrase_groups.items():
+            for phrase in phrases:
+                for variant in _phrase_variants(phrase):
+                    groups = groups_by_phrase.setdefault(variant, [])
+                    if group not in groups:
+                        groups.append(group)
+        for (tokens, separators), groups in groups_by_phrase.items():
+            self._table.setdefault(tokens[0], []).append((tokens, separators, groups))
+
+    def scan(self, query: str) -> Dict[str, List[Tuple[int, int]]]:
+        """Group -> [(start_token, end_token)] for every phrase occurrence"""
+        query = query.lower()
+        matches = list(_TOKEN_RE.finditer(query))
+        tokens = ["#" if match.group().isdigit() else match.group() for match in matches]
+        spans: Dict[str, List[Tuple[int, int]]] = {}
+        table = self._table
+        for start, token in enumerate(tokens):
+            candidates = table.get(token)
+            if not candidates:
+                continue
+            for phrase, separators, groups in candidates:
+                end = start + len(phrase)
+                if separators and (
+                    tuple(tokens[start:end]) != phrase or
+                    any(query[matches[start + i].end():matches[start + i + 1].start()] != separator
+                        for i, separator in enumerate(separators))
+                ):
+                    continue
+                for group in groups:
+                    spans.setdefault(group, []).append((start, end))
+        return spans
+
+    @staticmethod
+    def followed_by(spans: Dict[str, List[Tuple[int, int]]], first: str, second: str) -> bool:
+        """A phrase of `first` ends at or before a phrase of `second` starts"""
+        first_spans = spans.get(first)
+        second_spans = spans.get(second)
+        if not first_spans or not second_spans:
+            return False
+        return min(end for _, end in first_spans) <= max(start for start, _ in second_spans)
+
+    def score(self, spans: Dict[str, List[Tuple[int, int]]], rules: List[Rule]) -> int:
+        total = 0
+        for rule in rules:
+            if isinstance(rule, tuple):
+                total += int(self.followed_by(spans, *rule))
+            else:
+                total += len(spans.get(rule, ()))
+        return total
+
+
+_intent_matcher = IntentMatcher(PHRASE_GROUPS)
+
+
+@lru_cache(maxsize=1024)
+def _scan_query(query: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Memoized scan so every intent check on one query shares a single pass"""
+    return _intent_matcher.scan(query)
+
+
 class IntentAnalyzerNode:
     """
     Analyzes user intent to determine:
@@ -23,78 +214,9 @@ class IntentAnalyzerNode:
     """
     
     def __init__(self):
-        self.query_patterns = {
-            QueryType.PLAYER_ANALYSIS: [
-                r'\b(player|skater|goalie|forward|defenseman|center|wing)\b',
-                r'\b(performance|stats|analytics|metrics)\b',
-                r'\b(suzuki|caufield|hutson|slafkovsky|guhle|matheson)\b'
-            ],
-            QueryType.TEAM_PERFORMANCE: [
-                r'\b(team|canadiens|habs|mtl|montreal)\b',
-                r'\b(record|standings|performance|season)\b',
-                r'\b(powerplay|penalty kill|special teams)\b'
-            ],
-            QueryType.GAME_ANALYSIS: [
-                r'\b(game|match|vs|against)\b',
-                r'\b(recap|analysis|breakdown|review)\b',
-                r'\b(last game|tonight|yesterday)\b'
-            ],
-            QueryType.MATCHUP_COMPARISON: [
-                r'\b(compare|vs|versus|against)\b',
-                r'\b(matchup|head to head|h2h)\b',
-                r'\b(better|worse|advantage)\b'
-            ],
-            QueryType.TACTICAL_ANALYSIS: [
-                r'\b(strategy|tactics|system|scheme)\b',
-                r'\b(zone entry|exit|forecheck|backcheck)\b',
-                r'\b(line combinations|deployment)\b'
-            ],
-            QueryType.STATISTICAL_QUERY: [
-                r'\b(stats|statistics|numbers|data)\b',
-                r'\b(xG|corsi|fenwick|PDO|shooting percentage)\b',
-                r'\b(how many|what is|show me)\b'
-            ],
-            QueryType.CLIP_RETRIEVAL: [
-                r'\b(clips?|highlights?|video|footage|replay|shifts?)\b',
-                r'\b(show me|watch|see|display)\b.*\b(clips?|video|shifts?)\b',
-                r'\b(my clips?|my highlights?|my video|my shifts?)\b',
-                r'\b(from last game|last \d+ games)\b.*\b(clips?|video|shifts?)\b'
-            ]
-        }
-        
-        self.tool_indicators = {
-            ToolType.VECTOR_SEARCH: [
-                r'\b(explain|what is|how does|definition|rules)\b',
-                r'\b(context|background|history)\b',
-                r'\b(hockey|NHL|strategy|tactics)\b'
-            ],
-            ToolType.PARQUET_QUERY: [
-                r'\b(stats|statistics|numbers|data|metrics)\b',
-                r'\b(last \d+ games|this season|career)\b',
-                r'\b(goals|assists|points|shots|hits)\b'
-            ],
-            ToolType.CALCULATE_METRICS: [
-                r'\b(xG|expected goals|corsi|fenwick|PDO)\b',
-                r'\b(shooting percentage|save percentage)\b',
-                r'\b(zone entry|exit|possession)\b'
-            ],
-            ToolType.MATCHUP_ANALYSIS: [
-                r'\b(vs|versus|against|compared to)\b',
-                r'\b(matchup|head to head|opponent)\b',
-                r'\b(advantage|disadvantage|better|worse)\b'
-            ],
-            ToolType.VISUALIZATION: [
-                r'\b(show|chart|graph|plot|heatmap)\b',
-                r'\b(visualize|display|see)\b'
-            ],
-            ToolType.CLIP_RETRIEVAL: [
-                r'\b(clips?|highlights?|video|footage|replay|shifts?)\b',
-                r'\b(show me|watch|see|display)\b.*\b(clips?|video|highlights?|shifts?)\b',
-                r'\b(my clips?|my highlights?|my video|my shifts?)\b',
-                r'\b(from last game|last \d+ games)\b.*\b(clips?|video|shifts?)\b',
-                r'\b(goals?|assists?|saves?|hits?)\b.*\b(clips?|video|shifts?)\b'
-            ]
-        }
+        self.matcher = _intent_matcher
+        self.query_rules = QUERY_TYPE_RULES
+        self.tool_rules = TOOL_RULES
     
     def process(self, state: AgentState) -> AgentState:
         """Process intent analysis for the user query"""
@@ -126,6 +248,14 @@ class IntentAnalyzerNode:
         
         state["intent_analysis"] = intent_analysis
         
+        # Warm the parquet tables this query will likely read while routing runs
+        if ToolType.PARQUET_QUERY in required_tools:
+            # Imported here so loading the intent analyzer does not pull in
+            # the parquet client and the entity tables
+            from orchestrator.tools.table_prefetcher import get_table_prefetcher
+            prefetched = get_table_prefetcher().prefetch(state["original_query"], query_type)
+            state["debug_info"]["prefetch"] = [":".join(key) for key in prefetched]
+        
         logger.info(f"Intent analysis complete: {query_type.value}, {len(required_tools)} tools required")
         
         return state
@@ -133,14 +263,11 @@ class IntentAnalyzerNode:
     def _classify_query_type(self, query: str) -> QueryType:
         """Classify the query into a specific type"""
         
-        scores = {}
-        
-        for query_type, patterns in self.query_patterns.items():
-            score = 0
-            for pattern in patterns:
-                matches = len(re.findall(pattern, query, re.IGNORECASE))
-                score += matches
-            scores[query_type] = score
+        spans = _scan_query(query)
+        scores = {
+            query_type: self.matcher.score(spans, rules)
+            for query_type, rules in self.query_rules.items()
+        }
         
         # Return the highest scoring type, or GENERAL_HOCKEY if no clear match
         if max(scores.values()) > 0:
@@ -151,33 +278,17 @@ class IntentAnalyzerNode:
     def _identify_required_tools(self, query: str, user_role) -> List[ToolType]:
         """Identify which tools are needed for this query"""
         
-        required_tools = []
+        spans = _scan_query(query)
         
         # First pass: Pattern-based tool detection
-        for tool_type, patterns in self.tool_indicators.items():
-            for pattern in patterns:
-                if re.search(pattern, query, re.IGNORECASE):
-                    required_tools.append(tool_type)
-                    break  # Avoid duplicates
-        
-        # Enhanced clip detection logic
-        clip_keywords = [
-            'clips?', 'highlights?', 'video', 'footage', 'replay', 'shifts?',
-            'my clips?', 'my highlights?', 'my shifts?', 'my video'
-        ]
-        
-        # Check if any clip keywords are present
-        query_has_clips = any(re.search(rf'\b{keyword}\b', query, re.IGNORECASE) 
-                             for keyword in clip_keywords)
-        
-        # Also check for event + visual context combinations
-        event_visual_patterns = [
-            r'\b(goals?|assists?|saves?|hits?)\b.*\b(show|display|watch|see)\b',
-            r'\b(show|display|watch|see)\b.*\b(goals?|assists?|saves?|hits?)\b'
+        required_tools = [
+            tool_type for tool_type, rules in self.tool_rules.items()
+            if self.matcher.score(spans, rules) > 0
         ]
         
-        has_event_visual = any(re.search(pattern, query, re.IGNORECASE) 
-                              for pattern in event_visual_patterns)
+        # Enhanced clip detection: clip keywords, or an event plus a visual verb
+        query_has_clips = "clip_media" in spans
+        has_event_visual = "event_words" in spans and "visual_verbs" in spans
         
         # Add clip retrieval if detected
         if ((query_has_clips or has_event_visual) and 
@@ -199,16 +310,10 @@ class IntentAnalyzerNode:
     def _assess_complexity(self, query: str) -> str:
         """Assess query complexity level"""
         
-        complexity_indicators = {
-            "simple": [r'\b(what is|who is|when)\b'],
-            "moderate": [r'\b(how|why|compare|analyze)\b'],
-            "complex": [r'\b(strategy|tactical|multi-step|correlation|trend)\b']
-        }
-        
-        for level, patterns in complexity_indicators.items():
-            for pattern in patterns:
-                if re.search(pattern, query, re.IGNORECASE):
-                    return level
+        spans = _scan_query(query)
+        for level in COMPLEXITY_LEVELS:
+            if level in spans:
+                return level
         
         # Default based on query length and structure
         if len(query.split()) > 15 or '?' in query and 'and' in query:
@@ -220,34 +325,17 @@ class IntentAnalyzerNode:
     
     def _needs_hockey_context(self, query: str) -> bool:
         """Determine if query needs hockey domain context"""
-        context_indicators = [
-            r'\b(explain|what is|how does|definition|rules|strategy|tactics)\b',
-            r'\b(why|context|background|meaning)\b'
-        ]
-        
-        return any(re.search(pattern, query, re.IGNORECASE) 
-                  for pattern in context_indicators)
+        spans = _scan_query(query)
+        return "context_question" in spans or "context_why" in spans
     
     def _needs_analytical_data(self, query: str) -> bool:
         """Determine if query needs real-time analytical data"""
-        data_indicators = [
-            r'\b(stats|statistics|numbers|metrics|data)\b',
-            r'\b(performance|analysis|compare|vs)\b',
-            r'\b(last \d+ games|this season|career)\b'
-        ]
-        
-        return any(re.search(pattern, query, re.IGNORECASE) 
-                  for pattern in data_indicators)
+        spans = _scan_query(query)
+        return "data_metrics" in spans or "data_analysis" in spans or "time_span" in spans
     
     def _is_pure_stats_query(self, query: str) -> bool:
         """Check if this is purely a statistical lookup"""
-        pure_stats_patterns = [
-            r'^\s*(what|how many|show me).*\b(goals|assists|points|games)\b',
-            r'^\s*\b(stats|statistics)\b.*\b(for|of)\b'
-        ]
-        
-        return any(re.search(pattern, query, re.IGNORECASE) 
-                  for pattern in pure_stats_patterns)
+        return _PURE_STATS_RE.match(query) is not None
     
     def _determine_approach(self, query_type: QueryType, required_tools: List[ToolType]) -> str:
         """Determine the processing approach based on analysis"""
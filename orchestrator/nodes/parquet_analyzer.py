@@ -28,7 +28,9 @@ from orchestrator.utils.state import (
     add_error
 )
 from orchestrator.config.settings import settings
-from orchestrator.tools.parquet_data_client import ParquetDataClient
+from orchestrator.tools.parquet_data_client import get_parquet_data_client
+from orchestrator.utils.entity_extractor import get_entity_extractor
+from orchestrator.utils.result_store import put_result
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +51,8 @@ class ParquetAnalyzerNode:
         self.cache = {} if settings.parquet.cache_enabled else None
         self.cache_ttl = settings.parquet.cache_ttl_seconds
         
-        # Real data client for Montreal Canadiens analytics
-        self.data_client = ParquetDataClient(str(self.data_directory))
+        # Real data client for Montreal Canadiens analytics (shared per process)
+        self.data_client = get_parquet_data_client(str(self.data_directory))
         
         # Legacy data files mapping (kept for compatibility)
         self.data_files = {
@@ -109,17 +111,19 @@ class ParquetAnalyzerNode:
             # Calculate execution time
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
-            # Create tool result
+            # Create tool result (the payload lives in the result store)
+            handle = put_result(state, ToolType.PARQUET_QUERY, analytics_results)
             tool_result = ToolResult(
                 tool_type=ToolType.PARQUET_QUERY,
                 success=len(analytics_results) > 0,
-                data=analytics_results,
+                data=handle,
                 execution_time_ms=execution_time,
                 citations=self._generate_citations(analytics_results)
             )
             
-            # Update state
-            state["analytics_data"] = analytics_results
+            # Update state (no results, no analytics to answer from)
+            if analytics_results:
+                state["analytics_data"]["parquet"] = handle
             state = add_tool_result(state, tool_result)
             
             logger.info(f"Analytics completed in {execution_time}ms with {len(analytics_results)} results")
@@ -319,23 +323,9 @@ class ParquetAnalyzerNode:
             return {"error": f"General analytics failed: {str(e)}"}
     
     def _extract_player_names(self, query: str) -> List[str]:
-        """Extract player names from query text"""
+        """Extract player names from query text (canonical full names)"""
         
-        # Common Montreal Canadiens players (2024-25 season)
-        known_players = [
-            "suzuki", "caufield", "hutson", "slafkovsky", "guhle", 
-            "matheson", "dach", "newhook", "gallagher", "anderson",
-            "montembeault", "primeau", "dvorak", "armia", "evans"
-        ]
-        
-        found_players = []
-        query_lower = query.lower()
-        
-        for player in known_players:
-            if player in query_lower:
-                found_players.append(player.capitalize())
-        
-        return found_players
+        return get_entity_extractor().player_names(query)
     
     def _extract_timeframe(self, query: str) -> str:
         """Extract timeframe information from query"""
@@ -26,6 +26,7 @@ from orchestrator.utils.state import (
 )
 from orchestrator.config.settings import settings
 from orchestrator.tools.pinecone_mcp_client import PineconeMCPClient
+from orchestrator.utils.result_store import put_result
 
 logger = logging.getLogger(__name__)
 
@@ -93,19 +94,20 @@ class PineconeRetrieverNode:
             # Process and format results
             retrieved_context = self._process_search_results(search_results)
             
-            # Create tool result
+            # Create tool result (the chunks live in the result store)
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            handle = put_result(state, ToolType.VECTOR_SEARCH, retrieved_context)
             
             tool_result = ToolResult(
                 tool_type=ToolType.VECTOR_SEARCH,
                 success=len(retrieved_context) > 0,
-                data=retrieved_context,
+                data=handle,
                 execution_time_ms=execution_time,
                 citations=self._extract_citations(retrieved_context)
             )
             
-            # Update state
-            state["retrieved_context"] = retrieved_context
+            # Update state (an empty search leaves no context to answer from)
+            state["retrieved_context"] = [handle] if retrieved_context else []
             state = add_tool_result(state, tool_result)
             
             logger.info(f"Retrieved {len(retrieved_context)} context chunks in {execution_time}ms")
@@ -340,16 +342,17 @@ class PineconeRetrieverNode:
         fallback_context = self._generate_fallback_context(state["original_query"])
         
         execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
+        handle = put_result(state, ToolType.VECTOR_SEARCH, fallback_context)
         
         tool_result = ToolResult(
             tool_type=ToolType.VECTOR_SEARCH,
             success=True,
-            data=fallback_context,
+            data=handle,
             execution_time_ms=execution_time,
             citations=["[fallback:hockey_basics]"]
         )
         
-        state["retrieved_context"] = fallback_context
+        state["retrieved_context"] = [handle] if fallback_context else []
         state = add_tool_result(state, tool_result)
         
         return state
@@ -10,8 +10,6 @@ Features advanced reasoning capabilities with sophisticated tool orchestration.
 from typing import Dict, List, Any, Optional
 import logging
 from datetime import datetime
-import asyncio
-import json
 
 try:
     import openai
@@ -28,9 +26,38 @@ from orchestrator.utils.state import (
     has_required_data
 )
 from orchestrator.config.settings import settings, UserRole
+from orchestrator.utils.coalesce import coalesce
+from orchestrator.utils.result_store import resolve_result
+from orchestrator.utils.prompt_compiler import CompiledPrompt, PromptCompiler
+from orchestrator.tools.llm_clients import get_openai_client
+from orchestrator.tools.llm_batch_gateway import get_batch_gateway
 
 logger = logging.getLogger(__name__)
 
+# Payload fields the prompt and template responses read
+CONTEXT_PROMPT_FIELDS = ("content", "source", "category", "relevance_score")
+ANALYTICS_PROMPT_FIELDS = ("analysis_type", "error", "team", "season", "timeframe",
+                           "players", "players_found", "metrics", "sample_data", "summary", "note")
+CLIP_PROMPT_FIELDS = ("clip_id", "title", "player_name", "game_info", "event_type", "duration",
+                      "relevance_score")
+
+# Identical for every request and role, so it forms the cacheable prompt prefix
+TOOL_CAPABILITIES_PROMPT = """TOOL ORCHESTRATION CAPABILITIES:
+- [TOOL: vector_search] - Hockey knowledge, rules, strategic context, and historical insights
+- [TOOL: parquet_query] - Real-time player/team statistics, game data, and performance metrics
+- [TOOL: clip_retrieval] - Video clips, player shifts, highlights, and visual game analysis
+- [TOOL: calculate_advanced_metrics] - xG, Corsi, zone analysis, possession metrics, and advanced analytics
+- [TOOL: matchup_analysis] - Opponent analysis, head-to-head comparisons, and tactical recommendations
+- [TOOL: visualization] - Statistical charts, heatmaps, and data visualizations
+
+RESPONSE REQUIREMENTS:
+- Demonstrate sophisticated analytical reasoning with multi-step analysis
+- Integrate data from all available tools meaningfully and comprehensively
+- Provide clear evidence chains and source attribution for all insights
+- Use authentic Montreal Canadiens hockey terminology and communication style
+- Maintain professional standards with precise, actionable insights
+- Evidence sections below are condensed to fit the prompt budget; "(+N more omitted)" marks trimmed items"""
+
 class ResponseSynthesizerNode:
     """
     Synthesizes final responses using the fine-tuned DeepSeek-R1-Distill-Qwen-32B model.
@@ -100,6 +127,8 @@ Your responses should demonstrate the analytical depth of a world-class hockey c
                 "context": "Focus on detailed player evaluation, comparative analysis, and recruitment assessment using video and statistical evidence."
             }
         }
+        
+        self.prompt_compiler = PromptCompiler(f"{self.base_system_prompt}\n\n{TOOL_CAPABILITIES_PROMPT}")
     
     async def process(self, state: AgentState) -> AgentState:
         """Process response synthesis using fine-tuned model"""
@@ -112,16 +141,16 @@ Your responses should demonstrate the analytical depth of a world-class hockey c
             if not has_required_data(state):
                 return self._handle_insufficient_data(state, start_time)
             
-            # Extract synthesis parameters
+            # Extract synthesis parameters (resolving result store handles)
             user_context = state["user_context"]
             query = state["original_query"]
-            retrieved_context = state.get("retrieved_context", [])
-            analytics_data = state.get("analytics_data", {})
+            retrieved_context = self._resolve_context(state)
+            analytics_data = self._resolve_analytics(state)
             tool_results = state.get("tool_results", [])
             
             logger.info(f"Synthesizing response for {user_context.role.value}: {query[:100]}...")
             
-            # Build comprehensive prompt
+            # Build the prompt within the role's token budget
             synthesis_prompt = self._build_synthesis_prompt(
                 user_context=user_context,
                 query=query,
@@ -129,6 +158,7 @@ Your responses should demonstrate the analytical depth of a world-class hockey c
                 analytics_data=analytics_data,
                 tool_results=tool_results
             )
+            state["debug_info"]["prompt"] = synthesis_prompt.stats()
             
             # Generate response using model
             response = await self._generate_response(synthesis_prompt, user_context, state)
@@ -175,6 +205,26 @@ Your responses should demonstrate the analytical depth of a world-class hockey c
         
         return state
     
+    def _resolve_context(self, state: AgentState) -> List[Dict[str, Any]]:
+        """Retrieved context chunks, projected to the fields the prompt uses"""
+        
+        context = []
+        for handle in state.get("retrieved_context", []):
+            context.extend(resolve_result(state, handle, CONTEXT_PROMPT_FIELDS) or [])
+        return context
+    
+    def _resolve_analytics(self, state: AgentState) -> Dict[str, Any]:
+        """Parquet analytics plus clips, projected to the fields the prompt uses"""
+        
+        handles = state.get("analytics_data", {})
+        analytics_data = {}
+        if "parquet" in handles:
+            analytics_data = resolve_result(state, handles["parquet"], ANALYTICS_PROMPT_FIELDS) or {}
+        if "clips" in handles:
+            clip_payload = resolve_result(state, handles["clips"], ("clips",)) or {}
+            analytics_data["clips"] = resolve_result(state, clip_payload.get("clips", []), CLIP_PROMPT_FIELDS)
+        return analytics_data
+    
     def _build_synthesis_prompt(
         self,
         user_context,
@@ -182,73 +232,48 @@ Your responses should demonstrate the analytical depth of a world-class hockey c
         retrieved_context: List[Dict[str, Any]],
         analytics_data: Dict[str, Any],
         tool_results: List[ToolResult]
-    ) -> str:
-        """Build comprehensive prompt for response synthesis using DeepSeek-R1-Distill-Qwen-32B"""
+    ) -> CompiledPrompt:
+        """Build the synthesis prompt for DeepSeek-R1-Distill-Qwen-32B within the role's token budget"""
         
         role_config = self.role_templates.get(
             user_context.role, 
             self.role_templates[UserRole.STAFF]
         )
         
-        # Build context sections
-        context_section = self._format_retrieved_context(retrieved_context)
-        analytics_section = self._format_analytics_data(analytics_data)
-        clips_section = self._format_video_clips(analytics_data)
-        evidence_section = self._format_evidence_chain(tool_results)
+        role_block = (
+            f"ROLE-SPECIFIC CONTEXT: {role_config['context']}\n"
+            f"Focus on: {', '.join(role_config['focus'])}"
+        )
         
-        # Construct synthesis prompt
-        synthesis_prompt = f"""
-{self.base_system_prompt}
-
-ROLE-SPECIFIC CONTEXT: {role_config['context']}
-
-TOOL ORCHESTRATION CAPABILITIES:
-- [TOOL: vector_search] - Hockey knowledge, rules, strategic context, and historical insights
-- [TOOL: parquet_query] - Real-time player/team statistics, game data, and performance metrics
-- [TOOL: clip_retrieval] - Video clips, player shifts, highlights, and visual game analysis
-- [TOOL: calculate_advanced_metrics] - xG, Corsi, zone analysis, possession metrics, and advanced analytics  
-- [TOOL: matchup_analysis] - Opponent analysis, head-to-head comparisons, and tactical recommendations
-- [TOOL: visualization] - Statistical charts, heatmaps, and data visualizations
-
-RESPONSE REQUIREMENTS:
-- Demonstrate sophisticated analytical reasoning with multi-step analysis
-- Integrate data from all available tools meaningfully and comprehensively
-- Provide clear evidence chains and source attribution for all insights
-- Use authentic Montreal Canadiens hockey terminology and communication style
-- Focus on: {', '.join(role_config['focus'])}
-- Maintain professional standards with precise, actionable insights
-
-USER QUERY: {query}
-
-HOCKEY CONTEXT RETRIEVED:
-{context_section}
-
-STATISTICAL ANALYTICS:
-{analytics_section}
-
-VIDEO CLIPS & SHIFTS:
-{clips_section}
-
-EVIDENCE SOURCES:
-{evidence_section}
-
-ANALYTICAL INSTRUCTIONS:
+        instructions = f"""ANALYTICAL INSTRUCTIONS:
 1. Process the query using multi-step reasoning appropriate for a {user_context.role.value}
 2. Synthesize insights from hockey context, statistical data, and video analysis
 3. Provide comprehensive analysis that leverages all available tool outputs
 4. Structure response with clear reasoning chains and strategic/tactical depth
 5. Include specific data points, shift analysis, and video references where relevant
 6. Ensure actionable recommendations suitable for Montreal Canadiens operations
-7. Maintain focus on: {role_config['context']}
-
-Generate your professional hockey analytics response:
-"""
-        
-        return synthesis_prompt
+7. Maintain focus on: {role_config['context']}"""
+        
+        citations = [
+            citation
+            for result in tool_results if result.success
+            for citation in result.citations
+        ]
+        
+        return self.prompt_compiler.compile(
+            query=query,
+            role_block=role_block,
+            instructions=instructions,
+            budget=settings.get_prompt_token_budget(user_context.role),
+            context=retrieved_context,
+            analytics={k: v for k, v in analytics_data.items() if k != "clips"},
+            clips=analytics_data.get("clips") or [],
+            citations=citations
+        )
     
     async def _generate_response(
         self, 
-        synthesis_prompt: str, 
+        synthesis_prompt: CompiledPrompt, 
         user_context,
         state: AgentState = None
     ) -> str:
@@ -257,46 +282,50 @@ Generate your professional hockey analytics response:
         # Try primary model (SageMaker endpoint) first
         if self.model_config.primary_model_endpoint:
             try:
-                return await self._call_sagemaker_endpoint(synthesis_prompt)
+                return await self._call_sagemaker_endpoint(synthesis_prompt.text)
             except Exception as e:
                 logger.warning(f"SageMaker endpoint failed, falling back: {str(e)}")
         
-        # Fallback to OpenAI for development/testing
+        # Fallback to OpenAI for development/testing; the stable prefix goes in
+        # the system message so the provider's prompt cache can reuse it
         if self.model_config.fallback_api_key and openai:
             try:
-                return await self._call_openai_fallback(synthesis_prompt)
+                return await self._call_openai_fallback(synthesis_prompt.body, synthesis_prompt.prefix)
             except Exception as e:
                 logger.warning(f"OpenAI fallback failed: {str(e)}")
         
         # Final fallback to template-based response
-        return self._generate_template_response(synthesis_prompt, user_context, state)
+        return self._generate_template_response(synthesis_prompt.text, user_context, state)
     
+    # Concurrent requests that built the same prompt share one model call
+    @coalesce()
     async def _call_sagemaker_endpoint(self, prompt: str) -> str:
         """Call the SageMaker endpoint for the fine-tuned DeepSeek-R1-Distill-Qwen-32B model"""
         
-        # This would implement actual SageMaker endpoint calling
-        # For now, return a placeholder indicating the integration point
-        
         logger.info("Calling SageMaker endpoint for DeepSeek-R1-Distill-Qwen-32B model")
         
-        # Simulate processing time for advanced reasoning model
-        await asyncio.sleep(0.2)
-        
-        return "SageMaker endpoint response placeholder - integrate with actual fine-tuned DeepSeek-R1-Distill-Qwen-32B model"
+        # Sent together with other requests' prompts arriving in the same window
+        return await get_batch_gateway().generate(
+            prompt,
+            max_new_tokens=self.model_config.max_tokens,
+            temperature=self.model_config.temperature,
+            top_p=self.model_config.top_p,
+            do_sample=True,
+            return_full_text=False
+        )
     
-    async def _call_openai_fallback(self, prompt: str) -> str:
+    @coalesce()
+    async def _call_openai_fallback(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         """Call OpenAI API as fallback during development (supporting DeepSeek-R1 functionality)"""
         
         if not openai:
             raise Exception("OpenAI library not available")
         
         try:
-            client = openai.AsyncOpenAI(api_key=self.model_config.fallback_api_key)
-            
-            response = await client.chat.completions.create(
+            return await get_openai_client().chat(
                 model=self.model_config.fallback_model,
                 messages=[
-                    {"role": "system", "content": self.base_system_prompt},
+                    {"role": "system", "content": system_prompt or self.base_system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=self.model_config.temperature,
@@ -304,8 +333,6 @@ Generate your professional hockey analytics response:
                 top_p=self.model_config.top_p
             )
             
-            return response.choices[0].message.content
-            
         except Exception as e:
             logger.error(f"OpenAI API call failed: {str(e)}")
             raise
@@ -344,48 +371,11 @@ Generate your professional hockey analytics response:
                 tool_result.success and 
                 tool_result.data):
                 
-                clips_list = tool_result.data.get("clips", [])
-                return clips_list
+                clip_payload = resolve_result(state, tool_result.data, ("clips",)) or {}
+                return resolve_result(state, clip_payload.get("clips", []), CLIP_PROMPT_FIELDS)
         
         # Also check analytics_data for clips
-        analytics_data = state.get("analytics_data", {})
-        if "clips" in analytics_data:
-            return analytics_data["clips"]
-        
-        return []
-    
-    def _extract_clip_data_from_prompt(self, synthesis_prompt: str) -> List[Dict[str, Any]]:
-        """Extract clip data from synthesis prompt"""
-        
-        # Look for the VIDEO CLIPS & SHIFTS section in the prompt
-        import re
-        
-        clip_section_match = re.search(
-            r'VIDEO CLIPS & SHIFTS:\s*(.*?)(?=\n\n|\nEVIDENCE|\nANALYTICAL|$)', 
-            synthesis_prompt, 
-            re.DOTALL
-        )
-        
-        if not clip_section_match:
-            return []
-        
-        clip_section = clip_section_match.group(1)
-        
-        # Extract clip information using regex
-        clip_pattern = r'(\d+)\.\s+(.*?)\s+-\s+(.*?)\s+\((.*?)\)(?:\s+\|\s+(.*?))?(?:\s+\|\s+([\d.]+)s)?'
-        matches = re.findall(clip_pattern, clip_section)
-        
-        clips = []
-        for match in matches:
-            clips.append({
-                "title": match[1].strip(),
-                "player_name": match[2].strip(),
-                "event_type": match[3].strip(),
-                "game_info": match[4].strip() if len(match) > 4 and match[4] else "",
-                "duration": float(match[5]) if len(match) > 5 and match[5] else 0.0
-            })
-        
-        return clips
+        return self._resolve_analytics(state).get("clips", [])
     
     def _generate_clip_response(
         self, 
@@ -460,119 +450,6 @@ I'm designed to provide sophisticated multi-step reasoning analysis combining:
 Please try your query again once the full HeartBeat Engine system is available.
 """
     
-    def _format_retrieved_context(
-        self, 
-        retrieved_context: List[Dict[str, Any]]
-    ) -> str:
-        """Format retrieved context for prompt integration"""
-        
-        if not retrieved_context:
-            return "No specific hockey context retrieved."
-        
-        formatted_context = []
-        
-        for i, context in enumerate(retrieved_context[:3], 1):  # Limit to top 3
-            content = context.get("content", "")
-            source = context.get("source", "unknown")
-            category = context.get("category", "general")
-            
-            formatted_context.append(
-                f"{i}. [{source}:{category}] {content[:200]}..."
-            )
-        
-        return "\n".join(formatted_context)
-    
-    def _format_analytics_data(self, analytics_data: Dict[str, Any]) -> str:
-        """Format analytics data for prompt integration"""
-        
-        if not analytics_data:
-            return "No analytics data available."
-        
-        analysis_type = analytics_data.get("analysis_type", "unknown")
-        
-        if "error" in analytics_data:
-            return f"Analytics error: {analytics_data['error']}"
-        
-        # Format based on analysis type
-        if analysis_type == "player_performance":
-            return self._format_player_analytics(analytics_data)
-        elif analysis_type == "team_performance":
-            return self._format_team_analytics(analytics_data)
-        else:
-            return f"Analytics type: {analysis_type}\nData: {str(analytics_data)[:300]}..."
-    
-    def _format_player_analytics(self, data: Dict[str, Any]) -> str:
-        """Format player analytics data"""
-        
-        players = data.get("players", [])
-        metrics = data.get("metrics", {})
-        
-        formatted = f"Player Analysis: {', '.join(players)}\n"
-        
-        for player, stats in metrics.items():
-            formatted += f"- {player}: {stats.get('points', 0)} points in {stats.get('games_played', 0)} games\n"
-        
-        return formatted
-    
-    def _format_team_analytics(self, data: Dict[str, Any]) -> str:
-        """Format team analytics data"""
-        
-        team = data.get("team", "MTL")
-        metrics = data.get("metrics", {})
-        
-        record = metrics.get("record", {})
-        formatted = f"Team Analysis: {team}\n"
-        formatted += f"- Record: {record.get('wins', 0)}-{record.get('losses', 0)}-{record.get('overtime', 0)}\n"
-        formatted += f"- Goals For/Against: {metrics.get('goals_for', 0)}/{metrics.get('goals_against', 0)}\n"
-        
-        return formatted
-    
-    def _format_video_clips(self, analytics_data: Dict[str, Any]) -> str:
-        """Format video clips and shifts data for prompt integration"""
-        
-        clips = analytics_data.get("clips", [])
-        
-        if not clips:
-            return "No video clips or shifts available."
-        
-        formatted_clips = []
-        
-        for i, clip in enumerate(clips[:5], 1):  # Limit to top 5 clips
-            if isinstance(clip, dict):
-                title = clip.get("title", f"Clip {i}")
-                player = clip.get("player_name", "Unknown Player")
-                game_info = clip.get("game_info", "")
-                event_type = clip.get("event_type", "shift")
-                duration = clip.get("duration", 0)
-                
-                formatted_clips.append(
-                    f"{i}. {title} - {player} ({event_type})"
-                    f"{f' | {game_info}' if game_info else ''}"
-                    f"{f' | {duration}s' if duration > 0 else ''}"
-                )
-        
-        if formatted_clips:
-            return f"Available video clips/shifts ({len(clips)} total):\n" + "\n".join(formatted_clips)
-        else:
-            return "Video clips found but formatting unavailable."
-    
-    def _format_evidence_chain(self, tool_results: List[ToolResult]) -> str:
-        """Format evidence chain from tool results"""
-        
-        if not tool_results:
-            return "No evidence chain available."
-        
-        evidence_items = []
-        
-        for result in tool_results:
-            if result.success and result.citations:
-                evidence_items.extend(result.citations)
-        
-        if evidence_items:
-            return "Evidence sources: " + ", ".join(set(evidence_items))
-        else:
-            return "Evidence chain in development."
-    
     def _post_process_response(
         self, 
         response: str, 
@@ -0,0 +1,81 @@
+"""
+HeartBeat Engine - Semantic Cache Node
+Montreal Canadiens Advanced Analytics Assistant
+
+Answers paraphrases of recently answered questions from the semantic cache
+before any retrieval, parquet or model work runs, and records new answers
+once the response has been synthesized.
+"""
+
+from typing import Any, Dict
+import logging
+
+from orchestrator.utils.state import AgentState, update_state_step
+from orchestrator.utils.semantic_cache import get_semantic_cache
+from orchestrator.utils.result_store import get_result_store
+from orchestrator.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# State fields restored on a hit
+CACHED_STATE_FIELDS = ("final_response", "evidence_chain", "tool_results",
+                       "retrieved_context", "analytics_data")
+
+
+class SemanticCacheNode:
+    """
+    Looks up the query in the semantic cache after routing.
+
+    On a hit the cached answer is copied into state and the workflow ends
+    there; otherwise the query continues to the routed tools.
+    """
+
+    def __init__(self):
+        self.cache = get_semantic_cache()
+
+    def process(self, state: AgentState) -> AgentState:
+        """Serve the query from the semantic cache when possible"""
+
+        state = update_state_step(state, "semantic_cache")
+
+        if not settings.orchestration.semantic_cache_enabled:
+            status, similarity = "disabled", 0.0
+        elif state["debug_info"].get("bypass_cache"):
+            status, similarity = "bypass", 0.0
+        else:
+            payload, status, similarity = self.cache.lookup(
+                state["original_query"], state["user_context"], state["query_type"]
+            )
+            if payload is not None:
+                # Handles in the cached state point at the snapshotted payloads
+                get_result_store(state["request_id"]).restore(payload["results"])
+                for name in CACHED_STATE_FIELDS:
+                    value = payload[name]
+                    state[name] = list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+
+        state["debug_info"]["semantic_cache"] = {
+            "status": status,
+            "similarity": round(similarity, 4)
+        }
+        return state
+
+    @staticmethod
+    def is_hit(state: AgentState) -> bool:
+        return state["debug_info"].get("semantic_cache", {}).get("status") == "hit"
+
+    def store(self, state: AgentState) -> AgentState:
+        """Remember a freshly synthesized answer"""
+
+        if (not settings.orchestration.semantic_cache_enabled
+                or self.is_hit(state)
+                or not state["final_response"]
+                or state["error_messages"]):
+            return state
+
+        payload: Dict[str, Any] = {name: state[name] for name in CACHED_STATE_FIELDS}
+        payload["results"] = get_result_store(state["request_id"]).snapshot()
+        try:
+            self.cache.store(state["original_query"], state["user_context"], state["query_type"], payload)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {str(e)}")
+        return state
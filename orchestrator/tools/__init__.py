@@ -6,9 +6,23 @@ Integration tools for external data sources and services.
 """
 
 from orchestrator.tools.pinecone_mcp_client import PineconeMCPClient
-from orchestrator.tools.parquet_data_client import ParquetDataClient
+from orchestrator.tools.parquet_data_client import ParquetDataClient, get_parquet_data_client
+from orchestrator.tools.data_executor import DataAccessExecutor, get_data_executor
+from orchestrator.tools.llm_clients import get_openai_client, get_sagemaker_client, get_llm_client_stats
+from orchestrator.tools.llm_batch_gateway import MicroBatchGateway, get_batch_gateway
+from orchestrator.tools.table_prefetcher import TablePrefetcher, get_table_prefetcher
 
 __all__ = [
     "PineconeMCPClient",
-    "ParquetDataClient"
+    "ParquetDataClient",
+    "get_parquet_data_client",
+    "DataAccessExecutor",
+    "get_data_executor",
+    "get_openai_client",
+    "get_sagemaker_client",
+    "get_llm_client_stats",
+    "MicroBatchGateway",
+    "get_batch_gateway",
+    "TablePrefetcher",
+    "get_table_prefetcher"
 ]
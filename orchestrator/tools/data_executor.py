@@ -0,0 +1,141 @@
+"""
+HeartBeat Engine - Data Access Executor
+Montreal Canadiens Advanced Analytics Assistant
+
+Bounded executor layer for parquet/Arrow access so blocking reads and
+pandas work never run on the asyncio event loop.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import functools
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from orchestrator.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DataAccessExecutor:
+    """
+    Runs blocking data access on a thread pool behind a concurrency limit.
+
+    The parquet client's work is Arrow reads, filters and compute kernels,
+    which release the GIL, on tables cached in this process (memory-mapped
+    where possible), so threads are used rather than worker processes.
+
+    Every call first waits on a per-event-loop semaphore sized by
+    max_concurrent, so a burst of heavy queries queues instead of
+    saturating the pools; queue depth and wait times are tracked.
+    """
+
+    def __init__(self, io_workers: int = 8, max_concurrent: int = 4):
+        self.io_workers = io_workers
+        self.max_concurrent = max_concurrent
+
+        self._io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="heartbeat-data")
+
+        # asyncio.Semaphore binds to the loop it is first used on
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            "queued": 0,
+            "in_flight": 0,
+            "max_queue_depth": 0,
+            "completed": 0,
+            "failed": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_run_ms": 0.0,
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrent)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def run_io(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking I/O-bound callable on the thread pool"""
+        return await self._submit(self._io_pool, func, *args, **kwargs)
+
+    async def _submit(self, pool, func: Callable, *args, **kwargs) -> Any:
+        semaphore = self._get_semaphore()
+        call = functools.partial(func, *args, **kwargs)
+
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._metrics["queued"] += 1
+            self._metrics["max_queue_depth"] = max(self._metrics["max_queue_depth"], self._metrics["queued"])
+
+        acquired = False
+        try:
+            async with semaphore:
+                acquired = True
+                wait_ms = (time.perf_counter() - queued_at) * 1000
+                with self._lock:
+                    self._metrics["queued"] -= 1
+                    self._metrics["in_flight"] += 1
+                    self._metrics["total_wait_ms"] += wait_ms
+                    self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], wait_ms)
+
+                started = time.perf_counter()
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(pool, call)
+                except Exception:
+                    with self._lock:
+                        self._metrics["failed"] += 1
+                    raise
+                finally:
+                    with self._lock:
+                        self._metrics["in_flight"] -= 1
+                        self._metrics["total_run_ms"] += (time.perf_counter() - started) * 1000
+
+                with self._lock:
+                    self._metrics["completed"] += 1
+                return result
+        finally:
+            if not acquired:
+                # Cancelled while still waiting for a slot
+                with self._lock:
+                    self._metrics["queued"] -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, wait and run times"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        finished = metrics["completed"] + metrics["failed"]
+        metrics["avg_wait_ms"] = round(metrics["total_wait_ms"] / finished, 2) if finished else 0.0
+        metrics["avg_run_ms"] = round(metrics["total_run_ms"] / finished, 2) if finished else 0.0
+        metrics["io_workers"] = self.io_workers
+        metrics["max_concurrent"] = self.max_concurrent
+        return metrics
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker pool"""
+        self._io_pool.shutdown(wait=wait)
+
+
+_executor: Optional[DataAccessExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_data_executor() -> DataAccessExecutor:
+    """Process-wide data access executor configured from settings"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DataAccessExecutor(
+                    io_workers=settings.parquet.io_workers,
+                    max_concurrent=settings.parquet.max_concurrent_queries
+                )
+    return _executor
@@ -0,0 +1,206 @@
+"""
+HeartBeat Engine - LLM Micro-Batch Gateway
+Montreal Canadiens Advanced Analytics Assistant
+
+Collects synthesis prompts for the fine-tuned DeepSeek-R1-Distill-Qwen-32B
+SageMaker endpoint over a short window (LLM_BATCH_WINDOW_MS) and sends them
+as one batched invocation ({"inputs": [...]}), up to LLM_BATCH_MAX_SIZE
+prompts, then hands each waiting request its own generation. Prompts are
+only batched with others that use the same generation parameters. Batch
+sizes and queue waits are reported on the health endpoint.
+
+Test locally against scripts/llm_standin_server.py, which accepts batched
+inputs and charges --per-item-ms for each extra prompt in a batch.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional, Set
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+from orchestrator.config.settings import settings
+from orchestrator.tools.llm_clients import SageMakerClient, get_sagemaker_client, parse_generated_text
+from orchestrator.utils.coalesce import freeze
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+
+@dataclass
+class _PendingPrompt:
+    prompt: str
+    parameters: Dict[str, Any]
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class _LoopQueues:
+    """Pending prompts and flush timers for one event loop, by parameter key"""
+
+    def __init__(self):
+        self.pending: Dict[Hashable, List[_PendingPrompt]] = {}
+        self.timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self.tasks: Set[asyncio.Task] = set()
+
+
+class MicroBatchGateway:
+    """
+    Batches concurrent generations for the SageMaker endpoint.
+
+    The first prompt for a parameter set starts the window timer; the batch
+    is sent when the window elapses or max_batch prompts are waiting,
+    whichever comes first. A failed invocation (after the client's own
+    retries) fails every prompt in the batch. Callers that were cancelled
+    while waiting are dropped from the batch.
+    """
+
+    def __init__(self, client: SageMakerClient, window_ms: float = 5.0, max_batch: int = 8,
+                 enabled: bool = True):
+        self.client = client
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.enabled = enabled and max_batch > 1
+
+        self._queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopQueues]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            "requests": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "failed_batches": 0,
+            "max_batch_size": 0,
+            "flushed_on_window": 0,
+            "flushed_on_size": 0,
+            "total_queue_wait_ms": 0.0,
+            "max_queue_wait_ms": 0.0,
+        }
+        self._histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+
+    def _get_queues(self) -> _LoopQueues:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            queues = self._queues.get(loop)
+            if queues is None:
+                queues = _LoopQueues()
+                self._queues[loop] = queues
+            return queues
+
+    async def generate(self, prompt: str, **parameters) -> str:
+        """Generated text for one prompt, sent as part of a batch"""
+        if not self.enabled:
+            return await self.client.generate(prompt, **parameters)
+
+        loop = asyncio.get_running_loop()
+        queues = self._get_queues()
+        key = freeze(parameters)
+        pending = _PendingPrompt(prompt, parameters, loop.create_future())
+
+        batch = queues.pending.setdefault(key, [])
+        batch.append(pending)
+        with self._lock:
+            self._metrics["requests"] += 1
+
+        if len(batch) >= self.max_batch:
+            self._flush(queues, key, "size")
+        elif key not in queues.timers:
+            queues.timers[key] = loop.call_later(self.window_ms / 1000, self._flush, queues, key, "window")
+
+        return await pending.future
+
+    def _flush(self, queues: _LoopQueues, key: Hashable, reason: str) -> None:
+        timer = queues.timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [pending for pending in queues.pending.pop(key, []) if not pending.future.done()]
+        if not batch:
+            return
+
+        now = time.perf_counter()
+        waits = [(now - pending.enqueued_at) * 1000 for pending in batch]
+        with self._lock:
+            self._metrics["batches"] += 1
+            self._metrics["batched_requests"] += len(batch)
+            self._metrics["max_batch_size"] = max(self._metrics["max_batch_size"], len(batch))
+            self._metrics["flushed_on_size" if reason == "size" else "flushed_on_window"] += 1
+            self._metrics["total_queue_wait_ms"] += sum(waits)
+            self._metrics["max_queue_wait_ms"] = max(self._metrics["max_queue_wait_ms"], max(waits))
+            bucket = next((b for b in BATCH_SIZE_BUCKETS if len(batch) <= b), BATCH_SIZE_BUCKETS[-1])
+            self._histogram[bucket] += 1
+
+        task = asyncio.ensure_future(self._send(batch))
+        queues.tasks.add(task)
+        task.add_done_callback(queues.tasks.discard)
+
+    async def _send(self, batch: List[_PendingPrompt]) -> None:
+        """One endpoint invocation for the batch, fanned back out to the waiters"""
+        parameters = batch[0].parameters
+        try:
+            if len(batch) == 1:
+                texts = [await self.client.generate(batch[0].prompt, **parameters)]
+            else:
+                result = await self.client.invoke({
+                    "inputs": [pending.prompt for pending in batch],
+                    "parameters": parameters
+                })
+                if not isinstance(result, list) or len(result) != len(batch):
+                    raise ValueError(f"Batched invocation returned {len(result) if isinstance(result, list) else 'no'} "
+                                     f"outputs for {len(batch)} prompts")
+                texts = [parse_generated_text(output) for output in result]
+        except Exception as e:
+            logger.error(f"Batched SageMaker invocation of {len(batch)} prompts failed: {str(e)}")
+            with self._lock:
+                self._metrics["failed_batches"] += 1
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+
+        for pending, text in zip(batch, texts):
+            if not pending.future.done():
+                pending.future.set_result(text)
+
+    def queued_count(self) -> int:
+        with self._lock:
+            loops = list(self._queues.values())
+        return sum(len(batch) for queues in loops for batch in list(queues.pending.values()))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            histogram = dict(self._histogram)
+        batched = metrics["batched_requests"]
+        metrics.update({
+            "enabled": self.enabled,
+            "window_ms": self.window_ms,
+            "max_batch": self.max_batch,
+            "queued": self.queued_count(),
+            "avg_batch_size": round(batched / metrics["batches"], 2) if metrics["batches"] else 0.0,
+            "avg_queue_wait_ms": round(metrics["total_queue_wait_ms"] / batched, 2) if batched else 0.0,
+            "batch_size_histogram": {f"<={bucket}": count for bucket, count in histogram.items()},
+        })
+        return metrics
+
+
+_gateway: Optional[MicroBatchGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_batch_gateway() -> MicroBatchGateway:
+    """Process-wide micro-batch gateway in front of the SageMaker client"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            model = settings.model
+            _gateway = MicroBatchGateway(
+                get_sagemaker_client(),
+                window_ms=model.llm_batch_window_ms,
+                max_batch=model.llm_batch_max_size,
+                enabled=model.llm_batch_enabled
+            )
+        return _gateway
@@ -0,0 +1,431 @@
+"""
+HeartBeat Engine - LLM Clients
+Montreal Canadiens Advanced Analytics Assistant
+
+Shared, pooled clients for the model backends used by response synthesis:
+the OpenAI fallback and the SageMaker endpoint serving the fine-tuned
+DeepSeek-R1-Distill-Qwen-32B model. Connections are kept alive and reused
+across requests, no call blocks the event loop (boto3 runs on a bounded
+thread pool), each backend has its own concurrency limit, and transient
+failures (429/5xx, timeouts, dropped connections) are retried with
+exponential backoff and full jitter.
+
+Point OPENAI_BASE_URL / SAGEMAKER_RUNTIME_URL at scripts/llm_standin_server.py
+to exercise the layer offline.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import functools
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import boto3
+    from botocore.config import Config as BotoConfig
+except ImportError:
+    boto3 = None
+    BotoConfig = None
+
+from orchestrator.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_CODES = {"ThrottlingException", "ModelNotReadyException", "ServiceUnavailable",
+                         "InternalFailure"}
+# Connection/timeout errors across openai, httpx and botocore, matched by name
+# so none of those libraries has to be importable
+RETRYABLE_ERROR_TYPES = {"APIConnectionError", "APITimeoutError", "ConnectError", "ConnectTimeout",
+                         "ReadTimeout", "RemoteProtocolError", "EndpointConnectionError",
+                         "ReadTimeoutError", "ConnectTimeoutError", "ConnectionClosedError"}
+
+
+class LLMBackendError(Exception):
+    """Non-2xx response from a plain HTTP backend"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a failed LLM call is worth retrying"""
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_TYPES:
+        return True
+    status = getattr(error, "status_code", None)
+    if status is None:
+        # botocore ClientError
+        response = getattr(error, "response", None)
+        if isinstance(response, dict):
+            if response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES:
+                return True
+            status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return status in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (0-based)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class LLMBackend:
+    """
+    Concurrency limit, retries and metrics shared by the backend clients.
+
+    Each attempt holds a slot of the per-event-loop semaphore; backoff
+    sleeps do not, so a struggling backend doesn't starve queued calls.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_retries: int,
+                 base_delay: float, max_delay: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        # asyncio.Semaphore binds to the loop it is first used on
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        self._metrics = {
+            "calls": 0,
+            "succeeded": 0,
+            "attempts": 0,
+            "retries": 0,
+            "failed": 0,
+            "queued": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "total_latency_ms": 0.0,
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """Await func(*args, **kwargs) under the concurrency limit, retrying transient failures"""
+        with self._lock:
+            self._metrics["calls"] += 1
+        started = time.perf_counter()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                result = await self._attempt(func, *args, **kwargs)
+                with self._lock:
+                    self._metrics["succeeded"] += 1
+                    self._metrics["total_latency_ms"] += (time.perf_counter() - started) * 1000
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._lock:
+                        self._metrics["failed"] += 1
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                with self._lock:
+                    self._metrics["retries"] += 1
+                logger.warning(f"{self.name} call failed ({str(e)}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, func: Callable, *args, **kwargs) -> Any:
+        semaphore = self._get_semaphore()
+        queued_at = time.perf_counter()
+        with self._lock:
+            self._metrics["queued"] += 1
+
+        acquired = False
+        try:
+            async with semaphore:
+                acquired = True
+                wait_ms = (time.perf_counter() - queued_at) * 1000
+                with self._lock:
+                    self._metrics["queued"] -= 1
+                    self._metrics["attempts"] += 1
+                    self._metrics["in_flight"] += 1
+                    self._metrics["max_in_flight"] = max(self._metrics["max_in_flight"], self._metrics["in_flight"])
+                    self._metrics["total_wait_ms"] += wait_ms
+                    self._metrics["max_wait_ms"] = max(self._metrics["max_wait_ms"], wait_ms)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        self._metrics["in_flight"] -= 1
+        finally:
+            if not acquired:
+                with self._lock:
+                    self._metrics["queued"] -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+        succeeded = metrics["succeeded"]
+        metrics["max_concurrency"] = self.max_concurrency
+        metrics["avg_wait_ms"] = round(metrics["total_wait_ms"] / metrics["attempts"], 2) if metrics["attempts"] else 0.0
+        metrics["avg_latency_ms"] = round(metrics["total_latency_ms"] / succeeded, 2) if succeeded else 0.0
+        return metrics
+
+
+class OpenAIChatClient(LLMBackend):
+    """
+    Chat completions over one AsyncOpenAI client per event loop.
+
+    The client's httpx pool keeps connections alive between requests, so
+    only the first call on a loop pays for TCP/TLS setup. The SDK's own
+    retries are disabled in favour of the jittered retries here.
+    """
+
+    def __init__(self, api_key: str, base_url: str = "", timeout: float = 60.0, **kwargs):
+        super().__init__("openai", **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url or None
+        self.timeout = timeout
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+
+    def _get_client(self):
+        if not openai:
+            raise Exception("OpenAI library not available")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                options = {"api_key": self.api_key, "base_url": self.base_url,
+                           "timeout": self.timeout, "max_retries": 0}
+                if httpx:
+                    options["http_client"] = httpx.AsyncClient(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(max_connections=self.max_concurrency,
+                                            max_keepalive_connections=self.max_concurrency)
+                    )
+                client = openai.AsyncOpenAI(**options)
+                self._clients[loop] = client
+            return client
+
+    async def chat(self, messages: List[Dict[str, str]], model: str, **params) -> str:
+        """Content of the first choice for a chat completion"""
+        return await self._call(self._chat, messages, model, **params)
+
+    async def _chat(self, messages: List[Dict[str, str]], model: str, **params) -> str:
+        response = await self._get_client().chat.completions.create(model=model, messages=messages, **params)
+        return response.choices[0].message.content
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.close()
+
+
+class SageMakerClient(LLMBackend):
+    """
+    Invocations of a SageMaker inference endpoint.
+
+    With SAGEMAKER_RUNTIME_URL set, requests go to
+    {runtime_url}/endpoints/{name}/invocations over a pooled httpx client
+    (local stand-in or a signing proxy). Otherwise the boto3 runtime
+    client is called on a thread pool sized to the concurrency limit, with
+    a matching botocore connection pool and botocore retries disabled.
+    """
+
+    def __init__(self, endpoint_name: str, region: str, runtime_url: str = "",
+                 timeout: float = 60.0, **kwargs):
+        super().__init__("sagemaker", **kwargs)
+        self.endpoint_name = endpoint_name
+        self.region = region
+        self.runtime_url = runtime_url.rstrip("/")
+        self.timeout = timeout
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+        self._runtime_client = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="heartbeat-sagemaker")
+            return self._pool
+
+    def _get_runtime_client(self):
+        if boto3 is None:
+            raise Exception("boto3 not available and SAGEMAKER_RUNTIME_URL not set")
+        with self._lock:
+            if self._runtime_client is None:
+                self._runtime_client = boto3.client(
+                    "sagemaker-runtime",
+                    region_name=self.region,
+                    config=BotoConfig(
+                        max_pool_connections=self.max_concurrency,
+                        read_timeout=self.timeout,
+                        retries={"total_max_attempts": 1}
+                    )
+                )
+            return self._runtime_client
+
+    def _get_http_client(self):
+        if not httpx:
+            raise Exception("httpx not available for SAGEMAKER_RUNTIME_URL")
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._http_clients.get(loop)
+            if client is None:
+                client = httpx.AsyncClient(
+                    base_url=self.runtime_url,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(max_connections=self.max_concurrency,
+                                        max_keepalive_connections=self.max_concurrency)
+                )
+                self._http_clients[loop] = client
+            return client
+
+    async def run_blocking(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking boto3 call on the SageMaker thread pool (no retries)"""
+        call = functools.partial(func, *args, **kwargs)
+        return await self._attempt(asyncio.get_running_loop().run_in_executor, self._get_pool(), call)
+
+    async def invoke(self, payload: Dict[str, Any], endpoint_name: Optional[str] = None) -> Any:
+        """Decoded JSON response of an endpoint invocation"""
+        return await self._call(self._invoke, payload, endpoint_name or self.endpoint_name)
+
+    async def generate(self, prompt: str, **parameters) -> str:
+        """Generated text for a single text-generation prompt"""
+        result = await self.invoke({"inputs": prompt, "parameters": parameters})
+        return parse_generated_text(result)
+
+    async def _invoke(self, payload: Dict[str, Any], endpoint_name: str) -> Any:
+        if not endpoint_name:
+            raise Exception("No SageMaker endpoint configured")
+        if self.runtime_url:
+            response = await self._get_http_client().post(f"/endpoints/{endpoint_name}/invocations", json=payload)
+            if response.status_code >= 400:
+                raise LLMBackendError(response.status_code, response.text[:200])
+            return response.json()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_pool(), functools.partial(self._invoke_boto3, payload, endpoint_name)
+        )
+
+    def _invoke_boto3(self, payload: Dict[str, Any], endpoint_name: str) -> Any:
+        response = self._get_runtime_client().invoke_endpoint(
+            EndpointName=endpoint_name,
+            ContentType="application/json",
+            Body=json.dumps(payload)
+        )
+        return json.loads(response["Body"].read().decode())
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._http_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+def parse_generated_text(result: Any) -> str:
+    """Text from a Hugging Face text-generation response ([{"generated_text": ...}] or variants)"""
+    if isinstance(result, list) and result:
+        result = result[0]
+    if isinstance(result, dict):
+        for key in ("generated_text", "outputs", "output", "text"):
+            if key in result:
+                return result[key]
+    if isinstance(result, str):
+        return result
+    raise ValueError(f"Unexpected SageMaker response: {str(result)[:200]}")
+
+
+_openai_client: Optional[OpenAIChatClient] = None
+_sagemaker_client: Optional[SageMakerClient] = None
+_clients_lock = threading.Lock()
+
+
+def _retry_options() -> Dict[str, Any]:
+    model = settings.model
+    return {
+        "max_retries": model.llm_max_retries,
+        "base_delay": model.llm_retry_base_delay,
+        "max_delay": model.llm_retry_max_delay,
+    }
+
+
+def get_openai_client() -> OpenAIChatClient:
+    """Process-wide OpenAI chat client"""
+    global _openai_client
+    with _clients_lock:
+        if _openai_client is None:
+            model = settings.model
+            _openai_client = OpenAIChatClient(
+                api_key=model.fallback_api_key,
+                base_url=model.openai_base_url,
+                timeout=model.llm_timeout_seconds,
+                max_concurrency=model.openai_max_concurrency,
+                **_retry_options()
+            )
+        return _openai_client
+
+
+def get_sagemaker_client() -> SageMakerClient:
+    """Process-wide SageMaker endpoint client"""
+    global _sagemaker_client
+    with _clients_lock:
+        if _sagemaker_client is None:
+            model = settings.model
+            _sagemaker_client = SageMakerClient(
+                endpoint_name=model.primary_model_endpoint,
+                region=model.sagemaker_region,
+                runtime_url=model.sagemaker_runtime_url,
+                timeout=model.llm_timeout_seconds,
+                max_concurrency=model.sagemaker_max_concurrency,
+                **_retry_options()
+            )
+        return _sagemaker_client
+
+
+def get_llm_client_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-backend call/retry/queue metrics for the health endpoint"""
+    with _clients_lock:
+        clients = [client for client in (_openai_client, _sagemaker_client) if client is not None]
+    return {client.name: client.get_metrics() for client in clients}
+
+
+async def close_llm_clients() -> None:
+    """Close pooled connections opened on the running loop and stop the boto3 pool"""
+    with _clients_lock:
+        clients = [client for client in (_openai_client, _sagemaker_client) if client is not None]
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Closing {client.name} client failed: {str(e)}")
+    if _sagemaker_client is not None:
+        _sagemaker_client.shutdown(wait=False)
@@ -6,21 +6,70 @@ Parquet data integration for Montreal Canadiens analytics.
 Connects to actual processed hockey data files.
 """
 
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, Tuple, Iterable
 import logging
+import threading
+import unicodedata
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import os
 from pathlib import Path
 
 try:
     import pandas as pd
+    import pyarrow as pa
+    import pyarrow.compute as pc
     import pyarrow.parquet as pq
 except ImportError:
     pd = None
+    pa = None
+    pc = None
     pq = None
 
+from orchestrator.tools.data_executor import DataAccessExecutor, get_data_executor
+from orchestrator.utils.coalesce import coalesce
+
 logger = logging.getLogger(__name__)
 
+# Memory-mapped Arrow tables shared by every client in this process.
+# Keyed by path; the mtime lets a re-run migration swap the file underneath.
+_mapped_tables: Dict[str, Tuple[float, Any]] = {}
+_mapped_tables_lock = threading.Lock()
+
+# Column holding the player in the NHL player stats files
+PLAYER_NAME_COLUMN = "Player Name"
+
+
+def normalize_player_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation for exact name matching"""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace(".", " ").replace("-", " ").replace("'", "")
+    return " ".join(text.split())
+
+
+def load_mapped_table(arrow_file: Path):
+    """
+    Memory-map an uncompressed Arrow IPC file and return its pa.Table.
+    
+    Buffers point straight into the mapped file, so pages live in the OS page
+    cache and are shared across worker processes instead of copied per worker.
+    """
+    key = str(arrow_file)
+    mtime = arrow_file.stat().st_mtime
+    
+    with _mapped_tables_lock:
+        cached = _mapped_tables.get(key)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        source = pa.memory_map(key, 'r')
+        table = pa.ipc.open_file(source).read_all()
+        _mapped_tables[key] = (mtime, table)
+        logger.info(f"Memory-mapped {arrow_file.name}: {table.num_rows:,} rows")
+        return table
+
 class ParquetDataClient:
     """
     Real Parquet data client for Montreal Canadiens analytics.
@@ -32,16 +81,29 @@ class ParquetDataClient:
     - Advanced hockey metrics and line combinations
     """
     
-    def __init__(self, data_directory: str = "data/processed"):
+    def __init__(self, data_directory: str = "data/processed", executor: Optional[DataAccessExecutor] = None):
         self.data_directory = Path(data_directory)
         self.cache = {}
         
+        # All blocking reads/pandas work run on the bounded data executor
+        self.executor = executor or get_data_executor()
+        
+        # Per-team merged player stats, keyed by (team, season) and
+        # invalidated when any source file's mtime/size changes
+        self._team_stats_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._team_stats_lock = threading.Lock()
+        # Teams being (re)loaded by some thread; other loaders wait instead of
+        # reading the same files again (e.g. a prefetch racing the tool call)
+        self._team_stats_loading: Dict[Tuple[str, str], threading.Event] = {}
+        self._read_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="heartbeat-stats-read")
+        
         # Real data file mapping based on your structure
         self.data_files = {
             # Core data
             "players": "dim/players.parquet",
             "teams": "dim/teams.parquet", 
             "pbp_unified": "fact/pbp/unified_pbp_2024-25.parquet",
+            "pbp_unified_arrow": "fact/pbp/unified_pbp_2024-25.arrow",
             
             # MTL specific analytics
             "mtl_season_results": "analytics/mtl_season_results/2024-2025/mtl_season_game_results_2024-2025.parquet",
@@ -92,6 +154,9 @@ class ParquetDataClient:
                         available_files.append(f"{data_type} ({len(parquet_files)} files)")
                     else:
                         missing_files.append(f"{data_type}: no parquet files in directory")
+            elif data_type == "pbp_unified_arrow":
+                # Optional hot copy; loaders fall back to the parquet file
+                continue
             else:
                 missing_files.append(f"{data_type}: {file_path}")
         
@@ -104,6 +169,32 @@ class ParquetDataClient:
             for missing in missing_files[:5]:  # Show first 5
                 logger.warning(f"{missing}")
     
+    def _load_pbp_table(self):
+        """
+        Load the unified PBP as a pa.Table.
+        
+        Prefers the memory-mapped Arrow hot copy written by the schema migration
+        and falls back to decoding the zstd parquet when it is absent or stale.
+        
+        Returns:
+            (table, path of the file it was read from)
+        """
+        pbp_file = self.data_directory / self.data_files["pbp_unified"]
+        arrow_file = self.data_directory / self.data_files["pbp_unified_arrow"]
+        
+        if pa is not None and arrow_file.exists():
+            if not pbp_file.exists() or arrow_file.stat().st_mtime >= pbp_file.stat().st_mtime:
+                try:
+                    return load_mapped_table(arrow_file), arrow_file
+                except Exception as e:
+                    logger.warning(f"Failed to memory-map {arrow_file.name}, using parquet: {str(e)}")
+        
+        return pq.read_table(pbp_file), pbp_file
+    
+    # Async API: every call is offloaded so the event loop never blocks on I/O,
+    # and concurrent identical calls share one executor job
+    
+    @coalesce(scope=attrgetter("data_directory"))
     async def get_player_performance(
         self,
         player_names: List[str],
@@ -111,74 +202,314 @@ class ParquetDataClient:
         team: str = "MTL"
     ) -> Dict[str, Any]:
         """Get real player performance data from NHL player stats"""
+        return await self.executor.run_io(self._get_player_performance_sync, player_names, timeframe, team)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_nhl_player_stats(
+        self,
+        team: str,
+        player_names: Optional[List[str]] = None,
+        season: str = "2024-2025"
+    ) -> Dict[str, Any]:
+        """Get NHL player stats for any team"""
+        return await self.executor.run_io(self._get_nhl_player_stats_sync, team, player_names, season)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_league_player_stats(
+        self,
+        player_names: Optional[List[str]] = None,
+        season: str = "2024-2025",
+        teams: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Get NHL player stats across the league (all team files read in one parallel round)"""
+        return await self.executor.run_io(self._get_league_player_stats_sync, player_names, season, teams)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_team_analytics(
+        self,
+        team: str = "MTL",
+        analysis_type: str = "general"
+    ) -> Dict[str, Any]:
+        """Get real team analytics data"""
+        return await self.executor.run_io(self._get_team_analytics_sync, team, analysis_type)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_advanced_metrics(
+        self,
+        metric_type: str = "xg",
+        team: str = "MTL"
+    ) -> Dict[str, Any]:
+        """Get real advanced hockey metrics"""
+        return await self.executor.run_io(self._get_advanced_metrics_sync, metric_type, team)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_line_combinations(
+        self,
+        unit_type: str = "forwards"
+    ) -> Dict[str, Any]:
+        """Get real line combination analytics"""
+        return await self.executor.run_io(self._get_line_combinations_sync, unit_type)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_game_data(
+        self,
+        game_id: Optional[int] = None,
+        opponent: Optional[str] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """Get real game data and play-by-play events"""
+        return await self.executor.run_io(self._get_game_data_sync, game_id, opponent, limit)
+    
+    @coalesce(scope=attrgetter("data_directory"))
+    async def get_specialized_analytics(
+        self,
+        category: str,
+        subcategory: str = "all"
+    ) -> Dict[str, Any]:
+        """Get specialized analytics from category directories"""
+        return await self.executor.run_io(self._get_specialized_analytics_sync, category, subcategory)
+    
+    # Blocking implementations (run on executor threads)
+    
+    def _stats_team_dir(self, team: str, season: str) -> Path:
+        return self.data_directory / self.data_files["nhl_player_stats_base"] / team.upper() / season
+    
+    def _read_stat_file(self, stats_file: Path):
+        """Read one stats file with pyarrow (releases the GIL); None on failure"""
+        try:
+            # Files are fanned out across the read pool; skip Arrow's inner threads
+            return pq.read_table(stats_file, use_threads=False)
+        except Exception as e:
+            logger.warning(f"Failed to load {stats_file.name}: {str(e)}")
+            return None
+    
+    def _load_team_stats(self, teams: Iterable[str], season: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load merged per-team player stats, reading every stale file concurrently.
+        
+        Returns:
+            Mapping of team -> cache entry (frame, files, name index)
+        """
+        entries = {}
+        pending = {}
+        waiting = {}
+        
+        for team in dict.fromkeys(team.upper() for team in teams):
+            team_dir = self._stats_team_dir(team, season)
+            stat_files = sorted(team_dir.glob("**/*.parquet")) if team_dir.exists() else []
+            if not stat_files:
+                continue
+            
+            signature = tuple((str(f), f.stat().st_mtime_ns, f.stat().st_size) for f in stat_files)
+            with self._team_stats_lock:
+                cached = self._team_stats_cache.get((team, season))
+                if cached and cached["signature"] == signature:
+                    entries[team] = cached
+                elif (team, season) in self._team_stats_loading:
+                    waiting[team] = self._team_stats_loading[(team, season)]
+                else:
+                    self._team_stats_loading[(team, season)] = threading.Event()
+                    pending[team] = (stat_files, signature)
         
         try:
-            # Use new NHL player stats structure  
-            nhl_stats_base = self.data_directory / self.data_files["nhl_player_stats_base"]
-            team_stats_dir = nhl_stats_base / team.upper() / "2024-2025"
+            if pending:
+                # One parallel round over every file that needs (re)loading
+                all_files = [f for stat_files, _ in pending.values() for f in stat_files]
+                logger.info(f"Loading player stats for {len(pending)} teams: {len(all_files)} files")
+                tables = dict(zip(all_files, self._read_pool.map(self._read_stat_file, all_files)))
+                
+                for team, (stat_files, signature) in pending.items():
+                    entry = self._build_team_entry(team, season, stat_files, tables, signature)
+                    if entry is None:
+                        continue
+                    with self._team_stats_lock:
+                        self._team_stats_cache[(team, season)] = entry
+                    entries[team] = entry
+        finally:
+            with self._team_stats_lock:
+                for team in pending:
+                    self._team_stats_loading.pop((team, season)).set()
+        
+        for team, loaded in waiting.items():
+            loaded.wait()
+            with self._team_stats_lock:
+                cached = self._team_stats_cache.get((team, season))
+            if cached:
+                entries[team] = cached
+        
+        return entries
+    
+    def warm_team_stats(self, teams: Iterable[str], season: str = "2024-2025") -> int:
+        """Load (or revalidate) the merged player stats cache for teams; returns teams cached"""
+        return len(self._load_team_stats(teams, season))
+    
+    def warm_pbp_table(self) -> bool:
+        """
+        Memory-map the PBP Arrow hot copy if present and current (no-op
+        otherwise) and page in the columns the game data path filters on.
+        
+        Mapping alone reads nothing; running the same kernels over those
+        columns faults their pages into the OS page cache.
+        """
+        pbp_file = self.data_directory / self.data_files["pbp_unified"]
+        arrow_file = self.data_directory / self.data_files["pbp_unified_arrow"]
+        if pa is None or not arrow_file.exists():
+            return False
+        if pbp_file.exists() and arrow_file.stat().st_mtime < pbp_file.stat().st_mtime:
+            return False
+        table = load_mapped_table(arrow_file)
+        if 'game_id' in table.column_names:
+            pc.min_max(table['game_id'])
+        for column in self._pbp_opponent_columns(table):
+            pc.match_substring(pc.cast(table[column], pa.string()), "", ignore_case=True)
+        return True
+    
+    @staticmethod
+    def _pbp_opponent_columns(table) -> List[str]:
+        """PBP columns naming the opponent (filtered by game data queries)"""
+        return [col for col in table.column_names if 'opp' in col.lower() or 'opponent' in col.lower()]
+    
+    def _build_team_entry(
+        self,
+        team: str,
+        season: str,
+        stat_files: List[Path],
+        tables: Dict[Path, Any],
+        signature: Tuple
+    ) -> Optional[Dict[str, Any]]:
+        """Merge a team's stat files and build its exact-match name index"""
+        loaded = []
+        file_details = []
+        
+        for stats_file in stat_files:
+            table = tables.get(stats_file)
+            if table is None:
+                continue
+            file_details.append({
+                "file": stats_file.name,
+                "records": table.num_rows,
+                "columns": list(table.column_names)
+            })
+            loaded.append(table.append_column("source_file", pa.array([stats_file.name] * table.num_rows, pa.string())))
+        
+        if not loaded:
+            return None
+        
+        merged = pa.concat_tables(loaded, promote_options="permissive")
+        frame = merged.to_pandas()
+        frame["team"] = team
+        frame["season"] = season
+        
+        player_col = PLAYER_NAME_COLUMN if PLAYER_NAME_COLUMN in frame.columns else next(
+            (col for col in frame.columns if any(term in col.lower() for term in ['player', 'name', 'first', 'last'])),
+            None
+        )
+        
+        # full normalized name -> rows, and each name token -> rows
+        full_index: Dict[str, List[int]] = {}
+        token_index: Dict[str, List[int]] = {}
+        if player_col:
+            for position, name in enumerate(frame[player_col].tolist()):
+                if not isinstance(name, str):
+                    continue
+                normalized = normalize_player_name(name)
+                full_index.setdefault(normalized, []).append(position)
+                for token in set(normalized.split()):
+                    token_index.setdefault(token, []).append(position)
+        
+        return {
+            "signature": signature,
+            "frame": frame,
+            "files": file_details,
+            "player_col": player_col,
+            "full_index": full_index,
+            "token_index": token_index,
+        }
+    
+    def _match_player_rows(self, entry: Dict[str, Any], player_names: List[str]) -> List[int]:
+        """
+        Resolve requested names to row positions via the name index.
+        
+        Full-name hits win; otherwise every token must match the same player
+        (so "Suzuki" or "Nick Suzuki" resolve exactly). Names with no index hit
+        fall back to a substring scan of the name column.
+        """
+        rows = set()
+        unresolved = []
+        
+        for name in player_names:
+            normalized = normalize_player_name(name)
+            if not normalized:
+                continue
+            if normalized in entry["full_index"]:
+                rows.update(entry["full_index"][normalized])
+                continue
+            
+            token_hits = [set(entry["token_index"].get(token, ())) for token in normalized.split()]
+            matched = set.intersection(*token_hits) if token_hits else set()
+            if matched:
+                rows.update(matched)
+            else:
+                unresolved.append(normalized)
+        
+        if unresolved and entry["player_col"]:
+            names = entry["frame"][entry["player_col"]].astype(str).map(normalize_player_name)
+            for needle in unresolved:
+                rows.update(int(i) for i in names.index[names.str.contains(needle, regex=False)])
+        
+        return sorted(rows)
+    
+    def _select_players(self, entry: Dict[str, Any], player_names: Optional[List[str]]):
+        frame = entry["frame"]
+        if not player_names:
+            return frame
+        return frame.iloc[self._match_player_rows(entry, player_names)]
+    
+    def _get_player_performance_sync(
+        self,
+        player_names: List[str],
+        timeframe: str = "current_season",
+        team: str = "MTL"
+    ) -> Dict[str, Any]:
+        """Get real player performance data from NHL player stats"""
+        
+        try:
+            team_stats_dir = self._stats_team_dir(team, "2024-2025")
             
             if not team_stats_dir.exists():
                 return {"error": f"Player stats directory not found for team {team}: {team_stats_dir}"}
             
-            # Get all parquet files for the team (including subdirectories)
-            stat_files = list(team_stats_dir.glob("**/*.parquet"))
-            
-            if not stat_files:
-                return {"error": f"No player stat files found for team {team} in 2024-2025 season"}
-            
-            logger.info(f"Loading {team} player stats from: {len(stat_files)} files")
-            
             if not pd:
                 return {"error": "Pandas not available for data processing"}
             
-            # Load and combine all stat files for the team
-            combined_data = []
-            file_info = []
+            entry = self._load_team_stats([team], "2024-2025").get(team.upper())
             
-            for stats_file in stat_files:
-                try:
-                    df = pd.read_parquet(stats_file)
-                    
-                    # Filter for requested players if specified
-                    if player_names:
-                        # Try different possible column names for player identification
-                        player_cols = [col for col in df.columns if any(term in col.lower() for term in ['player', 'name', 'first', 'last'])]
-                        
-                        if player_cols:
-                            player_col = player_cols[0]
-                            # Case-insensitive matching for player names
-                            mask = df[player_col].str.lower().str.contains('|'.join([p.lower() for p in player_names]), na=False)
-                            filtered_df = df[mask]
-                        else:
-                            # If no clear player column, take first few rows
-                            filtered_df = df.head(5)
-                    else:
-                        # If no specific players requested, take sample
-                        filtered_df = df.head(10)
-                    
-                    if not filtered_df.empty:
-                        # Add file source information
-                        filtered_df = filtered_df.copy()
-                        filtered_df['data_source_file'] = stats_file.name
-                        combined_data.append(filtered_df)
-                        
-                        file_info.append({
-                            "file": stats_file.name,
-                            "records": len(df),
-                            "columns": len(df.columns),
-                            "players_found": len(filtered_df)
-                        })
-                
-                except Exception as e:
-                    logger.warning(f"Failed to load {stats_file.name}: {str(e)}")
-                    continue
+            if entry is None:
+                return {"error": f"No player stat files found for team {team} in 2024-2025 season"}
+            
+            if player_names:
+                final_df = self._select_players(entry, player_names)
+            else:
+                # If no specific players requested, take a sample per file
+                final_df = entry["frame"].groupby("source_file", sort=False).head(10)
             
-            if not combined_data:
+            if final_df.empty:
                 return {"error": f"No valid player data found for {team} players: {player_names}"}
             
-            # Combine all data
-            final_df = pd.concat(combined_data, ignore_index=True)
+            final_df = final_df.rename(columns={"source_file": "data_source_file"})
+            found_per_file = final_df["data_source_file"].value_counts()
+            file_info = [
+                {
+                    "file": details["file"],
+                    "records": details["records"],
+                    "columns": len(details["columns"]),
+                    "players_found": int(found_per_file.get(details["file"], 0))
+                }
+                for details in entry["files"]
+                if found_per_file.get(details["file"], 0)
+            ]
             
+            player_col = entry["player_col"]
             results = {
                 "analysis_type": "real_nhl_player_performance",
                 "team": team,
@@ -187,12 +518,12 @@ class ParquetDataClient:
                 "players_found": len(final_df),
                 "timeframe": timeframe,
                 "data_sources": file_info,
-                "total_files_processed": len(stat_files),
-                "columns": list(final_df.columns) if not final_df.empty else [],
-                "sample_data": final_df.head(5).to_dict('records') if not final_df.empty else [],
+                "total_files_processed": len(entry["files"]),
+                "columns": list(final_df.columns),
+                "sample_data": final_df.head(5).to_dict('records'),
                 "summary": {
                     "total_records": len(final_df),
-                    "unique_players": len(final_df.drop_duplicates(subset=[col for col in final_df.columns if 'player' in col.lower() or 'name' in col.lower()][:1])) if not final_df.empty else 0
+                    "unique_players": int(final_df[player_col].nunique()) if player_col else len(final_df)
                 }
             }
             
@@ -202,7 +533,7 @@ class ParquetDataClient:
             logger.error(f"Error loading NHL player performance data: {str(e)}")
             return {"error": f"Failed to load NHL player data: {str(e)}"}
     
-    async def get_nhl_player_stats(
+    def _get_nhl_player_stats_sync(
         self,
         team: str,
         player_names: Optional[List[str]] = None,
@@ -211,87 +542,93 @@ class ParquetDataClient:
         """Get NHL player stats for any team"""
         
         try:
-            # Navigate to team-specific directory
-            nhl_stats_base = self.data_directory / self.data_files["nhl_player_stats_base"]
-            team_stats_dir = nhl_stats_base / team.upper() / season
+            team_stats_dir = self._stats_team_dir(team, season)
             
             if not team_stats_dir.exists():
                 return {"error": f"Player stats not available for team {team} in {season}"}
             
-            # Get all parquet files for the team (including subdirectories)
-            stat_files = list(team_stats_dir.glob("**/*.parquet"))
+            if not pd:
+                return {"error": "Pandas not available for data processing"}
+            
+            entry = self._load_team_stats([team], season).get(team.upper())
             
-            if not stat_files:
+            if entry is None:
                 return {"error": f"No player stat files found for {team} in {season}"}
             
-            logger.info(f"Loading {team} player stats: {len(stat_files)} files")
+            combined_df = self._select_players(entry, player_names)
+            
+            results = {
+                "analysis_type": "real_nhl_player_stats",
+                "team": team.upper(),
+                "season": season,
+                "players_requested": player_names,
+                "players_found": len(combined_df),
+                "data_files": entry["files"],
+                "total_files": len(entry["files"]),
+                "columns": list(combined_df.columns),
+                "sample_data": combined_df.head(10).to_dict('records') if not combined_df.empty else [],
+                "summary": {
+                    "total_records": len(combined_df),
+                    "data_coverage": f"{len(entry['files'])} stat categories for {team}"
+                }
+            }
+            
+            return results
+                
+        except Exception as e:
+            logger.error(f"Error loading NHL player stats for {team}: {str(e)}")
+            return {"error": f"Failed to load NHL player stats: {str(e)}"}
+    
+    def _get_league_player_stats_sync(
+        self,
+        player_names: Optional[List[str]] = None,
+        season: str = "2024-2025",
+        teams: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Get NHL player stats across every team directory"""
+        
+        try:
+            nhl_stats_base = self.data_directory / self.data_files["nhl_player_stats_base"]
+            
+            if not nhl_stats_base.exists():
+                return {"error": f"NHL player stats directory not found: {nhl_stats_base}"}
             
             if not pd:
                 return {"error": "Pandas not available for data processing"}
             
-            # Load all stat files and combine
-            all_data = []
-            file_details = []
+            if not teams:
+                teams = sorted(d.name for d in nhl_stats_base.iterdir() if (d / season).is_dir())
             
-            for stats_file in stat_files:
-                try:
-                    df = pd.read_parquet(stats_file)
-                    
-                    # Add metadata
-                    df = df.copy()
-                    df['source_file'] = stats_file.name
-                    df['team'] = team.upper()
-                    df['season'] = season
-                    
-                    all_data.append(df)
-                    file_details.append({
-                        "file": stats_file.name,
-                        "records": len(df),
-                        "columns": list(df.columns)
-                    })
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to load {stats_file.name}: {str(e)}")
-                    continue
-            
-            if not all_data:
-                return {"error": f"No valid data loaded for {team}"}
+            entries = self._load_team_stats(teams, season)
             
-            # Combine all dataframes
-            combined_df = pd.concat(all_data, ignore_index=True)
+            if not entries:
+                return {"error": f"No player stat files found for {season}"}
             
-            # Filter for specific players if requested
-            if player_names:
-                player_cols = [col for col in combined_df.columns if any(term in col.lower() for term in ['player', 'name', 'first', 'last'])]
-                
-                if player_cols:
-                    player_col = player_cols[0]
-                    mask = combined_df[player_col].str.lower().str.contains('|'.join([p.lower() for p in player_names]), na=False)
-                    combined_df = combined_df[mask]
+            frames = [self._select_players(entry, player_names) for entry in entries.values()]
+            combined_df = pd.concat([f for f in frames if not f.empty], ignore_index=True) if any(not f.empty for f in frames) else pd.DataFrame()
             
             results = {
-                "analysis_type": "real_nhl_player_stats",
-                "team": team.upper(),
+                "analysis_type": "real_nhl_league_player_stats",
                 "season": season,
+                "teams": sorted(entries),
                 "players_requested": player_names,
                 "players_found": len(combined_df),
-                "data_files": file_details,
-                "total_files": len(stat_files),
+                "total_files": sum(len(entry["files"]) for entry in entries.values()),
                 "columns": list(combined_df.columns),
                 "sample_data": combined_df.head(10).to_dict('records') if not combined_df.empty else [],
                 "summary": {
                     "total_records": len(combined_df),
-                    "data_coverage": f"{len(stat_files)} stat categories for {team}"
+                    "data_coverage": f"{len(entries)} teams"
                 }
             }
             
             return results
                 
         except Exception as e:
-            logger.error(f"Error loading NHL player stats for {team}: {str(e)}")
-            return {"error": f"Failed to load NHL player stats: {str(e)}"}
+            logger.error(f"Error loading league player stats: {str(e)}")
+            return {"error": f"Failed to load league player stats: {str(e)}"}
     
-    async def get_team_analytics(
+    def _get_team_analytics_sync(
         self,
         team: str = "MTL",
         analysis_type: str = "general"
@@ -341,7 +678,7 @@ class ParquetDataClient:
             logger.error(f"Error loading team analytics: {str(e)}")
             return {"error": f"Failed to load team data: {str(e)}"}
     
-    async def get_advanced_metrics(
+    def _get_advanced_metrics_sync(
         self,
         metric_type: str = "xg",
         team: str = "MTL"
@@ -392,7 +729,7 @@ class ParquetDataClient:
             logger.error(f"Error loading advanced metrics: {str(e)}")
             return {"error": f"Failed to load advanced metrics: {str(e)}"}
     
-    async def get_line_combinations(
+    def _get_line_combinations_sync(
         self,
         unit_type: str = "forwards"
     ) -> Dict[str, Any]:
@@ -438,7 +775,7 @@ class ParquetDataClient:
             logger.error(f"Error loading line combinations: {str(e)}")
             return {"error": f"Failed to load line combinations: {str(e)}"}
     
-    async def get_game_data(
+    def _get_game_data_sync(
         self,
         game_id: Optional[int] = None,
         opponent: Optional[str] = None,
@@ -449,38 +786,39 @@ class ParquetDataClient:
         try:
             # Load unified play-by-play data
             pbp_file = self.data_directory / self.data_files["pbp_unified"]
+            arrow_file = self.data_directory / self.data_files["pbp_unified_arrow"]
             
-            if not pbp_file.exists():
+            if not pbp_file.exists() and not arrow_file.exists():
                 return {"error": "Play-by-play data file not found"}
             
-            logger.info(f"Loading game data from: {pbp_file.name}")
-            
             if pd:
-                # Load with chunking for large files
-                df = pd.read_parquet(pbp_file)
+                table, source_file = self._load_pbp_table()
+                logger.info(f"Loaded game data: {table.num_rows:,} events from {source_file.name}")
                 
-                # Filter by game_id if specified
-                if game_id:
-                    df = df[df['game_id'] == game_id] if 'game_id' in df.columns else df
+                # Filter on the Arrow table so only matching rows are materialized
+                if game_id and 'game_id' in table.column_names:
+                    table = table.filter(pc.equal(table['game_id'], game_id))
                 
                 # Filter by opponent if specified
                 if opponent:
                     # Look for opponent columns
-                    opp_cols = [col for col in df.columns if 'opp' in col.lower() or 'opponent' in col.lower()]
+                    opp_cols = self._pbp_opponent_columns(table)
                     if opp_cols:
-                        df = df[df[opp_cols[0]].str.contains(opponent, case=False, na=False)]
+                        opp_values = pc.cast(table[opp_cols[0]], pa.string())
+                        mask = pc.match_substring(opp_values, opponent, ignore_case=True)
+                        table = table.filter(pc.fill_null(mask, False))
                 
                 # Limit results
-                df_sample = df.head(limit)
+                df_sample = table.slice(0, limit).to_pandas()
                 
                 results = {
                     "analysis_type": "real_game_data",
-                    "data_source": pbp_file.name,
+                    "data_source": source_file.name,
                     "game_id": game_id,
                     "opponent": opponent,
-                    "total_events": len(df),
+                    "total_events": table.num_rows,
                     "sample_events": len(df_sample),
-                    "columns": list(df.columns),
+                    "columns": list(table.column_names),
                     "sample_data": df_sample.to_dict('records') if not df_sample.empty else []
                 }
                 
@@ -492,7 +830,7 @@ class ParquetDataClient:
             logger.error(f"Error loading game data: {str(e)}")
             return {"error": f"Failed to load game data: {str(e)}"}
     
-    async def get_specialized_analytics(
+    def _get_specialized_analytics_sync(
         self,
         category: str,
         subcategory: str = "all"
@@ -569,13 +907,19 @@ class ParquetDataClient:
             if full_path.exists():
                 if full_path.is_file():
                     try:
-                        if pd:
-                            df = pd.read_parquet(full_path)
+                        if pq:
+                            # Row counts and columns come from file metadata; nothing is decoded
+                            if full_path.suffix == ".arrow":
+                                table = load_mapped_table(full_path)
+                                records, columns = table.num_rows, table.column_names
+                            else:
+                                metadata = pq.read_metadata(full_path)
+                                records, columns = metadata.num_rows, metadata.schema.to_arrow_schema().names
                             available_sources[data_type] = {
                                 "path": str(file_path),
                                 "type": "file",
-                                "records": len(df),
-                                "columns": list(df.columns)
+                                "records": records,
+                                "columns": list(columns)
                             }
                     except Exception as e:
                         available_sources[data_type] = {
@@ -597,3 +941,23 @@ class ParquetDataClient:
             "sources": available_sources,
             "data_directory": str(self.data_directory)
         }
+
+
+_shared_clients: Dict[str, ParquetDataClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_parquet_data_client(data_directory: str = "data/processed") -> ParquetDataClient:
+    """
+    Shared ParquetDataClient per data directory.
+    
+    Graph nodes are instantiated per step; sharing the client keeps its
+    caches and the file validation pass to once per process.
+    """
+    key = str(Path(data_directory).resolve())
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = ParquetDataClient(data_directory)
+            _shared_clients[key] = client
+        return client
@@ -9,6 +9,9 @@ Provides access to actual Montreal Canadiens hockey data.
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
+from operator import attrgetter
+
+from orchestrator.utils.coalesce import coalesce
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,7 @@ class PineconeMCPClient:
         
         logger.info(f"Pinecone MCP client initialized for index: {self.index_name}")
     
+    @coalesce(scope=attrgetter("index_name"))
     async def search_hockey_context(
         self,
         query: str,
@@ -0,0 +1,161 @@
+"""
+HeartBeat Engine - Speculative Table Prefetch
+Montreal Canadiens Advanced Analytics Assistant
+
+Warms the parquet client's table caches while the rest of the graph is
+still routing. Intent analysis hands over the query once it knows the
+query type and that parquet data will be needed; the players and teams in
+the query decide which tables to load (merged player stats for MTL, the
+players' teams and named opponents; the PBP hot copy for game and matchup
+questions). Loads run on a small dedicated thread pool so they never wait
+behind, or hold up, the tool calls themselves, and the parquet analyzer
+finds the data already cached.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Hashable, List, Optional
+import logging
+import threading
+import time
+
+from orchestrator.config.settings import settings
+from orchestrator.tools.parquet_data_client import ParquetDataClient, get_parquet_data_client
+from orchestrator.utils.entity_extractor import PLAYER, TEAM, PREFERRED_TEAM, get_entity_extractor
+from orchestrator.utils.state import QueryType
+
+logger = logging.getLogger(__name__)
+
+# Season the parquet analyzer reads player stats for
+PREFETCH_SEASON = "2024-2025"
+
+# Query types whose tools read the play-by-play table
+PBP_QUERY_TYPES = {QueryType.GAME_ANALYSIS, QueryType.MATCHUP_COMPARISON}
+
+
+class TablePrefetcher:
+    """
+    Fire-and-forget table warm-up with per-table de-duplication.
+
+    A table already being warmed is not queued again; the client's own
+    loaders make the tool call wait for an in-progress load rather than
+    read the same files twice.
+    """
+
+    def __init__(self, data_client: ParquetDataClient, workers: int = 1, enabled: bool = True):
+        self.data_client = data_client
+        self.enabled = enabled and workers > 0
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="heartbeat-prefetch")
+        self._in_flight: Dict[Hashable, Future] = {}
+        # Re-entrant: a load that finishes before add_done_callback runs its callback inline
+        self._lock = threading.RLock()
+
+        self._metrics = {
+            "requests": 0,
+            "scheduled": 0,
+            "deduplicated": 0,
+            "completed": 0,
+            "failed": 0,
+            "total_load_ms": 0.0,
+        }
+
+    def plan(self, query: str, query_type: QueryType) -> List[Hashable]:
+        """Tables worth warming for this query, as prefetch keys"""
+        matches = get_entity_extractor().extract(query)
+        players = [match for match in matches if match.entity_type == PLAYER]
+        teams = [match.entity_id for match in matches if match.entity_type == TEAM]
+
+        stat_teams = list(dict.fromkeys(
+            ([PREFERRED_TEAM] if players or query_type == QueryType.PLAYER_ANALYSIS else [])
+            + [match.team_abbr for match in players if match.team_abbr]
+            + teams
+        ))
+
+        # Most likely reads first: with one worker they load in this order
+        keys: List[Hashable] = [("team_stats", team, PREFETCH_SEASON) for team in stat_teams]
+        if query_type in PBP_QUERY_TYPES:
+            keys.append(("pbp",))
+        return keys
+
+    def prefetch(self, query: str, query_type: QueryType) -> List[Hashable]:
+        """Start warming the tables this query is likely to read; returns the keys scheduled"""
+        if not self.enabled:
+            return []
+        with self._lock:
+            self._metrics["requests"] += 1
+
+        try:
+            keys = self.plan(query, query_type)
+        except Exception as e:
+            logger.warning(f"Prefetch planning failed: {str(e)}")
+            return []
+
+        scheduled = []
+        with self._lock:
+            for key in keys:
+                if key in self._in_flight:
+                    self._metrics["deduplicated"] += 1
+                    continue
+                future = self._pool.submit(self._load, key)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda _, key=key: self._done(key))
+                self._metrics["scheduled"] += 1
+                scheduled.append(key)
+        return scheduled
+
+    def _load(self, key: Hashable) -> None:
+        started = time.perf_counter()
+        try:
+            if key[0] == "team_stats":
+                self.data_client.warm_team_stats([key[1]], key[2])
+            elif key[0] == "pbp":
+                self.data_client.warm_pbp_table()
+        except Exception as e:
+            logger.warning(f"Prefetch of {key} failed: {str(e)}")
+            with self._lock:
+                self._metrics["failed"] += 1
+            return
+        with self._lock:
+            self._metrics["completed"] += 1
+            self._metrics["total_load_ms"] += (time.perf_counter() - started) * 1000
+
+    def _done(self, key: Hashable) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until the currently scheduled loads finish (scripts/benchmarks)"""
+        with self._lock:
+            futures = list(self._in_flight.values())
+        for future in futures:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["in_flight"] = len(self._in_flight)
+        metrics["enabled"] = self.enabled
+        metrics["avg_load_ms"] = round(metrics["total_load_ms"] / metrics["completed"], 2) if metrics["completed"] else 0.0
+        return metrics
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait)
+
+
+_prefetcher: Optional[TablePrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_table_prefetcher() -> TablePrefetcher:
+    """Process-wide prefetcher over the shared parquet client"""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = TablePrefetcher(
+                get_parquet_data_client(settings.parquet.data_directory),
+                workers=settings.parquet.prefetch_workers,
+                enabled=settings.parquet.prefetch_enabled
+            )
+        return _prefetcher
@@ -0,0 +1,171 @@
+"""
+HeartBeat Engine - Request Coalescing
+Montreal Canadiens Advanced Analytics Assistant
+
+Single-flight de-duplication for tool calls. When many staff ask the same
+thing at once (intermission), identical concurrent calls to the parquet
+client, Pinecone search or the LLM share one in-flight future, so backend
+work scales with distinct calls rather than total requests. Nothing is
+cached: once the call finishes the next caller runs it again.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable form of call arguments (lists/dicts/sets become tuples)"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(freeze(v) for v in value))
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def _private_copy(result: Any) -> Any:
+    """Top-level copy so one caller adding keys does not leak into another's result"""
+    if isinstance(result, dict):
+        return dict(result)
+    if isinstance(result, list):
+        return list(result)
+    return result
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    # Every waiter may have been cancelled; don't log "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time on each event loop.
+
+    The call runs in its own task, so a caller that is cancelled does not
+    abort the call the other waiters joined. Every waiter receives the same
+    result (top-level copied) or the same exception.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Future]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.shared = 0
+        self.max_waiters = 0
+        self._waiters: Dict[Hashable, int] = {}
+
+    def _get_in_flight(self) -> Dict[Hashable, asyncio.Future]:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            in_flight = self._in_flight.get(loop)
+            if in_flight is None:
+                in_flight = {}
+                self._in_flight[loop] = in_flight
+            return in_flight
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs), or join the identical call already running"""
+        in_flight = self._get_in_flight()
+        self.calls += 1
+
+        task = in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            in_flight[key] = task
+            self._waiters[key] = 0
+
+            def _done(done, key=key):
+                if in_flight.get(key) is done:
+                    del in_flight[key]
+                    self._waiters.pop(key, None)
+                _retrieve_exception(done)
+
+            task.add_done_callback(_done)
+        else:
+            self.shared += 1
+
+        waiters = self._waiters.get(key, 0) + 1
+        self._waiters[key] = waiters
+        self.max_waiters = max(self.max_waiters, waiters)
+        return _private_copy(await asyncio.shield(task))
+
+    def in_flight_count(self) -> int:
+        with self._lock:
+            return sum(len(calls) for calls in self._in_flight.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "shared": self.shared,
+            "in_flight": self.in_flight_count(),
+            "max_waiters": self.max_waiters,
+            "share_rate": round(self.shared / self.calls, 4) if self.calls else 0.0,
+        }
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Named process-wide SingleFlight group"""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = SingleFlight(name)
+            _flights[name] = flight
+        return flight
+
+
+def get_coalescing_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-group call/execution counts for the health endpoint"""
+    with _flights_lock:
+        flights = list(_flights.values())
+    return {flight.name: flight.get_stats() for flight in flights}
+
+
+def coalesce(name: Optional[str] = None, scope: Optional[Callable[[Any], Hashable]] = None):
+    """
+    Decorator: coalesce concurrent identical calls of an async function.
+
+    Calls are identical when their arguments are equal after binding
+    defaults (so positional and keyword spellings match). For methods,
+    `self` is not part of the key - pass scope(self) to add whatever
+    distinguishes instances (e.g. a data directory); without it every
+    instance shares the group, which suits per-step node/client objects.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        flight = get_single_flight(name or func.__qualname__)
+        signature = inspect.signature(func)
+        is_method = next(iter(signature.parameters), None) == "self"
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            owner = arguments.pop("self", None) if is_method else None
+            key = (scope(owner) if scope else None, freeze(arguments))
+            return await flight.do(key, func, *args, **kwargs)
+
+        wrapper.single_flight = flight
+        return wrapper
+
+    return decorator
@@ -0,0 +1,615 @@
+"""
+HeartBeat Engine - Entity Extractor
+Montreal Canadiens Advanced Analytics Assistant
+
+League-wide player and team recognition for every NLP node. Aliases (full
+names, surnames, nicknames, team names, cities, abbreviations) built from
+dim/players.parquet and dim/teams.parquet are compiled into one
+Aho-Corasick automaton, so exact matching is a single pass over the text
+regardless of roster size; a trigram index catches misspellings. Matches
+resolve to canonical ids (player_id, team_abbr).
+"""
+
+import difflib
+import logging
+import time
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLAYER = "player"
+TEAM = "team"
+
+# Team whose players match by bare lowercase surname (the assistant is
+# Canadiens-first); other surnames need capitalization ("Power" vs "power play")
+PREFERRED_TEAM = "MTL"
+
+PLAYER_NICKNAMES: Dict[str, List[str]] = {
+    "Sam Montembeault": ["samuel montembeault", "monty"],
+    "Juraj Slafkovsky": ["slaf"],
+    "Brendan Gallagher": ["gally"],
+    "Alex Ovechkin": ["ovi"],
+}
+
+# Multi-word team nicknames (the default is the last word of the team name)
+TEAM_NICKNAME_OVERRIDES: Dict[str, str] = {
+    "TOR": "Maple Leafs",
+    "DET": "Red Wings",
+    "CBJ": "Blue Jackets",
+    "VGK": "Golden Knights",
+    "UTA": "Hockey Club",
+}
+
+TEAM_NICKNAMES: Dict[str, List[str]] = {
+    "MTL": ["habs", "les canadiens", "montreal"],
+    "TOR": ["leafs"],
+    "OTT": ["sens"],
+    "TBL": ["bolts", "tampa"],
+    "WSH": ["caps"],
+    "PIT": ["pens"],
+    "CAR": ["canes"],
+    "COL": ["avs"],
+    "NSH": ["preds"],
+    "CBJ": ["jackets"],
+    "CHI": ["hawks"],
+    "DET": ["wings"],
+    "NYR": ["ny rangers"],
+    "NYI": ["ny islanders", "isles"],
+    "LAK": ["la kings"],
+    "UTA": ["utah"],
+}
+
+# Team nicknames and abbreviations that are ordinary words: only matched
+# when written capitalized / upper case
+AMBIGUOUS_TEAM_ALIASES: Set[str] = {
+    "wild", "stars", "kings", "blues", "flames", "lightning", "jets", "sharks",
+    "hockey club", "ana", "car", "chi", "col", "dal", "det", "min", "pit", "sea", "van",
+}
+
+# Hockey phrases containing a name that is also an ordinary word; the name
+# inside them is never an entity, however it is capitalized
+AMBIGUOUS_PHRASES: Set[str] = {
+    "power play", "power plays", "power forward", "power move", "wild card",
+    "three stars", "all stars", "first star", "second star", "third star",
+}
+
+# Characters that end a sentence, so the next word is capitalized anyway
+SENTENCE_BREAKS = ".!?:;\"“(\n"
+
+# Built-in roster used while the dimension tables cannot be read: every team
+# and the Canadiens lineup, so the common questions still resolve
+BUILTIN_TEAMS: Dict[str, str] = {
+    "ANA": "Anaheim Ducks", "BOS": "Boston Bruins", "BUF": "Buffalo Sabres",
+    "CAR": "Carolina Hurricanes", "CBJ": "Columbus Blue Jackets", "CGY": "Calgary Flames",
+    "CHI": "Chicago Blackhawks", "COL": "Colorado Avalanche", "DAL": "Dallas Stars",
+    "DET": "Detroit Red Wings", "EDM": "Edmonton Oilers", "FLA": "Florida Panthers",
+    "LAK": "Los Angeles Kings", "MIN": "Minnesota Wild", "MTL": "Montreal Canadiens",
+    "NJD": "New Jersey Devils", "NSH": "Nashville Predators", "NYI": "New York Islanders",
+    "NYR": "New York Rangers", "OTT": "Ottawa Senators", "PHI": "Philadelphia Flyers",
+    "PIT": "Pittsburgh Penguins", "SEA": "Seattle Kraken", "SJS": "San Jose Sharks",
+    "STL": "St. Louis Blues", "TBL": "Tampa Bay Lightning", "TOR": "Toronto Maple Leafs",
+    "UTA": "Utah Hockey Club", "VAN": "Vancouver Canucks", "VGK": "Vegas Golden Knights",
+    "WPG": "Winnipeg Jets", "WSH": "Washington Capitals",
+}
+BUILTIN_PLAYERS: Dict[str, Tuple[str, str]] = {
+    "nhl_8480018": ("Nick Suzuki", "C"), "nhl_8481540": ("Cole Caufield", "RW"),
+    "nhl_8483515": ("Juraj Slafkovsky", "LW"), "nhl_8484984": ("Ivan Demidov", "RW"),
+    "nhl_8481523": ("Kirby Dach", "C"), "nhl_8481618": ("Alex Newhook", "C"),
+    "nhl_8478133": ("Jake Evans", "C"), "nhl_8477989": ("Christian Dvorak", "C"),
+    "nhl_8482775": ("Oliver Kapanen", "C"), "nhl_8483424": ("Owen Beck", "C"),
+    "nhl_8479718": ("Alex Barre-Boulet", "C"), "nhl_8476469": ("Joel Armia", "RW"),
+    "nhl_8475848": ("Brendan Gallagher", "RW"), "nhl_8476981": ("Josh Anderson", "RW"),
+    "nhl_8482749": ("Joshua Roy", "RW"), "nhl_8479339": ("Patrik Laine", "LW"),
+    "nhl_8482476": ("Emil Heineman", "LW"), "nhl_8479543": ("Michael Pezzetta", "LW"),
+    "nhl_8483549": ("Lucas Condotta", "LW"), "nhl_8481093": ("Rafaël Harvey-Pinard", "LW"),
+    "nhl_8476875": ("Mike Matheson", "D"), "nhl_8483457": ("Lane Hutson", "D"),
+    "nhl_8482087": ("Kaiden Guhle", "D"), "nhl_8475233": ("David Savard", "D"),
+    "nhl_8482964": ("Arber Xhekaj", "D"), "nhl_8482111": ("Justin Barron", "D"),
+    "nhl_8482733": ("Logan Mailloux", "D"), "nhl_8481593": ("Jayden Struble", "D"),
+    "nhl_8478470": ("Sam Montembeault", "G"), "nhl_8480051": ("Cayden Primeau", "G"),
+    "nhl_8482487": ("Jakub Dobes", "G"),
+}
+
+# Seconds between attempts to load the dimension tables after a failure
+DIM_RETRY_INTERVAL = 300.0
+
+FUZZY_MIN_LENGTH = 5
+FUZZY_MIN_TRIGRAM_SIMILARITY = 0.5
+FUZZY_MIN_RATIO = 0.85
+FUZZY_CACHE_SIZE = 4096
+
+
+def normalize_entity_text(text: str) -> Tuple[str, List[int]]:
+    """
+    Lowercase, strip accents and map punctuation to single spaces.
+
+    Returns:
+        (normalized text, offset of each normalized character in `text`)
+    """
+    chars: List[str] = []
+    offsets: List[int] = []
+    for index, ch in enumerate(text):
+        if ch in "'’":
+            continue
+        base = unicodedata.normalize("NFKD", ch)[:1].lower()
+        if base.isalnum():
+            chars.append(base)
+            offsets.append(index)
+        elif chars and chars[-1] != " ":
+            chars.append(" ")
+            offsets.append(index)
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+    return "".join(chars), offsets
+
+
+def normalize_alias(text: str) -> str:
+    return normalize_entity_text(text)[0]
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class EntityMatch:
+    """A recognized player or team"""
+    entity_type: str      # "player" or "team"
+    entity_id: str        # player_id or team_abbr
+    name: str             # canonical full name / team name
+    team_abbr: str
+    alias: str            # normalized alias that matched
+    start: int            # character span in the original text
+    end: int
+    score: float = 1.0    # 1.0 exact, lower for fuzzy matches
+    ambiguous: bool = False
+
+
+@dataclass
+class _Alias:
+    text: str
+    entity_type: str
+    entity_ids: List[str]
+    kind: str             # full_name, surname, nickname, team_name, city, abbreviation
+    case_sensitive: bool = False
+
+
+class AhoCorasick:
+    """Multi-pattern exact matcher over normalized text"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+
+        for pattern in patterns:
+            node = 0
+            for ch in pattern:
+                next_node = self._goto[node].get(ch)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][ch] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        # Breadth-first failure links; outputs inherit from their fail node
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0) if node else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, int]]:
+        """(start, end, pattern index) for every occurrence, in one pass"""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern_index in output[node]:
+                yield index + 1 - len(self.patterns[pattern_index]), index + 1, pattern_index
+
+
+class EntityExtractor:
+    """
+    Recognizes players and teams in free text.
+
+    - extract(): exact alias matches (whole words, longest wins) via the
+      automaton, then trigram-indexed fuzzy matching over the words left
+    - resolve_player()/resolve_team(): map a single name, surname,
+      nickname, city or abbreviation to its canonical entity
+    """
+
+    def __init__(self, players: List[Dict[str, Any]], teams: List[Dict[str, Any]],
+                 preferred_team: str = PREFERRED_TEAM, partial: bool = False):
+        self.preferred_team = preferred_team
+        # True for the built-in roster: players outside it go unrecognized
+        self.partial = partial
+        self.players: Dict[str, Dict[str, Any]] = {}
+        self.teams: Dict[str, Dict[str, Any]] = {}
+        self._aliases: Dict[Tuple[str, str], _Alias] = {}
+
+        for team in teams:
+            abbr = str(team["team_abbr"]).upper()
+            self.teams[abbr] = {"team_abbr": abbr, "name": team["team_name"]}
+        for player in players:
+            self.players[str(player["player_id"])] = {
+                "player_id": str(player["player_id"]),
+                "name": player["full_name"],
+                "last_name": player.get("last_name") or player["full_name"].split(" ", 1)[-1],
+                "team_abbr": str(player.get("team_abbr") or "").upper(),
+                "position": player.get("position") or "",
+            }
+
+        self._build_team_aliases()
+        self._build_player_aliases()
+
+        alias_list = list(self._aliases.values())
+        self._alias_list = alias_list
+        self._automaton = AhoCorasick(alias.text for alias in alias_list)
+
+        # Fuzzy candidates (everything but abbreviations), indexed by word
+        # count then trigram; window -> candidates is memoized since the same
+        # query words recur across requests
+        self._trigram_index: Dict[Tuple[int, str], List[int]] = {}
+        self._alias_trigram_counts: Dict[int, int] = {}
+        for alias_index, alias in enumerate(alias_list):
+            if alias.kind == "abbreviation" or len(alias.text) < FUZZY_MIN_LENGTH:
+                continue
+            width = alias.text.count(" ") + 1
+            grams = _trigrams(alias.text)
+            self._alias_trigram_counts[alias_index] = len(grams)
+            for gram in grams:
+                self._trigram_index.setdefault((width, gram), []).append(alias_index)
+        self._fuzzy_cache: Dict[Tuple[str, int], List[Tuple[int, float]]] = {}
+
+    @classmethod
+    def from_parquet(cls, data_directory: str, preferred_team: str = PREFERRED_TEAM) -> "EntityExtractor":
+        """Build from <data_directory>/dim/players.parquet and teams.parquet"""
+        import pandas as pd
+
+        dim_dir = Path(data_directory) / "dim"
+        players = pd.read_parquet(
+            dim_dir / "players.parquet",
+            columns=["player_id", "full_name", "first_name", "last_name", "position", "team_abbr"]
+        )
+        teams = pd.read_parquet(dim_dir / "teams.parquet", columns=["team_abbr", "team_name"])
+        players = players.dropna(subset=["player_id", "full_name"])
+        return cls(players.to_dict("records"), teams.to_dict("records"), preferred_team)
+
+    @classmethod
+    def builtin(cls, preferred_team: str = PREFERRED_TEAM) -> "EntityExtractor":
+        """Partial extractor over BUILTIN_TEAMS and BUILTIN_PLAYERS"""
+        teams = [{"team_abbr": abbr, "team_name": name} for abbr, name in BUILTIN_TEAMS.items()]
+        players = [
+            {"player_id": player_id, "full_name": name, "position": position, "team_abbr": "MTL"}
+            for player_id, (name, position) in BUILTIN_PLAYERS.items()
+        ]
+        return cls(players, teams, preferred_team, partial=True)
+
+    # Alias construction
+
+    def _add_alias(self, text: str, entity_type: str, entity_id: str, kind: str,
+                   case_sensitive: bool = False) -> None:
+        normalized = normalize_alias(text)
+        if not normalized:
+            return
+        key = (entity_type, normalized)
+        alias = self._aliases.get(key)
+        if alias is None:
+            self._aliases[key] = _Alias(normalized, entity_type, [entity_id], kind, case_sensitive)
+        elif entity_id not in alias.entity_ids:
+            # Full names and nicknames outrank a surname spelled the same way
+            if kind == "surname" and alias.kind != "surname":
+                return
+            if kind != "surname" and alias.kind == "surname":
+                self._aliases[key] = _Alias(normalized, entity_type, [entity_id], kind, case_sensitive)
+                return
+            alias.entity_ids.append(entity_id)
+            alias.case_sensitive = alias.case_sensitive and case_sensitive
+
+    def _build_team_aliases(self) -> None:
+        cities: Dict[str, List[str]] = {}
+        for abbr, team in self.teams.items():
+            name = team["name"]
+            nickname = TEAM_NICKNAME_OVERRIDES.get(abbr, name.split()[-1])
+            city = name[:-len(nickname)].strip() if name.endswith(nickname) else ""
+
+            self._add_alias(name, TEAM, abbr, "team_name")
+            self._add_alias(nickname, TEAM, abbr, "nickname",
+                            case_sensitive=normalize_alias(nickname) in AMBIGUOUS_TEAM_ALIASES)
+            self._add_alias(abbr, TEAM, abbr, "abbreviation",
+                            case_sensitive=abbr.lower() in AMBIGUOUS_TEAM_ALIASES)
+            team["nickname"] = nickname
+            team["short_name"] = city or name
+            if city:
+                cities.setdefault(normalize_alias(city), []).append(abbr)
+            for extra in TEAM_NICKNAMES.get(abbr, []):
+                self._add_alias(extra, TEAM, abbr, "nickname")
+
+        # Shared cities ("New York") would be ambiguous; those teams are
+        # short-named by city initials ("NY Rangers", as in the matchup reports)
+        for city, abbrs in cities.items():
+            if len(abbrs) == 1:
+                self._add_alias(city, TEAM, abbrs[0], "city")
+            else:
+                for abbr in abbrs:
+                    team = self.teams[abbr]
+                    initials = "".join(word[0] for word in team["short_name"].split()).upper()
+                    team["short_name"] = f"{initials} {team['nickname']}"
+
+    def _build_player_aliases(self) -> None:
+        by_name: Dict[str, List[str]] = {}
+        for player_id, player in self.players.items():
+            by_name.setdefault(player["name"], []).append(player_id)
+            self._add_alias(player["name"], PLAYER, player_id, "full_name")
+
+        for player_id, player in self.players.items():
+            self._add_alias(player["last_name"], PLAYER, player_id, "surname",
+                            case_sensitive=player["team_abbr"] != self.preferred_team)
+
+        for full_name, nicknames in PLAYER_NICKNAMES.items():
+            for player_id in by_name.get(full_name, []):
+                for nickname in nicknames:
+                    self._add_alias(nickname, PLAYER, player_id, "nickname")
+
+    # Matching
+
+    def _accepts(self, alias: _Alias, text: str, start: int, end: int) -> bool:
+        """Capitalization rule for aliases that double as ordinary words"""
+        if not alias.case_sensitive:
+            return True
+        span = text[start:end]
+        if alias.kind == "abbreviation":
+            return span.isupper()
+        if not span[:1].isupper() or self._in_phrase(alias, text, start, end):
+            return False
+        # A capital on the first word of a sentence says nothing
+        preceding = text[:start].rstrip()
+        return bool(preceding) and preceding[-1] not in SENTENCE_BREAKS
+
+    @staticmethod
+    def _in_phrase(alias: _Alias, text: str, start: int, end: int) -> bool:
+        """Whether the match is part of an AMBIGUOUS_PHRASES phrase"""
+        following = normalize_alias(text[start:]) + " "
+        preceding = " " + normalize_alias(text[:end])
+        for phrase in AMBIGUOUS_PHRASES:
+            if phrase.startswith(alias.text + " ") and following.startswith(phrase + " "):
+                return True
+            if phrase.endswith(" " + alias.text) and preceding.endswith(" " + phrase):
+                return True
+        return False
+
+    def _resolve_ids(self, alias: _Alias) -> Tuple[List[str], bool]:
+        """Candidate ids for an alias, preferring the preferred team on clashes"""
+        ids = alias.entity_ids
+        if len(ids) > 1 and alias.entity_type == PLAYER:
+            preferred = [pid for pid in ids if self.players[pid]["team_abbr"] == self.preferred_team]
+            if len(preferred) == 1:
+                return preferred, False
+        return ids, len(ids) > 1
+
+    def _to_matches(self, alias: _Alias, start: int, end: int, score: float) -> List[EntityMatch]:
+        entity_ids, ambiguous = self._resolve_ids(alias)
+        matches = []
+        for entity_id in entity_ids:
+            if alias.entity_type == PLAYER:
+                entity = self.players[entity_id]
+            else:
+                entity = self.teams[entity_id]
+            matches.append(EntityMatch(
+                entity_type=alias.entity_type,
+                entity_id=entity_id,
+                name=entity["name"],
+                team_abbr=entity["team_abbr"],
+                alias=alias.text,
+                start=start,
+                end=end,
+                score=score,
+                ambiguous=ambiguous,
+            ))
+        return matches
+
+    def extract(self, text: str, entity_type: Optional[str] = None, fuzzy: bool = True) -> List[EntityMatch]:
+        """
+        All players and teams mentioned in `text`, in order of appearance.
+
+        Args:
+            text: Raw text (case matters only for aliases that are common words)
+            entity_type: Restrict to PLAYER or TEAM
+            fuzzy: Also match misspelled names via the trigram index
+        """
+        normalized, offsets = normalize_entity_text(text)
+        if not normalized:
+            return []
+
+        # Whole-word exact hits; longest span wins where hits overlap
+        hits = []
+        for start, end, alias_index in self._automaton.iter_matches(normalized):
+            if start > 0 and normalized[start - 1] != " ":
+                continue
+            if end < len(normalized) and normalized[end] != " ":
+                continue
+            alias = self._alias_list[alias_index]
+            if entity_type and alias.entity_type != entity_type:
+                continue
+            raw_start, raw_end = offsets[start], offsets[end - 1] + 1
+            if self._accepts(alias, text, raw_start, raw_end):
+                hits.append((start, end, alias))
+        hits.sort(key=lambda hit: (hit[0], -(hit[1] - hit[0])))
+
+        matches: List[EntityMatch] = []
+        covered_until = -1
+        covered: List[Tuple[int, int]] = []
+        for start, end, alias in hits:
+            if start < covered_until:
+                continue
+            covered_until = end
+            covered.append((start, end))
+            matches.extend(self._to_matches(alias, offsets[start], offsets[end - 1] + 1, 1.0))
+
+        if fuzzy:
+            matches.extend(self._fuzzy_matches(text, normalized, offsets, covered, entity_type))
+            matches.sort(key=lambda match: match.start)
+        return matches
+
+    def _fuzzy_matches(self, text: str, normalized: str, offsets: List[int],
+                       covered: List[Tuple[int, int]], entity_type: Optional[str]) -> List[EntityMatch]:
+        """Best trigram candidate for each uncovered one- or two-word window"""
+        words = []
+        position = 0
+        for word in normalized.split(" "):
+            words.append((position, position + len(word)))
+            position += len(word) + 1
+
+        def is_covered(start: int, end: int) -> bool:
+            return any(start < c_end and c_start < end for c_start, c_end in covered)
+
+        matches: List[EntityMatch] = []
+        index = 0
+        while index < len(words):
+            found = None
+            for width in (2, 1):
+                if index + width > len(words):
+                    continue
+                start, end = words[index][0], words[index + width - 1][1]
+                window = normalized[start:end]
+                if len(window) < FUZZY_MIN_LENGTH or window.isdigit() or is_covered(start, end):
+                    continue
+                candidate = self._best_fuzzy_alias(window, width, entity_type)
+                if candidate is None:
+                    continue
+                alias, score = candidate
+                raw_start, raw_end = offsets[start], offsets[end - 1] + 1
+                if self._accepts(alias, text, raw_start, raw_end):
+                    found = (width, alias, raw_start, raw_end, score)
+                    break
+            if found:
+                width, alias, raw_start, raw_end, score = found
+                matches.extend(self._to_matches(alias, raw_start, raw_end, score))
+                index += width
+            else:
+                index += 1
+        return matches
+
+    def _best_fuzzy_alias(self, window: str, width: int, entity_type: Optional[str]) -> Optional[Tuple[_Alias, float]]:
+        key = (window, width)
+        candidates = self._fuzzy_cache.get(key)
+        if candidates is None:
+            candidates = self._fuzzy_candidates(window, width)
+            if len(self._fuzzy_cache) >= FUZZY_CACHE_SIZE:
+                self._fuzzy_cache.clear()
+            self._fuzzy_cache[key] = candidates
+
+        for alias_index, ratio in candidates:
+            alias = self._alias_list[alias_index]
+            if not entity_type or alias.entity_type == entity_type:
+                return alias, ratio
+        return None
+
+    def _fuzzy_candidates(self, window: str, width: int) -> List[Tuple[int, float]]:
+        """(alias index, similarity ratio) above thresholds, best first"""
+        grams = _trigrams(window)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for alias_index in self._trigram_index.get((width, gram), ()):
+                shared[alias_index] = shared.get(alias_index, 0) + 1
+
+        candidates = []
+        for alias_index, count in shared.items():
+            similarity = 2 * count / (len(grams) + self._alias_trigram_counts[alias_index])
+            if similarity < FUZZY_MIN_TRIGRAM_SIMILARITY:
+                continue
+            ratio = difflib.SequenceMatcher(None, window, self._alias_list[alias_index].text).ratio()
+            if ratio >= FUZZY_MIN_RATIO:
+                candidates.append((alias_index, round(ratio, 3)))
+        candidates.sort(key=lambda candidate: -candidate[1])
+        return candidates
+
+    # Convenience
+
+    def players_in(self, text: str, fuzzy: bool = True) -> List[EntityMatch]:
+        return self.extract(text, PLAYER, fuzzy)
+
+    def teams_in(self, text: str, fuzzy: bool = True) -> List[EntityMatch]:
+        return self.extract(text, TEAM, fuzzy)
+
+    def player_names(self, text: str, fuzzy: bool = True) -> List[str]:
+        """Canonical names of players mentioned in text (deduplicated, in order)"""
+        return list(dict.fromkeys(match.name for match in self.players_in(text, fuzzy)))
+
+    def opponents(self, text: str, fuzzy: bool = True) -> List[EntityMatch]:
+        """Teams mentioned in text other than the preferred team"""
+        seen = set()
+        opponents = []
+        for match in self.teams_in(text, fuzzy):
+            if match.entity_id != self.preferred_team and match.entity_id not in seen:
+                seen.add(match.entity_id)
+                opponents.append(match)
+        return opponents
+
+    def _resolve(self, entity_type: str, text: str) -> Optional[EntityMatch]:
+        normalized = normalize_alias(text)
+        alias = self._aliases.get((entity_type, normalized))
+        if alias is not None:
+            matches = self._to_matches(alias, 0, len(text), 1.0)
+            return matches[0] if len(matches) == 1 else None
+        matches = [match for match in self.extract(text, entity_type) if not match.ambiguous]
+        return matches[0] if len(matches) == 1 else None
+
+    def resolve_player(self, text: str) -> Optional[EntityMatch]:
+        """Single unambiguous player for a name, surname or nickname"""
+        return self._resolve(PLAYER, text)
+
+    def resolve_team(self, text: str) -> Optional[EntityMatch]:
+        """Single team for a name, city, nickname or abbreviation (any case)"""
+        return self._resolve(TEAM, text)
+
+
+_entity_extractor: Optional[EntityExtractor] = None
+_entity_extractor_retry_at = 0.0
+
+
+def get_entity_extractor() -> EntityExtractor:
+    """
+    Process-wide extractor built from the dimension tables.
+
+    When they cannot be read the built-in roster stands in, and the tables
+    are retried every DIM_RETRY_INTERVAL seconds until they load.
+    """
+    global _entity_extractor, _entity_extractor_retry_at
+    if _entity_extractor is None or (_entity_extractor.partial
+                                     and time.monotonic() >= _entity_extractor_retry_at):
+        from orchestrator.config.settings import settings
+        data_directory = Path(settings.parquet.data_directory)
+        if not data_directory.is_absolute() and not data_directory.exists():
+            # Relative to the repo root when not run from it
+            data_directory = Path(__file__).resolve().parents[2] / data_directory
+        try:
+            _entity_extractor = EntityExtractor.from_parquet(str(data_directory))
+            logger.info(f"Entity extractor ready: {len(_entity_extractor.players)} players, "
+                        f"{len(_entity_extractor.teams)} teams, {len(_entity_extractor._alias_list)} aliases")
+        except Exception as e:
+            logger.error(f"Failed to load dimension tables for entity extraction, "
+                         f"using the built-in roster: {str(e)}")
+            _entity_extractor_retry_at = time.monotonic() + DIM_RETRY_INTERVAL
+            if _entity_extractor is None:
+                _entity_extractor = EntityExtractor.builtin()
+    return _entity_extractor
@@ -0,0 +1,334 @@
+"""
+HeartBeat Engine - HLS Packager
+Montreal Canadiens Advanced Analytics Assistant
+
+On-demand HLS packaging for clips and multi-clip reels. Each clip file is
+segmented once with ffmpeg stream copy into a disk cache keyed by the
+file's path, mtime and size; reel playlists stitch the cached per-clip
+segment lists with EXT-X-DISCONTINUITY, so segments are shared by every
+reel that includes the clip.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLAYLIST_NAME = "index.m3u8"
+
+
+def clip_package_key(file_path: str) -> str:
+    """Cache key for a clip file's segments (changes when the file changes)"""
+    file_stat = os.stat(file_path)
+    return hashlib.sha1(f"{file_path}|{file_stat.st_mtime_ns}|{file_stat.st_size}".encode()).hexdigest()[:20]
+
+
+def parse_media_playlist(text: str) -> List[Tuple[float, str]]:
+    """(duration, segment URI) pairs from a media playlist"""
+    segments = []
+    duration = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXTINF:"):
+            duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+        elif line and not line.startswith("#") and duration is not None:
+            segments.append((duration, line))
+            duration = None
+    return segments
+
+
+class HLSPackager:
+    """
+    Segments clips into HLS (MPEG-TS, stream copy) on demand.
+
+    - package(): one ffmpeg run per clip file version, deduplicated across
+      concurrent requests and bounded by a worker semaphore
+    - create_reel()/reel_playlist(): reel manifests on disk; the playlist
+      lists packaged clips and stays an EVENT playlist (no ENDLIST) until
+      every clip is ready, so playback starts after the first clip is segmented
+    - a clip that fails to segment is skipped by reels and not retried
+      until failure_backoff seconds have passed
+    """
+
+    def __init__(self, cache_directory: str, segment_seconds: int = 4, max_workers: int = 2):
+        self.cache_dir = Path(cache_directory)
+        self.segments_dir = self.cache_dir / "segments"
+        self.reels_dir = self.cache_dir / "reels"
+        # Package key -> clip it was cut from, so segment requests can be access-checked
+        self.keys_dir = self.cache_dir / "keys"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.reels_dir.mkdir(parents=True, exist_ok=True)
+        self.keys_dir.mkdir(parents=True, exist_ok=True)
+
+        self.segment_seconds = segment_seconds
+        self.max_workers = max_workers
+        self.ffmpeg_timeout = 300.0
+        self.ffmpeg_available = shutil.which("ffmpeg") is not None
+        self.failure_backoff = 300.0
+
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._in_progress: Dict[str, asyncio.Task] = {}
+        # Package key -> monotonic time after which a failed clip may be retried
+        self._failed: Dict[str, float] = {}
+
+        if not self.ffmpeg_available:
+            logger.warning("ffmpeg not available - HLS packaging disabled")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    # Per-clip packaging
+
+    def package_dir(self, key: str) -> Path:
+        return self.segments_dir / key
+
+    def is_packaged(self, key: str) -> bool:
+        return (self.package_dir(key) / PLAYLIST_NAME).exists()
+
+    def is_failed(self, key: str) -> bool:
+        """True when the clip failed to segment (reels skip it)"""
+        return key in self._failed and not self.is_packaged(key)
+
+    async def package(self, file_path: str, key: Optional[str] = None) -> Optional[str]:
+        """
+        Segment a clip file (cached). Concurrent calls for the same file share
+        one ffmpeg run.
+
+        Returns:
+            Package key, or None if segmenting failed
+        """
+        key = key or clip_package_key(file_path)
+        if self.is_packaged(key):
+            return key
+        if not self.ffmpeg_available:
+            return None
+        if time.monotonic() < self._failed.get(key, 0.0):
+            return None
+
+        task = self._in_progress.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._segment(file_path, key))
+            self._in_progress[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+
+        # shield: a cancelled request must not kill a run other reels wait on
+        return key if await asyncio.shield(task) else None
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        self._in_progress.pop(key, None)
+        if not task.cancelled() and task.exception() is None and task.result():
+            self._failed.pop(key, None)
+        else:
+            self._failed[key] = time.monotonic() + self.failure_backoff
+
+    async def _segment(self, file_path: str, key: str) -> bool:
+        target_dir = self.package_dir(key)
+        temp_dir = self.segments_dir / f".{key}.tmp"
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        temp_dir.mkdir(parents=True)
+
+        cmd = [
+            "ffmpeg",
+            "-nostdin",
+            "-loglevel", "error",
+            "-i", file_path,
+            "-map", "0:v:0",
+            "-map", "0:a?",
+            "-c", "copy",
+            "-f", "hls",
+            "-hls_time", str(self.segment_seconds),
+            "-hls_playlist_type", "vod",
+            "-hls_segment_type", "mpegts",
+            "-hls_segment_filename", str(temp_dir / "seg_%05d.ts"),
+            str(temp_dir / PLAYLIST_NAME)
+        ]
+
+        try:
+            async with self._get_semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    _, stderr = await asyncio.wait_for(process.communicate(), timeout=self.ffmpeg_timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    logger.error(f"HLS segmenting timed out: {file_path}")
+                    return False
+
+            if process.returncode != 0 or not (temp_dir / PLAYLIST_NAME).exists():
+                logger.warning(f"HLS segmenting failed for {file_path}: {stderr.decode(errors='replace').strip()}")
+                return False
+
+            # Publish the whole directory at once
+            try:
+                os.rename(temp_dir, target_dir)
+            except OSError:
+                # Another process published the same key first
+                if not self.is_packaged(key):
+                    raise
+            logger.info(f"Packaged HLS segments for {Path(file_path).name} ({key})")
+            return True
+        except Exception as e:
+            logger.error(f"HLS packaging error for {file_path}: {str(e)}")
+            return False
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def segments(self, key: str) -> List[Tuple[float, str]]:
+        """(duration, segment file name) for a packaged clip"""
+        return parse_media_playlist((self.package_dir(key) / PLAYLIST_NAME).read_text())
+
+    def segment_path(self, key: str, segment_name: str) -> Optional[Path]:
+        """Path of a cached segment (None for unknown or unsafe names)"""
+        if not key.isalnum() or not segment_name.endswith(".ts") or "/" in segment_name or segment_name.startswith("."):
+            return None
+        path = self.package_dir(key) / segment_name
+        return path if path.exists() else None
+
+    def clip_id_for_key(self, key: str) -> Optional[str]:
+        """Clip a package key was registered for (None for unknown keys)"""
+        if not key.isalnum():
+            return None
+        owner_path = self.keys_dir / f"{key}.json"
+        if not owner_path.exists():
+            return None
+        return json.loads(owner_path.read_text()).get("clip_id")
+
+    def _register_key(self, key: str, clip_id: str) -> None:
+        owner_path = self.keys_dir / f"{key}.json"
+        if not owner_path.exists():
+            temp_path = owner_path.with_name(f".{owner_path.name}.tmp")
+            temp_path.write_text(json.dumps({"clip_id": clip_id}))
+            os.replace(temp_path, owner_path)
+
+    # Reels
+
+    def create_reel(self, clips: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Register a reel of clips ({"clip_id", "file_path"}) in order.
+
+        The reel id hashes the clip package keys, so the same selection of
+        unchanged files maps to the same reel and playlist.
+        """
+        entries = [
+            {"clip_id": clip["clip_id"], "file_path": clip["file_path"], "key": clip_package_key(clip["file_path"])}
+            for clip in clips
+        ]
+        for entry in entries:
+            self._register_key(entry["key"], entry["clip_id"])
+        reel_id = hashlib.sha1("|".join(entry["key"] for entry in entries).encode()).hexdigest()[:20]
+        manifest_path = self.reels_dir / f"{reel_id}.json"
+        if not manifest_path.exists():
+            temp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+            temp_path.write_text(json.dumps({"reel_id": reel_id, "clips": entries}))
+            os.replace(temp_path, manifest_path)
+        return {"reel_id": reel_id, "clips": entries}
+
+    def get_reel(self, reel_id: str) -> Optional[Dict[str, Any]]:
+        if not reel_id.isalnum():
+            return None
+        manifest_path = self.reels_dir / f"{reel_id}.json"
+        if not manifest_path.exists():
+            return None
+        return json.loads(manifest_path.read_text())
+
+    async def prepare_reel(self, reel: Dict[str, Any]) -> bool:
+        """
+        Package the reel's first playable clip now and the rest in the
+        background; clips that fail to segment are skipped.
+
+        Returns:
+            True when at least one clip is playable
+        """
+        entries = reel["clips"]
+        playable = False
+        for index, entry in enumerate(entries):
+            if await self.package(entry["file_path"], entry["key"]) is not None:
+                playable = True
+                break
+
+        if playable:
+            for entry in entries[index + 1:]:
+                if not self.is_packaged(entry["key"]) and not self.is_failed(entry["key"]):
+                    asyncio.ensure_future(self.package(entry["file_path"], entry["key"]))
+        return playable
+
+    def reel_playlist(self, reel: Dict[str, Any], segment_url: Callable[[str, str], str]) -> Tuple[str, bool]:
+        """
+        Media playlist stitching the reel's packaged clips.
+
+        Clips are listed in order up to the first one that is not packaged
+        yet; until all are, the playlist has no EXT-X-ENDLIST so players
+        keep polling for the rest. Clips that failed to segment are left
+        out, so a broken file cannot keep the playlist open forever.
+
+        Args:
+            reel: Reel manifest from create_reel/get_reel
+            segment_url: (package key, segment name) -> URI
+
+        Returns:
+            (playlist text, complete); complete is False while clips are
+            pending and when any clip was skipped (a later retry may add it)
+        """
+        body: List[str] = []
+        target = self.segment_seconds
+        closed = True
+        skipped = False
+
+        for entry in reel["clips"]:
+            if self.is_failed(entry["key"]):
+                skipped = True
+                continue
+            if not self.is_packaged(entry["key"]):
+                closed = False
+                break
+            if body:
+                body.append("#EXT-X-DISCONTINUITY")
+            for duration, name in self.segments(entry["key"]):
+                target = max(target, math.ceil(duration))
+                body.append(f"#EXTINF:{duration:.3f},")
+                body.append(segment_url(entry["key"], name))
+
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            # EVENT throughout: the type must not change between reloads, and
+            # EVENT + ENDLIST plays as VOD
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            *body,
+        ]
+        if closed:
+            lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n", closed and not skipped
+
+
+_hls_packager: Optional[HLSPackager] = None
+
+
+def get_hls_packager() -> HLSPackager:
+    """Process-wide packager caching under <clips>/hls"""
+    global _hls_packager
+    if _hls_packager is None:
+        from orchestrator.config.settings import settings
+        _hls_packager = HLSPackager(str(Path(settings.clips_base_path) / "hls"))
+    return _hls_packager
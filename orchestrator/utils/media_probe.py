@@ -0,0 +1,154 @@
+"""
+HeartBeat Engine - Media Probe
+Montreal Canadiens Advanced Analytics Assistant
+
+ffprobe-backed extraction of clip media metadata (duration, resolution,
+codec, bitrate, keyframe interval) with a bounded pool of concurrent
+ffprobe processes.
+"""
+
+import asyncio
+import json
+import logging
+import shutil
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds of packets read to estimate the keyframe interval
+KEYFRAME_SAMPLE_SECONDS = 20
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_probe_output(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce ffprobe JSON (format, first video stream, sampled packets) to
+    the fields the clip catalog stores.
+    """
+    format_info = data.get("format") or {}
+    streams = data.get("streams") or []
+    video = streams[0] if streams else {}
+
+    duration = _to_float(format_info.get("duration")) or _to_float(video.get("duration"))
+    width = int(video.get("width") or 0)
+    height = int(video.get("height") or 0)
+    bitrate = int(_to_float(format_info.get("bit_rate")) or _to_float(video.get("bit_rate")))
+
+    # Mean gap between keyframe packets over the sampled window
+    keyframe_times = sorted(
+        _to_float(packet.get("pts_time"))
+        for packet in data.get("packets") or []
+        if "K" in (packet.get("flags") or "") and packet.get("pts_time") not in (None, "N/A")
+    )
+    keyframe_interval = 0.0
+    if len(keyframe_times) >= 2:
+        keyframe_interval = (keyframe_times[-1] - keyframe_times[0]) / (len(keyframe_times) - 1)
+
+    return {
+        "duration_seconds": round(duration, 3),
+        "width": width,
+        "height": height,
+        "resolution": f"{width}x{height}" if width and height else "",
+        "codec": video.get("codec_name") or "",
+        "bitrate": bitrate,
+        "keyframe_interval": round(keyframe_interval, 3),
+    }
+
+
+class MediaProbe:
+    """
+    Runs ffprobe as async subprocesses, at most max_workers at a time.
+
+    One ffprobe call per file reads container/stream info plus the packet
+    flags of the first KEYFRAME_SAMPLE_SECONDS to estimate the keyframe
+    interval (which bounds how precisely stream-copy cuts can start).
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.available = shutil.which("ffprobe") is not None
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+        if not self.available:
+            logger.warning("ffprobe not available - clip media metadata will not be probed")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def probe(self, file_path: str) -> Dict[str, Any]:
+        """
+        Probe one file.
+
+        Returns:
+            Parsed metadata, or {"error": ...} when ffprobe fails
+        """
+        if not self.available:
+            return {"error": "ffprobe not available"}
+
+        cmd = [
+            "ffprobe",
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", f"%+{KEYFRAME_SAMPLE_SECONDS}",
+            "-show_entries",
+            "format=duration,bit_rate:stream=codec_name,width,height,bit_rate,duration:packet=pts_time,flags",
+            "-of", "json",
+            file_path
+        ]
+
+        async with self._get_semaphore():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                return {"error": f"ffprobe failed to start: {e}"}
+
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return {"error": "ffprobe timeout"}
+
+        if process.returncode != 0:
+            return {"error": stderr.decode(errors="replace").strip() or f"ffprobe exited {process.returncode}"}
+
+        try:
+            return parse_probe_output(json.loads(stdout or b"{}"))
+        except (ValueError, TypeError, AttributeError) as e:
+            return {"error": f"Unreadable ffprobe output: {e}"}
+
+    async def probe_many(self, file_paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Probe files concurrently (bounded by max_workers)"""
+        file_paths: List[str] = list(file_paths)
+        results = await asyncio.gather(*[self.probe(path) for path in file_paths])
+        return dict(zip(file_paths, results))
+
+
+_media_probe: Optional[MediaProbe] = None
+
+
+def get_media_probe() -> MediaProbe:
+    """Process-wide media probe sized from settings"""
+    global _media_probe
+    if _media_probe is None:
+        from orchestrator.config.settings import settings
+        _media_probe = MediaProbe(max_workers=settings.media_probe_workers)
+    return _media_probe
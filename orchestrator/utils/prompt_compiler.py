@@ -0,0 +1,327 @@
+"""
+HeartBeat Engine - Synthesis Prompt Compiler
+Montreal Canadiens Advanced Analytics Assistant
+
+Builds the response-synthesis prompt within a per-role token budget.
+Evidence is ranked and rendered compactly: retrieved context by relevance
+(near-duplicates dropped), tabular parquet results as one stat line per
+row with the most relevant columns, clips by relevance, citations
+de-duplicated. Sections share the budget and hand unused tokens to the
+others. The instruction prefix never varies between requests, so
+provider-side prompt caching can reuse it.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Rough BPE estimate for English text with numbers; no tokenizer dependency
+CHARS_PER_TOKEN = 4
+
+# Budget shares of the evidence sections, in fill priority order
+SECTION_SHARES = (
+    ("analytics", 0.40),
+    ("context", 0.30),
+    ("clips", 0.15),
+    ("evidence", 0.15),
+)
+SECTION_TITLES = {
+    "context": "HOCKEY CONTEXT RETRIEVED",
+    "analytics": "STATISTICAL ANALYTICS",
+    "clips": "VIDEO CLIPS & SHIFTS",
+    "evidence": "EVIDENCE SOURCES",
+}
+EMPTY_SECTION_TEXT = {
+    "context": "No specific hockey context retrieved.",
+    "analytics": "No analytics data available.",
+    "clips": "No video clips or shifts available.",
+    "evidence": "No evidence chain available.",
+}
+
+# Columns that identify a row, and the stats to show first when present
+LABEL_COLUMNS = ("Player Name", "player_name", "full_name", "Player", "name", "Team",
+                 "team", "Opponent", "opponent", "Game", "game_id", "Date", "Section", "Metric Label")
+KEY_STAT_COLUMNS = ("Position", "GP", "games_played", "G", "goals", "A", "assists", "P", "points",
+                    "Points", "+/-", "plus_minus", "TOI", "TOI/GP", "Total Goals", "Expected Goals",
+                    "xG", "xg", "CF%", "SH%", "SV%", "GAA", "Result", "Score", "MTL_G", "OPP_G")
+MAX_STATS_PER_ROW = 10
+MAX_CONTEXT_CHARS = 400
+SKIPPED_PAYLOAD_KEYS = {"sample_data", "columns", "data_files", "metrics", "clips", "players_requested"}
+
+_WORD_RE = re.compile(r"[a-z0-9%+]+")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut text at a word boundary so it fits in `tokens`"""
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:max(limit - 3, 0)].rsplit(" ", 1)[0]
+    return cut + "..."
+
+
+def format_value(value: Any) -> Optional[str]:
+    """Compact scalar rendering; None for values not worth a token"""
+    if value is None or isinstance(value, (dict, list, tuple, set)):
+        return None
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        return str(int(value)) if value.is_integer() else f"{value:.3g}" if abs(value) < 1 else f"{value:.1f}"
+    text = str(value).strip()
+    return text or None
+
+
+def dedupe_citations(citations: Iterable[str]) -> List[str]:
+    """Unique citations, first-seen order"""
+    return list(dict.fromkeys(c.strip() for c in citations if c and c.strip()))
+
+
+def rank_context(chunks: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Most relevant first, dropping chunks whose text repeats an earlier one"""
+    ranked = sorted(chunks, key=lambda c: c.get("relevance_score") or 0.0, reverse=True)
+    seen = set()
+    unique = []
+    for chunk in ranked:
+        fingerprint = " ".join(_WORD_RE.findall(str(chunk.get("content", "")).lower())[:20])
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        unique.append(chunk)
+    return unique
+
+
+def context_lines(chunks: Sequence[Dict[str, Any]]) -> List[str]:
+    lines = []
+    for i, chunk in enumerate(rank_context(chunks), 1):
+        content = " ".join(str(chunk.get("content", "")).split())
+        source = chunk.get("source", "unknown")
+        category = chunk.get("category", "general")
+        lines.append(f"{i}. [{source}:{category}] {truncate_to_tokens(content, MAX_CONTEXT_CHARS // CHARS_PER_TOKEN)}")
+    return lines
+
+
+def _rank_columns(columns: Iterable[str], query_words: set) -> List[str]:
+    priority = {name: i for i, name in enumerate(KEY_STAT_COLUMNS)}
+
+    def key(item):
+        # Key stats, then columns named by the query, then the rest (percentile
+        # companions last), each in table order
+        position, column = item
+        overlap = len(query_words & set(_WORD_RE.findall(column.lower())))
+        return (priority.get(column, len(priority)), -overlap, "percentile" in column.lower(), position)
+
+    return [column for _, column in sorted(enumerate(columns), key=key)]
+
+
+def stat_line(row: Dict[str, Any], query_words: set) -> str:
+    """One row as 'label: stat value, stat value, ...'"""
+    label_parts = [format_value(row.get(column)) for column in LABEL_COLUMNS if column in row]
+    label_parts = [part for part in label_parts if part][:2]
+    stats = []
+    for column in _rank_columns([c for c in row if c not in LABEL_COLUMNS], query_words):
+        value = format_value(row[column])
+        if value is not None:
+            stats.append(f"{column} {value}")
+        if len(stats) >= MAX_STATS_PER_ROW:
+            break
+    label = " / ".join(label_parts) or "row"
+    return f"- {label}: {', '.join(stats)}" if stats else f"- {label}"
+
+
+def _flat_pairs(data: Dict[str, Any]) -> List[str]:
+    pairs = []
+    for name, value in data.items():
+        if isinstance(value, dict):
+            inner = [f"{k} {format_value(v)}" for k, v in value.items() if format_value(v) is not None]
+            if inner:
+                pairs.append(f"{name} ({', '.join(inner)})")
+        else:
+            text = format_value(value)
+            if text is not None:
+                pairs.append(f"{name} {text}")
+    return pairs
+
+
+def analytics_lines(analytics: Dict[str, Any], query: str = "") -> List[str]:
+    """Summarize a parquet payload into a header plus compact stat lines"""
+    if not analytics:
+        return []
+    if "error" in analytics:
+        return [f"Analytics error: {analytics['error']}"]
+
+    query_words = set(_WORD_RE.findall(query.lower()))
+    header = _flat_pairs({k: v for k, v in analytics.items()
+                          if k not in SKIPPED_PAYLOAD_KEYS and not isinstance(v, dict)})
+    lines = [" | ".join(header)] if header else []
+    if analytics.get("players"):
+        lines.append(f"Players: {', '.join(map(str, analytics['players']))}")
+
+    metrics = analytics.get("metrics")
+    if isinstance(metrics, dict):
+        nested = {k: v for k, v in metrics.items() if isinstance(v, dict)}
+        scalars = {k: v for k, v in metrics.items() if not isinstance(v, dict)}
+        for name, stats in nested.items():
+            pairs = _flat_pairs(stats)
+            if pairs:
+                lines.append(f"- {name}: {', '.join(pairs)}")
+        if scalars:
+            lines.append(f"- {', '.join(_flat_pairs(scalars))}")
+
+    for row in analytics.get("sample_data") or []:
+        if isinstance(row, dict):
+            lines.append(stat_line(row, query_words))
+
+    summary = analytics.get("summary")
+    if isinstance(summary, dict) and summary:
+        lines.append(f"Summary: {', '.join(_flat_pairs(summary))}")
+    return lines
+
+
+def clip_lines(clips: Sequence[Dict[str, Any]]) -> List[str]:
+    ranked = sorted(clips, key=lambda c: c.get("relevance_score") or 0.0, reverse=True)
+    lines = []
+    for i, clip in enumerate(ranked, 1):
+        line = (f"{i}. {clip.get('title', f'Clip {i}')} - {clip.get('player_name', 'Unknown Player')} "
+                f"({clip.get('event_type', 'shift')})")
+        if clip.get("game_info"):
+            line += f" | {clip['game_info']}"
+        duration = clip.get("duration") or 0
+        if duration > 0:
+            line += f" | {duration}s"
+        lines.append(line)
+    return lines
+
+
+def fit_lines(lines: Sequence[str], budget: int) -> Tuple[str, int, int]:
+    """
+    Keep leading lines while they fit the token budget; the first line is
+    truncated rather than dropped so a section is never empty.
+
+    Returns (text, tokens used, lines dropped).
+    """
+    kept: List[str] = []
+    used = 0
+    for line in lines:
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            if kept:
+                break
+            line = truncate_to_tokens(line, max(budget - 1, 8))
+            cost = estimate_tokens(line) + 1
+        kept.append(line)
+        used += cost
+    dropped = len(lines) - len(kept)
+    if dropped:
+        note = f"(+{dropped} more omitted for length)"
+        kept.append(note)
+        used += estimate_tokens(note) + 1
+    return "\n".join(kept), used, dropped
+
+
+def allocate_budget(demands: Dict[str, int], available: int) -> Dict[str, int]:
+    """Split `available` by SECTION_SHARES; tokens a section doesn't need go to the others"""
+    allocation = {name: min(demands.get(name, 0), int(available * share)) for name, share in SECTION_SHARES}
+    spare = available - sum(allocation.values())
+    for name, _ in SECTION_SHARES:
+        if spare <= 0:
+            break
+        extra = min(spare, demands.get(name, 0) - allocation[name])
+        allocation[name] += extra
+        spare -= extra
+    return allocation
+
+
+@dataclass
+class CompiledPrompt:
+    """Synthesis prompt split into the cacheable prefix and the per-request body"""
+    prefix: str
+    body: str
+    budget: int
+    tokens: int
+    section_tokens: Dict[str, int] = field(default_factory=dict)
+    dropped: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        return f"{self.prefix}\n\n{self.body}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "prefix_tokens": estimate_tokens(self.prefix),
+            "section_tokens": self.section_tokens,
+            "dropped": self.dropped,
+        }
+
+
+class PromptCompiler:
+    """
+    Compiles synthesis prompts as [stable prefix][role block][evidence][instructions + query].
+
+    The prefix is fixed at construction; everything request-specific comes
+    after it.
+    """
+
+    def __init__(self, prefix: str, min_evidence_tokens: int = 200):
+        self.prefix = prefix.strip()
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        self.min_evidence_tokens = min_evidence_tokens
+
+    def compile(
+        self,
+        query: str,
+        role_block: str,
+        instructions: str,
+        budget: int,
+        context: Sequence[Dict[str, Any]] = (),
+        analytics: Optional[Dict[str, Any]] = None,
+        clips: Sequence[Dict[str, Any]] = (),
+        citations: Iterable[str] = ()
+    ) -> CompiledPrompt:
+        tail = f"{instructions.strip()}\n\nUSER QUERY: {query}\n\nGenerate your professional hockey analytics response:"
+        fixed = self.prefix_tokens + estimate_tokens(role_block) + estimate_tokens(tail)
+        # Section titles and blank lines
+        fixed += sum(estimate_tokens(title) + 2 for title in SECTION_TITLES.values())
+        available = max(budget - fixed, self.min_evidence_tokens)
+
+        section_lines = {
+            "context": context_lines(context),
+            "analytics": analytics_lines(analytics or {}, query),
+            "clips": clip_lines(clips),
+            # One per line so citations can be dropped individually
+            "evidence": [f"- {citation}" for citation in dedupe_citations(citations)],
+        }
+
+        demands = {name: sum(estimate_tokens(line) + 1 for line in lines) for name, lines in section_lines.items()}
+        allocation = allocate_budget(demands, available)
+
+        sections = []
+        section_tokens = {}
+        dropped = {}
+        for name in ("context", "analytics", "clips", "evidence"):
+            lines = section_lines[name]
+            if lines:
+                text, used, omitted = fit_lines(lines, allocation[name])
+            else:
+                text, used, omitted = EMPTY_SECTION_TEXT[name], estimate_tokens(EMPTY_SECTION_TEXT[name]), 0
+            sections.append(f"{SECTION_TITLES[name]}:\n{text}")
+            section_tokens[name] = used
+            if omitted:
+                dropped[name] = omitted
+
+        body = "\n\n".join([role_block.strip(), *sections, tail])
+        return CompiledPrompt(
+            prefix=self.prefix,
+            body=body,
+            budget=budget,
+            tokens=self.prefix_tokens + estimate_tokens(body),
+            section_tokens=section_tokens,
+            dropped=dropped
+        )
@@ -0,0 +1,253 @@
+"""
+HeartBeat Engine - Response Cache
+Montreal Canadiens Advanced Analytics Assistant
+
+Full-response cache in front of HeartBeatOrchestrator.process_query.
+Entries are keyed on the normalized query, the user's role/permission
+scope and a data-version stamp (parquet files + clip catalog), so a repeat
+question skips intent analysis, retrieval, parquet scans and the LLM call
+until the data changes or the TTL runs out. Concurrent identical queries
+share one in-flight run.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import unicodedata
+import weakref
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from orchestrator.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Queries in the first person depend on who asks ("show me my shifts")
+FIRST_PERSON_WORDS = {"i", "me", "my", "mine", "myself"}
+
+DATA_FILE_SUFFIXES = (".parquet", ".arrow")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, strip accents/punctuation and collapse whitespace"""
+    text = unicodedata.normalize("NFKD", query)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace("'", "").replace("’", "")
+    text = "".join(ch if ch.isalnum() else " " for ch in text)
+    return " ".join(text.split())
+
+
+def user_scope(normalized_query: str, user_context) -> Tuple[str, Tuple[str, ...], str]:
+    """(role, permission scope, user) an answer to this query may be shared within"""
+    role = getattr(user_context.role, "value", str(user_context.role))
+    scope = tuple(sorted(user_context.team_access or []))
+    # Personal answers are cached per user, everything else per role
+    personal = role == "player" or bool(FIRST_PERSON_WORDS & set(normalized_query.split()))
+    user = user_context.user_id if personal else ""
+    return role, scope, user
+
+
+class DataVersion:
+    """
+    Stamp that changes whenever the parquet data or the clip catalog does.
+
+    stamp() only reads the last computed value, so it is cheap enough to
+    call per request. Once it is older than check_interval the data tree is
+    walked again in the default executor (or inline when called off the
+    event loop), and requests keep the previous stamp until that finishes.
+    """
+
+    def __init__(self, data_directory: str, clips_base_path: Optional[str] = None,
+                 check_interval: float = 30.0):
+        self.data_directory = Path(data_directory)
+        self.clips_base_path = clips_base_path
+        self.check_interval = check_interval
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._stamp = ""
+        self._checked_at = 0.0
+        self.refresh()
+
+    def _data_files_stamp(self) -> str:
+        count = 0
+        latest = 0
+        total_bytes = 0
+        stack = [str(self.data_directory)]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(DATA_FILE_SUFFIXES):
+                        entry_stat = entry.stat()
+                        count += 1
+                        total_bytes += entry_stat.st_size
+                        latest = max(latest, entry_stat.st_mtime_ns)
+        return f"{count}:{total_bytes}:{latest}"
+
+    def _clip_catalog_stamp(self) -> str:
+        if not self.clips_base_path:
+            return ""
+        try:
+            from orchestrator.models.clip_models import get_clip_index_manager
+            return str(get_clip_index_manager(self.clips_base_path).catalog_version())
+        except Exception as e:
+            logger.debug(f"Clip catalog version unavailable: {str(e)}")
+            return ""
+
+    def refresh(self) -> str:
+        """Walk the data tree and the clip catalog now (blocking)"""
+        try:
+            self._stamp = f"{self._data_files_stamp()}|{self._clip_catalog_stamp()}"
+            self._checked_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Data version refresh failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+        return self._stamp
+
+    def stamp(self) -> str:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            with self._lock:
+                start = not self._refreshing
+                self._refreshing = True
+            if start:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    loop = None
+                if loop is None:
+                    self.refresh()
+                else:
+                    loop.run_in_executor(None, self.refresh)
+        return self._stamp
+
+
+class ResponseCache:
+    """
+    TTL/LRU response cache with single-flight de-duplication.
+
+    get_or_compute() returns a cached response, joins an identical query
+    already running on this event loop, or runs the query once and caches
+    the result when it succeeded. bypass=True always runs the query (and
+    refreshes the entry).
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600.0,
+                 data_version: Optional[Callable[[], str]] = None):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.data_version = data_version or (lambda: "")
+        self._in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+        self.bypassed = 0
+        self.uncacheable = 0
+
+    def _get_in_flight(self) -> Dict[Hashable, asyncio.Task]:
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(loop)
+        if in_flight is None:
+            in_flight = {}
+            self._in_flight[loop] = in_flight
+        return in_flight
+
+    def make_key(self, query: str, user_context, query_type=None) -> Tuple:
+        """(normalized query, role, permission scope, data version, type hint)"""
+        normalized = normalize_query(query)
+        role, scope, user = user_scope(normalized, user_context)
+        hint = getattr(query_type, "value", query_type) or ""
+        return (normalized, role, scope, user, self.data_version(), hint)
+
+    @staticmethod
+    def is_cacheable(response: Dict[str, Any]) -> bool:
+        return (
+            isinstance(response, dict)
+            and response.get("success", True)
+            and not response.get("error")
+            and not response.get("errors")
+        )
+
+    async def _run(self, key: Hashable, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        response = await compute()
+        if self.is_cacheable(response):
+            self._cache.set(key, (time.time(), response))
+        else:
+            self.uncacheable += 1
+        return response
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        bypass: bool = False
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """
+        Returns:
+            (response, status, cached_at) with status "hit", "coalesced",
+            "miss" or "bypass"; cached_at is 0.0 unless status is "hit"
+        """
+        in_flight = self._get_in_flight()
+
+        if bypass:
+            self.bypassed += 1
+        else:
+            entry = self._cache.get(key)
+            if entry is not None:
+                cached_at, response = entry
+                return response, "hit", cached_at
+            task = in_flight.get(key)
+            if task is not None:
+                self.coalesced += 1
+                return await asyncio.shield(task), "coalesced", 0.0
+
+        # Run in a task so a cancelled caller does not abort the query the
+        # other waiters joined (and the result still gets cached)
+        task = asyncio.ensure_future(self._run(key, compute))
+        in_flight[key] = task
+        task.add_done_callback(lambda done: in_flight.pop(key, None) if in_flight.get(key) is done else None)
+        return await asyncio.shield(task), "bypass" if bypass else "miss", 0.0
+
+    def clear(self) -> None:
+        self._cache.clear()
+        logger.info("Response cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self._cache.get_stats()
+        stats.update({
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "uncacheable": self.uncacheable,
+        })
+        return stats
+
+
+_response_cache: Optional[ResponseCache] = None
+_data_version: Optional[DataVersion] = None
+
+
+def get_data_version() -> DataVersion:
+    """Process-wide data-version stamp shared by the response caches"""
+    global _data_version
+    if _data_version is None:
+        from orchestrator.config.settings import settings
+        _data_version = DataVersion(settings.parquet.data_directory, settings.clips_base_path)
+    return _data_version
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache sized from settings"""
+    global _response_cache
+    if _response_cache is None:
+        from orchestrator.config.settings import settings
+        _response_cache = ResponseCache(
+            max_entries=settings.orchestration.response_cache_max_entries,
+            ttl_seconds=settings.orchestration.response_cache_ttl_seconds,
+            data_version=get_data_version().stamp
+        )
+    return _response_cache
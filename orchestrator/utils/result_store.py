@@ -0,0 +1,128 @@
+"""
+HeartBeat Engine - Per-Request Result Store
+Montreal Canadiens Advanced Analytics Assistant
+
+Keeps large tool payloads (parquet sample rows and column lists, retrieved
+context chunks, clip lists) out of the LangGraph state. Tool nodes put a
+payload in the request's store and carry a small ResultHandle in state;
+only the response synthesizer and the response formatter resolve handles,
+projecting the fields they actually use. The orchestrator closes the store
+when the request finishes.
+"""
+
+import logging
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResultHandle:
+    """Reference to a payload in the request's result store"""
+    key: str          # unique within the request, e.g. "parquet_query:2"
+    kind: str         # ToolType value of the producing tool
+    items: int = 0    # record count, so callers can log/check without resolving
+
+
+def project(payload: Any, fields: Optional[Iterable[str]] = None, exclude: Iterable[str] = ()) -> Any:
+    """
+    Keep only `fields` (or drop `exclude`) from a dict payload, or from each
+    dict in a list payload. Other payloads are returned unchanged.
+    """
+    if isinstance(payload, list):
+        return [project(item, fields, exclude) for item in payload]
+    if not isinstance(payload, dict):
+        return payload
+    if fields is not None:
+        return {name: payload[name] for name in fields if name in payload}
+    excluded = set(exclude)
+    return {name: value for name, value in payload.items() if name not in excluded}
+
+
+class ResultStore:
+    """Payloads for one request, keyed by handle"""
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self._payloads: Dict[str, Any] = {}
+        self._next_seq = 1
+
+    def put(self, kind: str, payload: Any) -> ResultHandle:
+        key = f"{kind}:{self._next_seq}"
+        self._next_seq += 1
+        self._payloads[key] = payload
+        items = len(payload) if isinstance(payload, (list, tuple)) else 1 if payload else 0
+        return ResultHandle(key=key, kind=kind, items=items)
+
+    def get(self, handle: ResultHandle, default: Any = None) -> Any:
+        return self._payloads.get(handle.key, default)
+
+    def project(self, handle: ResultHandle, fields: Optional[Iterable[str]] = None,
+                exclude: Iterable[str] = ()) -> Any:
+        return project(self.get(handle), fields, exclude)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All payloads by key (for caching a whole answer)"""
+        return dict(self._payloads)
+
+    def restore(self, payloads: Dict[str, Any]) -> None:
+        """Re-insert a snapshot so its handles resolve in this request"""
+        self._payloads.update(payloads)
+        for key in payloads:
+            # Keep new keys from colliding with restored ones
+            seq = key.rsplit(":", 1)[-1]
+            if seq.isdigit():
+                self._next_seq = max(self._next_seq, int(seq) + 1)
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+
+_stores: Dict[str, ResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def get_result_store(request_id: str) -> ResultStore:
+    """The store for a request, created on first use"""
+    with _stores_lock:
+        store = _stores.get(request_id)
+        if store is None:
+            store = ResultStore(request_id)
+            _stores[request_id] = store
+        return store
+
+
+def close_result_store(request_id: str) -> None:
+    """Release a finished request's payloads"""
+    with _stores_lock:
+        _stores.pop(request_id, None)
+
+
+def open_store_count() -> int:
+    with _stores_lock:
+        return len(_stores)
+
+
+def put_result(state, kind: Any, payload: Any) -> ResultHandle:
+    """Store a tool payload (kind: ToolType or its value) for the request this state belongs to"""
+    return get_result_store(state["request_id"]).put(getattr(kind, "value", kind), payload)
+
+
+def resolve_result(state, handle: Any, fields: Optional[Iterable[str]] = None,
+                   exclude: Iterable[str] = ()) -> Any:
+    """Projected payload behind a handle; non-handle values pass through"""
+    if not isinstance(handle, ResultHandle):
+        return project(handle, fields, exclude)
+    with _stores_lock:
+        store = _stores.get(state["request_id"])
+    if store is None:
+        logger.warning(f"Result store for request {state['request_id']} already closed")
+        return None
+    return store.project(handle, fields, exclude)
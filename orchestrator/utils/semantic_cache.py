@@ -0,0 +1,442 @@
+"""
+HeartBeat Engine - Semantic Response Cache
+Montreal Canadiens Advanced Analytics Assistant
+
+Second-tier cache for paraphrased questions. The exact-match response cache
+misses "Suzuki stats this season" vs "how is Nick Suzuki doing this year";
+this cache embeds the query wording (entities removed, synonyms folded)
+with hashed n-gram features, finds the nearest cached query in a local
+in-memory index and reuses its answer only when the similarity clears a
+threshold AND the guard terms match exactly: recognized players/teams,
+numbers, time qualifiers, stat categories and the side of a stat (for or
+against, offensive or defensive zone, home or road, strength state). A
+near neighbour that fails the guard ("Caufield stats this season") is
+counted as a rejected false hit.
+"""
+
+import logging
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from orchestrator.utils.response_cache import normalize_query, user_scope
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 256
+
+# Words that carry no meaning for cache matching
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am", "do", "does",
+    "did", "has", "have", "had", "of", "in", "on", "at", "to", "by", "with",
+    "about", "from", "and", "or", "so", "far", "how", "what", "whats", "which", "can",
+    "could", "would", "you", "please", "give", "tell", "show", "me", "us", "i", "its",
+    "it", "he", "his", "him", "they", "their", "them", "s", "get", "let", "know",
+    "looking", "look", "like", "much", "many", "any", "some", "up", "there",
+}
+
+# Multi-word expressions folded to one token before embedding
+PHRASE_SYNONYMS = {
+    "expected goals": "xg",
+    "power play": "powerplay",
+    "pp": "powerplay",
+    "penalty kill": "pk",
+    "plus minus": "plusminus",
+    "time on ice": "toi",
+    "ice time": "toi",
+    "save percentage": "svpct",
+    "save pct": "svpct",
+    "shooting percentage": "shpct",
+    "shooting pct": "shpct",
+    "face offs": "faceoffs",
+    "even strength": "5v5",
+    "5 on 5": "5v5",
+    "5 v 5": "5v5",
+    "short handed": "shorthanded",
+    "this year": "this season",
+    "last year": "last season",
+    "so far": "",
+}
+
+# Single words folded to a canonical form
+WORD_SYNONYMS = {
+    "year": "season",
+    "campaign": "season",
+    "doing": "stats",
+    "performing": "stats",
+    "performed": "stats",
+    "performance": "stats",
+    "statistics": "stats",
+    "stat": "stats",
+    "numbers": "stats",
+    "playing": "stats",
+    "played": "stats",
+    "goal": "goals",
+    "assist": "assists",
+    "point": "points",
+    "shot": "shots",
+    "hit": "hits",
+    "save": "saves",
+    "faceoff": "faceoffs",
+    "clip": "clips",
+    "video": "clips",
+    "videos": "clips",
+    "footage": "clips",
+    "highlight": "clips",
+    "highlights": "clips",
+    "replay": "clips",
+    "replays": "clips",
+    "shift": "shifts",
+    "games": "game",
+    "matches": "game",
+    "match": "game",
+    "versus": "vs",
+    "score": "scored",
+    "allow": "against",
+    "allowed": "against",
+    "conceded": "against",
+    "offense": "offensive",
+    "defense": "defensive",
+    "defence": "defensive",
+    "road": "away",
+    "even": "5v5",
+    "evenstrength": "5v5",
+    "previous": "last",
+    "past": "last",
+    "recent": "last",
+    "lately": "last",
+    "current": "this",
+    "tonights": "tonight",
+}
+
+# Terms that change what is being asked; they must match exactly
+QUALIFIER_TERMS = {
+    "this", "last", "next", "career", "season", "playoffs", "playoff", "tonight",
+    "today", "yesterday", "first", "second", "third", "overtime",
+    "period", "best", "worst", "most", "least", "top", "bottom", "not", "without",
+    "per", "average", "total", "vs",
+}
+STAT_TERMS = {
+    "goals", "assists", "points", "shots", "hits", "saves", "blocks", "takeaways",
+    "giveaways", "faceoffs", "xg", "corsi", "fenwick", "pdo", "toi", "powerplay",
+    "pk", "plusminus", "svpct", "shpct", "penalties", "pim", "shifts", "clips",
+    "record", "standings", "wins", "losses",
+}
+# Which side of a stat is asked for ("goals for" vs "goals against", home vs
+# road, 5v5 vs shorthanded); never folded into one another
+DIRECTION_TERMS = {
+    "for", "against", "scored", "offensive", "defensive", "neutral", "home",
+    "away", "5v5", "shorthanded",
+}
+
+# "against"/"for" right before a recognized player or team name is about the
+# opponent or subject ("against Toronto" = "vs Toronto"), not a stat direction
+_ENTITY_PREFIX_RE = re.compile(r"\b(against|for)(\s+the)?\s*$", re.IGNORECASE)
+
+# Wording that makes entity order meaningful ("is Suzuki better than
+# Caufield" is not "is Caufield better than Suzuki")
+COMPARISON_TERMS = {
+    "than", "better", "worse", "vs", "compare", "compared", "comparison",
+    "outscored", "outplayed", "beat", "beats",
+}
+
+_NUMBER_RE = re.compile(r"^\d+$")
+_PHRASE_RE = re.compile(r"\b(" + "|".join(
+    re.escape(phrase) for phrase in sorted(PHRASE_SYNONYMS, key=len, reverse=True)
+) + r")\b")
+
+
+@dataclass
+class QuerySignature:
+    """What the semantic cache compares: embedded wording plus exact guard terms"""
+    terms: Tuple[str, ...]
+    guard: FrozenSet[str]
+    vector: np.ndarray
+
+
+@dataclass
+class _Entry:
+    query: str
+    partition: Tuple
+    guard: FrozenSet[str]
+    payload: Dict[str, Any]
+    created_at: float
+    last_used: float = field(default=0.0)
+
+
+def _feature_slot(feature: str, dim: int) -> Tuple[int, float]:
+    """Stable hashed bucket and sign for a feature string"""
+    h = zlib.crc32(feature.encode("utf-8"))
+    return h % dim, 1.0 if (h >> 31) & 1 else -1.0
+
+
+def embed_terms(terms: Tuple[str, ...], dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """
+    L2-normalized hashed embedding of word unigrams, word bigrams and
+    character trigrams (the latter absorb typos and inflections).
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    if not terms:
+        terms = ("<empty>",)
+    for i, term in enumerate(terms):
+        slot, sign = _feature_slot(f"w:{term}", dim)
+        vector[slot] += sign
+        if i:
+            slot, sign = _feature_slot(f"b:{terms[i - 1]}_{term}", dim)
+            vector[slot] += 0.5 * sign
+        padded = f"<{term}>"
+        grams = [padded[j:j + 3] for j in range(len(padded) - 2)]
+        for gram in grams:
+            slot, sign = _feature_slot(f"c:{gram}", dim)
+            vector[slot] += 0.5 * sign / len(grams) ** 0.5
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def query_signature(query: str, extractor, dim: int = EMBEDDING_DIM) -> QuerySignature:
+    """Split a query into embedded wording and exact-match guard terms"""
+    guard = set()
+    entities = []
+    # Blank out recognized entities so only the wording is embedded
+    chars = list(query)
+    for match in extractor.extract(query):
+        guard.add(f"{match.entity_type}:{match.entity_id}")
+        entities.append(f"{match.entity_type}:{match.entity_id}")
+        chars[match.start:match.end] = " " * (match.end - match.start)
+        prefix = _ENTITY_PREFIX_RE.search(query, 0, match.start)
+        if prefix:
+            word = "vs" if prefix.group(1).lower() == "against" else ""
+            chars[prefix.start(1):prefix.end(1)] = word.ljust(prefix.end(1) - prefix.start(1))
+
+    text = _PHRASE_RE.sub(lambda m: PHRASE_SYNONYMS[m.group(1)], normalize_query("".join(chars)))
+    terms = []
+    words = [WORD_SYNONYMS.get(word, word) for word in text.split()]
+    # Comparisons keep the order their entities were named in
+    if len(entities) > 1 and COMPARISON_TERMS.intersection(words):
+        guard.add("order:" + ">".join(entities))
+    for word in words:
+        if _NUMBER_RE.match(word):
+            guard.add(f"num:{int(word)}")
+            continue
+        if word in STOPWORDS:
+            continue
+        if word == "for" and not (terms and terms[-1] in STAT_TERMS):
+            continue
+        if word in QUALIFIER_TERMS or word in STAT_TERMS or word in DIRECTION_TERMS:
+            guard.add(f"term:{word}")
+        if not terms or terms[-1] != word:
+            terms.append(word)
+
+    # "stats" is implied once a specific stat category is named
+    if STAT_TERMS.intersection(terms):
+        terms = [term for term in terms if term != "stats"]
+    terms = tuple(terms)
+    return QuerySignature(terms=terms, guard=frozenset(guard), vector=embed_terms(terms, dim))
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour answer cache over a fixed-size local vector index.
+
+    Cached answers are partitioned like the exact cache (role, permission
+    scope, user for personal questions) plus the classified query type, and
+    the whole index is dropped when the data version changes. The cache
+    nodes run on executor threads, so the index is only touched under a lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 600.0,
+        threshold: float = 0.9,
+        dim: int = EMBEDDING_DIM,
+        data_version: Optional[Callable[[], str]] = None,
+        extractor: Optional[Callable[[], Any]] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.dim = dim
+        self.data_version = data_version or (lambda: "")
+        self._extractor = extractor
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._entries: List[Optional[_Entry]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejections = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _get_extractor(self):
+        if self._extractor is not None:
+            return self._extractor()
+        from orchestrator.utils.entity_extractor import get_entity_extractor
+        return get_entity_extractor()
+
+    def signature(self, query: str) -> Optional[QuerySignature]:
+        """None when entities cannot all be recognized (no dimension tables loaded)"""
+        extractor = self._get_extractor()
+        if extractor.partial or not extractor.players:
+            return None
+        return query_signature(query, extractor, self.dim)
+
+    @staticmethod
+    def partition(query: str, user_context, query_type=None) -> Tuple:
+        role, scope, user = user_scope(normalize_query(query), user_context)
+        return (role, scope, user, getattr(query_type, "value", query_type) or "")
+
+    def _check_version(self) -> None:
+        version = self.data_version()
+        if version != self._version:
+            if self._version is not None and len(self._free) < self.max_entries:
+                self.invalidations += 1
+                logger.info("Data version changed, semantic cache invalidated")
+                self._reset()
+            self._version = version
+
+    def _reset(self) -> None:
+        self._vectors[:] = 0.0
+        self._entries = [None] * self.max_entries
+        self._free = list(range(self.max_entries - 1, -1, -1))
+
+    def _release(self, slot: int) -> None:
+        if self._entries[slot] is None:
+            return
+        self._entries[slot] = None
+        self._vectors[slot] = 0.0
+        self._free.append(slot)
+
+    def _nearest(self, vector: np.ndarray, partition: Tuple, now: float) -> List[Tuple[int, float]]:
+        """Live entries in this partition at or above the threshold, best first"""
+        similarities = self._vectors @ vector
+        candidates = np.flatnonzero(similarities >= self.threshold - 1e-6)
+        nearest = []
+        for slot in candidates[np.argsort(-similarities[candidates])]:
+            entry = self._entries[slot]
+            if entry is None:
+                continue
+            if now - entry.created_at > self.ttl_seconds:
+                self._release(int(slot))
+                continue
+            if entry.partition == partition:
+                nearest.append((int(slot), float(similarities[slot])))
+        return nearest
+
+    def lookup(
+        self,
+        query: str,
+        user_context,
+        query_type=None
+    ) -> Tuple[Optional[Dict[str, Any]], str, float]:
+        """
+        Returns:
+            (payload, status, similarity) with status "hit", "miss",
+            "rejected" (a near neighbour failed the entity/guard check)
+            or "disabled"
+        """
+        signature = self.signature(query)
+        if signature is None:
+            return None, "disabled", 0.0
+
+        partition = self.partition(query, user_context, query_type)
+        with self._lock:
+            self._check_version()
+            self.lookups += 1
+            now = time.time()
+            rejected = False
+            for slot, similarity in self._nearest(signature.vector, partition, now):
+                entry = self._entries[slot]
+                if entry.guard != signature.guard:
+                    rejected = True
+                    continue
+                entry.last_used = now
+                self.hits += 1
+                logger.info(f"Semantic cache hit ({similarity:.2f}): '{query[:60]}' ~ '{entry.query[:60]}'")
+                return entry.payload, "hit", similarity
+
+            if rejected:
+                self.rejections += 1
+                return None, "rejected", 0.0
+            self.misses += 1
+            return None, "miss", 0.0
+
+    def store(self, query: str, user_context, query_type, payload: Dict[str, Any]) -> bool:
+        """Cache an answer; replaces an equivalent entry (same guard, near-identical wording)"""
+        signature = self.signature(query)
+        if signature is None:
+            return False
+
+        partition = self.partition(query, user_context, query_type)
+        with self._lock:
+            self._check_version()
+            now = time.time()
+            for slot, similarity in self._nearest(signature.vector, partition, now):
+                if similarity >= 0.999 and self._entries[slot].guard == signature.guard:
+                    self._release(slot)
+            if not self._free:
+                oldest = min(range(self.max_entries), key=lambda slot: self._entries[slot].last_used)
+                self._release(oldest)
+                self.evictions += 1
+
+            slot = self._free.pop()
+            self._vectors[slot] = signature.vector
+            self._entries[slot] = _Entry(
+                query=query, partition=partition, guard=signature.guard,
+                payload=payload, created_at=now, last_used=now
+            )
+            self.stores += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+        logger.info("Semantic cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self.max_entries - len(self._free)
+        answered = self.hits + self.misses + self.rejections
+        near_neighbours = self.hits + self.rejections
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "false_hit_rejections": self.rejections,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / answered, 4) if answered else 0.0,
+            "rejection_rate": round(self.rejections / near_neighbours, 4) if near_neighbours else 0.0,
+        }
+
+
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Process-wide semantic cache sized from settings"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        from orchestrator.config.settings import settings
+        from orchestrator.utils.response_cache import get_data_version
+        _semantic_cache = SemanticCache(
+            max_entries=settings.orchestration.semantic_cache_max_entries,
+            ttl_seconds=settings.orchestration.semantic_cache_ttl_seconds,
+            threshold=settings.orchestration.semantic_cache_threshold,
+            data_version=get_data_version().stamp
+        )
+    return _semantic_cache
@@ -12,6 +12,7 @@ import operator
 from enum import Enum
 
 from orchestrator.config.settings import UserRole
+from orchestrator.utils.result_store import ResultHandle, new_request_id
 
 class QueryType(Enum):
     """Types of queries the orchestrator can handle"""
@@ -62,6 +63,7 @@ class AgentState(TypedDict):
     """
     # User context and query
     user_context: UserContext
+    request_id: str  # keys the per-request result store (orchestrator.utils.result_store)
     original_query: str
     query_type: QueryType
     
@@ -74,12 +76,12 @@ class AgentState(TypedDict):
     required_tools: List[ToolType]
     tool_sequence: List[str]
     
-    # Tool execution results
+    # Tool execution results (ToolResult.data is a ResultHandle for tool payloads)
     tool_results: Annotated[List[ToolResult], operator.add]
     
-    # Data and context
-    retrieved_context: List[Dict[str, Any]]
-    analytics_data: Dict[str, Any]
+    # Data and context: handles into the result store, not the payloads
+    retrieved_context: List[ResultHandle]
+    analytics_data: Dict[str, ResultHandle]  # "parquet", "clips"
     
     # Response generation
     evidence_chain: List[str]
@@ -94,13 +96,15 @@ class AgentState(TypedDict):
 def create_initial_state(
     user_context: UserContext,
     query: str,
-    query_type: Optional[QueryType] = None
+    query_type: Optional[QueryType] = None,
+    request_id: Optional[str] = None
 ) -> AgentState:
     """Create initial state for a new orchestrator workflow"""
     
     return AgentState(
         # User and query
         user_context=user_context,
+        request_id=request_id or new_request_id(),
         original_query=query,
         query_type=query_type or QueryType.GENERAL_HOCKEY,
         
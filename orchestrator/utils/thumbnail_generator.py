@@ -6,10 +6,15 @@ Generates thumbnails from video clips for the clip retrieval system.
 """
 
 import os
+import asyncio
+import hashlib
+import json
 import subprocess
 import logging
+import math
+import weakref
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from PIL import Image, ImageDraw, ImageFont
 import tempfile
 
@@ -24,9 +29,13 @@ class ThumbnailGenerator:
     - Generate placeholder thumbnails when video processing fails
     - Military-style thumbnail overlays with hockey metadata
     - Efficient caching and file management
+    - Non-blocking ffmpeg subprocesses behind a bounded worker pool
+    - Batch pre-generation for newly catalogued clips
+    - Multi-resolution WebP variants, hover-scrub strips and per-gallery
+      sprite sheets
     """
     
-    def __init__(self, thumbnails_directory: str = "data/clips/thumbnails"):
+    def __init__(self, thumbnails_directory: str = "data/clips/thumbnails", max_workers: int = 4):
         self.thumbnails_dir = Path(thumbnails_directory)
         self.thumbnails_dir.mkdir(parents=True, exist_ok=True)
         
@@ -35,6 +44,28 @@ class ThumbnailGenerator:
         self.quality = 85
         self.frame_position = 5.0  # Extract frame at 5 seconds
         
+        # WebP variants ({clip_id}_{size}.webp); frames are extracted at the largest
+        self.variant_sizes = {"sm": (160, 90), "md": (320, 180), "lg": (640, 360)}
+        self.webp_quality = 80
+        self.frame_size = max(self.variant_sizes.values())
+        
+        # Hover-scrub strips (N frames side by side) and gallery sprite sheets
+        self.strip_frames = 8
+        self.strip_frame_size = (160, 90)
+        self.strips_dir = self.thumbnails_dir / "strips"
+        self.sprites_dir = self.thumbnails_dir / "sprites"
+        self.strips_dir.mkdir(exist_ok=True)
+        self.sprites_dir.mkdir(exist_ok=True)
+        
+        # Concurrent ffmpeg processes (semaphore per event loop)
+        self.max_workers = max_workers
+        self.ffmpeg_timeout = 30.0
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        
+        # Running generations per event loop, keyed by output; concurrent
+        # requests for one clip share a run (and its temporary frame files)
+        self._in_progress: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+        
         # Check if ffmpeg is available
         self.ffmpeg_available = self._check_ffmpeg_availability()
         
@@ -77,88 +108,169 @@ class ThumbnailGenerator:
             Path to generated thumbnail file, or None if failed
         """
         
+        # Check if thumbnail (and its WebP variants) already exist
+        thumbnail_path = self.thumbnails_dir / f"{clip_id}.jpg"
+        if self.has_thumbnails(clip_id) and not force_regenerate:
+            logger.debug(f"Thumbnail already exists: {thumbnail_path}")
+            return str(thumbnail_path)
+        
+        return await self._single_flight(
+            f"thumbnail:{clip_id}",
+            lambda: self._generate_thumbnail(video_path, clip_id, thumbnail_path, player_name, event_type)
+        )
+    
+    async def _single_flight(self, key: str, factory) -> Optional[str]:
+        """Run factory() once per key; concurrent callers await the same task"""
+        in_progress = self._in_progress.setdefault(asyncio.get_running_loop(), {})
+        task = in_progress.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            in_progress[key] = task
+            task.add_done_callback(lambda done: in_progress.pop(key, None))
+        # shield: a cancelled request must not kill a run other callers wait on
+        return await asyncio.shield(task)
+    
+    async def _generate_thumbnail(
+        self,
+        video_path: str,
+        clip_id: str,
+        thumbnail_path: Path,
+        player_name: str,
+        event_type: str
+    ) -> Optional[str]:
         try:
-            # Generate thumbnail filename
-            thumbnail_filename = f"{clip_id}.jpg"
-            thumbnail_path = self.thumbnails_dir / thumbnail_filename
-            
-            # Check if thumbnail already exists
-            if thumbnail_path.exists() and not force_regenerate:
-                logger.info(f"Thumbnail already exists: {thumbnail_path}")
-                return str(thumbnail_path)
-            
-            # Verify video file exists
-            if not Path(video_path).exists():
+            # Verify video file exists (missing files get the cached placeholder below)
+            video_exists = Path(video_path).exists()
+            if not video_exists:
                 logger.error(f"Video file not found: {video_path}")
-                return await self._create_placeholder_thumbnail(
-                    thumbnail_path, player_name, event_type
-                )
             
             # Try to extract frame using ffmpeg
-            if self.ffmpeg_available:
-                success = await self._extract_video_frame(video_path, thumbnail_path)
+            if video_exists and self.ffmpeg_available:
+                frame_path = self.thumbnails_dir / f".{clip_id}.frame.jpg"
+                success = await self._extract_video_frame(video_path, frame_path, size=self.frame_size)
                 if success:
-                    # Add overlay information
-                    await self._add_thumbnail_overlay(
-                        thumbnail_path, player_name, event_type
-                    )
+                    # Downscale to every size and add overlay information
+                    try:
+                        await asyncio.to_thread(
+                            self._render_variants_sync, frame_path, clip_id, player_name, event_type, True
+                        )
+                    finally:
+                        frame_path.unlink(missing_ok=True)
                     logger.info(f"Generated thumbnail: {thumbnail_path}")
                     return str(thumbnail_path)
             
-            # Fallback to placeholder
-            return await self._create_placeholder_thumbnail(
+            # Fallback to placeholder, with WebP variants so it is cached like a real thumbnail
+            placeholder = await self._create_placeholder_thumbnail(
                 thumbnail_path, player_name, event_type
             )
+            if placeholder:
+                await asyncio.to_thread(
+                    self._render_variants_sync, thumbnail_path, clip_id, player_name, event_type, False
+                )
+            return placeholder
             
         except Exception as e:
             logger.error(f"Error generating thumbnail for {clip_id}: {str(e)}")
             return None
     
-    async def _extract_video_frame(self, video_path: str, output_path: Path) -> bool:
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_workers)
+            self._semaphores[loop] = semaphore
+        return semaphore
+    
+    async def _run_ffmpeg(self, cmd: List[str]) -> Tuple[int, str]:
+        """Run ffmpeg without blocking the event loop; returns (returncode, stderr)"""
+        
+        async with self._get_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=self.ffmpeg_timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                process.kill()
+                await process.wait()
+                raise
+            return process.returncode, stderr.decode(errors="replace")
+    
+    async def _extract_video_frame(
+        self,
+        video_path: str,
+        output_path: Path,
+        position: Optional[float] = None,
+        size: Optional[Tuple[int, int]] = None
+    ) -> bool:
         """Extract a frame from video using ffmpeg"""
         
+        temp_path = output_path.with_name(f".{output_path.stem}.tmp{output_path.suffix}")
+        size = size or self.thumbnail_size
+        position = self.frame_position if position is None else position
+        
         try:
-            # FFmpeg command to extract frame
-            cmd = [
-                "ffmpeg",
-                "-i", video_path,
-                "-ss", str(self.frame_position),  # Seek to position
-                "-vframes", "1",  # Extract 1 frame
-                "-vf", f"scale={self.thumbnail_size[0]}:{self.thumbnail_size[1]}",
-                "-q:v", "2",  # High quality
-                "-y",  # Overwrite output
-                str(output_path)
-            ]
-            
-            # Execute ffmpeg command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            # Clips shorter than the position yield no frame; retry from the start
+            for position in dict.fromkeys((position, 0.0)):
+                # -ss before -i seeks on the input (keyframe index) instead of
+                # decoding every frame up to the position
+                cmd = [
+                    "ffmpeg",
+                    "-nostdin",
+                    "-loglevel", "error",
+                    "-ss", str(position),
+                    "-i", video_path,
+                    "-frames:v", "1",  # Extract 1 frame
+                    "-vf", f"scale={size[0]}:{size[1]}",
+                    "-q:v", "2",  # High quality
+                    "-y",  # Overwrite output
+                    str(temp_path)
+                ]
+                
+                returncode, stderr = await self._run_ffmpeg(cmd)
+                
+                if returncode == 0 and temp_path.exists() and temp_path.stat().st_size > 0:
+                    # Publish atomically so readers never see a partial image
+                    os.replace(temp_path, output_path)
+                    return True
+                if position == 0.0:
+                    logger.warning(f"ffmpeg failed: {stderr}")
             
-            if result.returncode == 0 and output_path.exists():
-                return True
-            else:
-                logger.warning(f"ffmpeg failed: {result.stderr}")
-                return False
+            return False
                 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error("ffmpeg timeout during frame extraction")
             return False
         except Exception as e:
             logger.error(f"Frame extraction failed: {str(e)}")
             return False
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
     
     async def _create_placeholder_thumbnail(
         self, 
         output_path: Path, 
         player_name: str = "",
         event_type: str = ""
-    ) -> str:
+    ) -> Optional[str]:
         """Create a placeholder thumbnail with military styling"""
         
+        # PIL drawing and encoding is CPU work; keep it off the event loop
+        return await asyncio.to_thread(
+            self._create_placeholder_thumbnail_sync, output_path, player_name, event_type
+        )
+    
+    def _create_placeholder_thumbnail_sync(
+        self, 
+        output_path: Path, 
+        player_name: str = "",
+        event_type: str = ""
+    ) -> Optional[str]:
+        
         try:
             # Create image with military dark theme
             img = Image.new('RGB', self.thumbnail_size, color=(17, 24, 39))  # gray-900
@@ -224,59 +336,318 @@ class ThumbnailGenerator:
                 logger.error(f"Even fallback thumbnail failed: {str(fallback_error)}")
                 return None
     
-    async def _add_thumbnail_overlay(
-        self, 
-        thumbnail_path: Path, 
+    def _draw_overlay(self, img: Image.Image, player_name: str = "", event_type: str = "") -> Image.Image:
+        """Add military-style overlay (bottom band with player and event) to a frame"""
+        
+        width, height = img.size
+        
+        # Load font
+        try:
+            font_small = ImageFont.truetype("/System/Library/Fonts/Monaco.ttf", 12)
+        except (OSError, IOError):
+            font_small = ImageFont.load_default()
+        
+        # Add semi-transparent overlay at bottom
+        overlay_height = 30
+        overlay_y = height - overlay_height
+        
+        # Create overlay rectangle
+        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
+        overlay_draw = ImageDraw.Draw(overlay)
+        
+        # Draw bottom overlay
+        overlay_draw.rectangle([0, overlay_y, width, height], 
+                             fill=(0, 0, 0, 128))  # Semi-transparent black
+        
+        # Composite overlay
+        img = Image.alpha_composite(img.convert('RGBA'), overlay)
+        img = img.convert('RGB')
+        draw = ImageDraw.Draw(img)
+        
+        # Add text overlay
+        if player_name:
+            draw.text((10, overlay_y + 5), player_name, 
+                     fill=(255, 255, 255), font=font_small)
+        
+        if event_type:
+            event_text = event_type.upper()
+            text_width = draw.textlength(event_text, font=font_small)
+            draw.text((width - text_width - 10, overlay_y + 5), 
+                     event_text, fill=(175, 30, 45), font=font_small)
+        
+        return img
+    
+    def _save_atomic(self, img: Image.Image, output_path: Path, image_format: str, **params) -> None:
+        temp_path = output_path.with_name(f".{output_path.name}.tmp")
+        img.save(temp_path, image_format, **params)
+        os.replace(temp_path, output_path)
+    
+    def _render_variants_sync(
+        self,
+        source_path: Path,
+        clip_id: str,
         player_name: str = "",
-        event_type: str = ""
+        event_type: str = "",
+        overlay: bool = True
     ) -> None:
-        """Add military-style overlay to extracted video thumbnail"""
+        """
+        Write the legacy JPEG and every WebP size from one source frame.
+        
+        The overlay is skipped on sizes narrower than the JPEG thumbnail,
+        where the text band would cover most of the frame.
+        """
+        
+        with Image.open(source_path) as source:
+            frame = source.convert('RGB')
+        
+        outputs = [(self.thumbnails_dir / f"{clip_id}.jpg", self.thumbnail_size, "JPEG", {"quality": self.quality})]
+        for size_name, size in self.variant_sizes.items():
+            outputs.append((self.variant_path(clip_id, size_name), size, "WEBP",
+                            {"quality": self.webp_quality, "method": 4}))
+        
+        for output_path, size, image_format, params in outputs:
+            img = frame if frame.size == size else frame.resize(size, Image.LANCZOS)
+            if overlay and size[0] >= self.thumbnail_size[0]:
+                try:
+                    img = self._draw_overlay(img, player_name, event_type)
+                except Exception as e:
+                    # Continue without overlay - the frame is still usable
+                    logger.error(f"Failed to add thumbnail overlay: {str(e)}")
+            self._save_atomic(img, output_path, image_format, **params)
+    
+    def variant_path(self, clip_id: str, size: str = "md") -> Path:
+        """Path of a WebP thumbnail variant"""
+        return self.thumbnails_dir / f"{clip_id}_{size}.webp"
+    
+    def has_thumbnails(self, clip_id: str) -> bool:
+        """True when the JPEG and every WebP variant exist"""
+        return (self.thumbnails_dir / f"{clip_id}.jpg").exists() and all(
+            self.variant_path(clip_id, size).exists() for size in self.variant_sizes
+        )
+    
+    async def generate_scrub_strip(
+        self,
+        video_path: str,
+        clip_id: str,
+        duration_seconds: float = 0.0,
+        frames: Optional[int] = None,
+        force_regenerate: bool = False
+    ) -> Optional[str]:
+        """
+        Build a hover-scrub strip: N evenly spaced frames tiled left to right.
         
+        Frames are extracted in parallel (bounded by the ffmpeg pool) with
+        input seeking, then tiled into one WebP so a gallery hover needs a
+        single request; the client offsets background-position by
+        frame index * strip_frame_size[0].
+        
+        Returns:
+            Path to the strip, or None if the clip could not be read
+        """
+        
+        frames = frames or self.strip_frames
+        strip_path = self.strips_dir / f"{clip_id}_{frames}.webp"
+        if strip_path.exists() and not force_regenerate:
+            return str(strip_path)
+        if not self.ffmpeg_available or not Path(video_path).exists():
+            return None
+        
+        return await self._single_flight(
+            f"strip:{strip_path.name}",
+            lambda: self._generate_scrub_strip(video_path, clip_id, strip_path, duration_seconds, frames)
+        )
+    
+    async def _generate_scrub_strip(
+        self,
+        video_path: str,
+        clip_id: str,
+        strip_path: Path,
+        duration_seconds: float,
+        frames: int
+    ) -> Optional[str]:
         try:
-            # Open existing thumbnail
-            img = Image.open(thumbnail_path)
-            draw = ImageDraw.Draw(img)
+            duration = duration_seconds or await self._probe_duration(video_path)
+            if not duration:
+                return None
             
-            # Load font
+            # Sample at the middle of each of N equal slices
+            step = duration / frames
+            frame_paths = [self.strips_dir / f".{clip_id}.{i}.jpg" for i in range(frames)]
             try:
-                font_small = ImageFont.truetype("/System/Library/Fonts/Monaco.ttf", 12)
-            except (OSError, IOError):
-                font_small = ImageFont.load_default()
-            
-            # Add semi-transparent overlay at bottom
-            overlay_height = 30
-            overlay_y = self.thumbnail_size[1] - overlay_height
-            
-            # Create overlay rectangle
-            overlay = Image.new('RGBA', self.thumbnail_size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
+                results = await asyncio.gather(*[
+                    self._extract_video_frame(video_path, frame_path, position=round(step * (i + 0.5), 3),
+                                              size=self.strip_frame_size)
+                    for i, frame_path in enumerate(frame_paths)
+                ])
+                if not any(results):
+                    return None
+                await asyncio.to_thread(self._tile_images_sync, frame_paths, strip_path,
+                                        self.strip_frame_size, frames)
+            finally:
+                for frame_path in frame_paths:
+                    frame_path.unlink(missing_ok=True)
             
-            # Draw bottom overlay
-            overlay_draw.rectangle([0, overlay_y, self.thumbnail_size[0], self.thumbnail_size[1]], 
-                                 fill=(0, 0, 0, 128))  # Semi-transparent black
-            
-            # Composite overlay
-            img = Image.alpha_composite(img.convert('RGBA'), overlay)
-            img = img.convert('RGB')
-            draw = ImageDraw.Draw(img)
-            
-            # Add text overlay
-            if player_name:
-                draw.text((10, overlay_y + 5), player_name, 
-                         fill=(255, 255, 255), font=font_small)
-            
-            if event_type:
-                event_text = event_type.upper()
-                text_width = draw.textlength(event_text, font=font_small)
-                draw.text((self.thumbnail_size[0] - text_width - 10, overlay_y + 5), 
-                         event_text, fill=(175, 30, 45), font=font_small)
-            
-            # Save with overlay
-            img.save(thumbnail_path, "JPEG", quality=self.quality)
+            logger.info(f"Generated scrub strip: {strip_path}")
+            return str(strip_path)
             
         except Exception as e:
-            logger.error(f"Failed to add thumbnail overlay: {str(e)}")
-            # Continue without overlay - original thumbnail is still usable
+            logger.error(f"Error generating scrub strip for {clip_id}: {str(e)}")
+            return None
+    
+    async def _probe_duration(self, video_path: str) -> float:
+        """Container duration in seconds via ffprobe (0.0 when unavailable)"""
+        
+        try:
+            async with self._get_semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    "ffprobe", "-v", "error", "-show_entries", "format=duration",
+                    "-of", "default=noprint_wrappers=1:nokey=1", video_path,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=self.ffmpeg_timeout)
+            return float(stdout.decode().strip() or 0.0)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return 0.0
+    
+    def _tile_images_sync(
+        self,
+        image_paths: List[Path],
+        output_path: Path,
+        tile_size: Tuple[int, int],
+        columns: int
+    ) -> Dict[int, Tuple[int, int]]:
+        """Tile images row-major into one WebP; returns {index: (x, y)} of placed tiles"""
+        
+        rows = max(1, math.ceil(len(image_paths) / columns))
+        sheet = Image.new('RGB', (tile_size[0] * min(columns, len(image_paths)), tile_size[1] * rows), (17, 24, 39))
+        offsets = {}
+        
+        for index, image_path in enumerate(image_paths):
+            x, y = (index % columns) * tile_size[0], (index // columns) * tile_size[1]
+            try:
+                with Image.open(image_path) as tile:
+                    tile = tile.convert('RGB')
+                    if tile.size != tile_size:
+                        tile = tile.resize(tile_size, Image.LANCZOS)
+                    sheet.paste(tile, (x, y))
+                offsets[index] = (x, y)
+            except (OSError, ValueError):
+                continue
+        
+        self._save_atomic(sheet, output_path, "WEBP", quality=self.webp_quality, method=4)
+        return offsets
+    
+    def build_sprite_sheet(self, clip_ids: List[str], size: str = "sm", columns: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Pack existing WebP thumbnails for a gallery into one sprite sheet.
+        
+        The sprite id hashes the clip ids and their thumbnail mtimes, so a
+        sheet is content-addressed: an unchanged gallery reuses the file and
+        any regenerated thumbnail produces a new id (safe to cache forever).
+        
+        Returns:
+            Sprite manifest (sprite_id, path, tile size, columns, tile offsets),
+            or None when none of the clips has a thumbnail yet
+        """
+        
+        if size not in self.variant_sizes:
+            raise ValueError(f"Unknown thumbnail size: {size}")
+        
+        available = []
+        digest = hashlib.sha1(f"{size}:{columns}".encode())
+        for clip_id in clip_ids:
+            path = self.variant_path(clip_id, size)
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            available.append((clip_id, path))
+            digest.update(f"|{clip_id}:{mtime_ns}".encode())
+        
+        if not available:
+            return None
+        
+        sprite_id = digest.hexdigest()[:20]
+        sprite_path = self.sprites_dir / f"{sprite_id}.webp"
+        tile_size = self.variant_sizes[size]
+        
+        # Clips behind the sheet, written first so a servable sprite always has them
+        clips_path = self.sprites_dir / f"{sprite_id}.json"
+        if not clips_path.exists():
+            temp_path = clips_path.with_name(f".{clips_path.name}.tmp")
+            temp_path.write_text(json.dumps([clip_id for clip_id, _ in available]))
+            os.replace(temp_path, clips_path)
+        
+        if not sprite_path.exists():
+            self._tile_images_sync([path for _, path in available], sprite_path, tile_size, columns)
+        
+        return {
+            "sprite_id": sprite_id,
+            "path": str(sprite_path),
+            "size": size,
+            "tile_width": tile_size[0],
+            "tile_height": tile_size[1],
+            "columns": columns,
+            "tiles": {
+                clip_id: [(index % columns) * tile_size[0], (index // columns) * tile_size[1]]
+                for index, (clip_id, _) in enumerate(available)
+            }
+        }
+    
+    def sprite_clip_ids(self, sprite_id: str) -> Optional[List[str]]:
+        """Clip ids packed into a sprite sheet (None for unknown sheets)"""
+        clips_path = self.sprites_dir / f"{sprite_id}.json"
+        if not sprite_id.isalnum() or not clips_path.exists():
+            return None
+        return json.loads(clips_path.read_text())
+    
+    async def pregenerate(
+        self,
+        clips: Iterable[Any],
+        force_regenerate: bool = False
+    ) -> Dict[str, int]:
+        """
+        Generate thumbnails for every clip that does not have one yet.
+        
+        Args:
+            clips: ClipMetadata-like objects (clip_id, file_path, player_name, event_type)
+            force_regenerate: Regenerate existing thumbnails too
+            
+        Returns:
+            Counts of generated, existing and failed thumbnails
+        """
+        
+        pending = []
+        existing = 0
+        for clip in clips:
+            if not force_regenerate and self.has_thumbnails(clip.clip_id):
+                existing += 1
+                continue
+            pending.append(clip)
+        
+        # ffmpeg concurrency is bounded by the worker semaphore
+        results = await asyncio.gather(*[
+            self.generate_thumbnail(
+                video_path=clip.file_path,
+                clip_id=clip.clip_id,
+                player_name=clip.player_name,
+                event_type=clip.event_type,
+                force_regenerate=force_regenerate
+            )
+            for clip in pending
+        ])
+        
+        failed = sum(1 for result in results if not result)
+        if pending:
+            logger.info(f"Pre-generated {len(pending) - failed} thumbnails ({existing} existing, {failed} failed)")
+        
+        return {
+            "generated": len(pending) - failed,
+            "existing": existing,
+            "failed": failed
+        }
     
     def get_thumbnail_path(self, clip_id: str) -> Optional[str]:
         """Get path to existing thumbnail"""
@@ -298,7 +669,14 @@ class ThumbnailGenerator:
         cleaned_count = 0
         
         try:
-            for thumbnail_file in self.thumbnails_dir.glob("*.jpg"):
+            thumbnail_files = [
+                *self.thumbnails_dir.glob("*.jpg"),
+                *self.thumbnails_dir.glob("*.webp"),
+                *self.strips_dir.glob("*.webp"),
+                *self.sprites_dir.glob("*.webp"),
+                *self.sprites_dir.glob("*.json")
+            ]
+            for thumbnail_file in thumbnail_files:
                 file_age = current_time - thumbnail_file.stat().st_mtime
                 
                 if file_age > max_age_seconds:
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+HeartBeat Engine - Intent Analyzer Benchmark
+Montreal Canadiens Advanced Analytics Assistant
+
+Micro-benchmark for intent analysis. Runs the previous per-pattern
+re.findall/re.search implementation side by side with the compiled
+single-pass IntentMatcher over a corpus of queries, checks that both
+produce the same query type, tools, complexity and data/context needs,
+and reports the per-query cost of each.
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from orchestrator.nodes.intent_analyzer import IntentAnalyzerNode, _scan_query
+from orchestrator.utils.state import QueryType, ToolType
+
+SAMPLE_QUERIES = [
+    "How is Suzuki performing this season?",
+    "Show me Caufield's goals from the last 5 games",
+    "Compare Hutson vs Guhle zone entry success",
+    "What is the Habs powerplay record against Toronto?",
+    "Explain the forecheck system Montreal uses",
+    "Stats for Slafkovsky",
+    "How many goals does Matheson have?",
+    "Show me my shifts from last game",
+    "Recap of last game vs Boston",
+    "What is xG and how does it relate to shooting percentage?",
+    "Display a heatmap of Canadiens shots this season",
+    "Head to head matchup between the habs and the leafs, who has the advantage and why?",
+    "Give me video of every hit Anderson made in the third period",
+    "What's the correlation between line combinations and expected goals for the habs over the last 10 games and how has that trend changed",
+    "Why did the team struggle on the penalty kill tonight?",
+    "watch Suzuki highlights",
+    "statistics of the canadiens defense",
+    "Who is the best faceoff center on the team?",
+    "Can you analyze the deployment strategy versus top lines?",
+    "saves by montembeault in the last 3 games clips please",
+]
+
+
+class LegacyIntentAnalyzer:
+    """Previous implementation: every pattern run separately per query"""
+
+    query_patterns = {
+        QueryType.PLAYER_ANALYSIS: [
+            r'\b(player|skater|goalie|forward|defenseman|center|wing)\b',
+            r'\b(performance|stats|analytics|metrics)\b',
+            r'\b(suzuki|caufield|hutson|slafkovsky|guhle|matheson)\b'
+        ],
+        QueryType.TEAM_PERFORMANCE: [
+            r'\b(team|canadiens|habs|mtl|montreal)\b',
+            r'\b(record|standings|performance|season)\b',
+            r'\b(powerplay|penalty kill|special teams)\b'
+        ],
+        QueryType.GAME_ANALYSIS: [
+            r'\b(game|match|vs|against)\b',
+            r'\b(recap|analysis|breakdown|review)\b',
+            r'\b(last game|tonight|yesterday)\b'
+        ],
+        QueryType.MATCHUP_COMPARISON: [
+            r'\b(compare|vs|versus|against)\b',
+            r'\b(matchup|head to head|h2h)\b',
+            r'\b(better|worse|advantage)\b'
+        ],
+        QueryType.TACTICAL_ANALYSIS: [
+            r'\b(strategy|tactics|system|scheme)\b',
+            r'\b(zone entry|exit|forecheck|backcheck)\b',
+            r'\b(line combinations|deployment)\b'
+        ],
+        QueryType.STATISTICAL_QUERY: [
+            r'\b(stats|statistics|numbers|data)\b',
+            r'\b(xG|corsi|fenwick|PDO|shooting percentage)\b',
+            r'\b(how many|what is|show me)\b'
+        ],
+        QueryType.CLIP_RETRIEVAL: [
+            r'\b(clips?|highlights?|video|footage|replay|shifts?)\b',
+            r'\b(show me|watch|see|display)\b.*\b(clips?|video|shifts?)\b',
+            r'\b(my clips?|my highlights?|my video|my shifts?)\b',
+            r'\b(from last game|last \d+ games)\b.*\b(clips?|video|shifts?)\b'
+        ]
+    }
+
+    tool_indicators = {
+        ToolType.VECTOR_SEARCH: [
+            r'\b(explain|what is|how does|definition|rules)\b',
+            r'\b(context|background|history)\b',
+            r'\b(hockey|NHL|strategy|tactics)\b'
+        ],
+        ToolType.PARQUET_QUERY: [
+            r'\b(stats|statistics|numbers|data|metrics)\b',
+            r'\b(last \d+ games|this season|career)\b',
+            r'\b(goals|assists|points|shots|hits)\b'
+        ],
+        ToolType.CALCULATE_METRICS: [
+            r'\b(xG|expected goals|corsi|fenwick|PDO)\b',
+            r'\b(shooting percentage|save percentage)\b',
+            r'\b(zone entry|exit|possession)\b'
+        ],
+        ToolType.MATCHUP_ANALYSIS: [
+            r'\b(vs|versus|against|compared to)\b',
+            r'\b(matchup|head to head|opponent)\b',
+            r'\b(advantage|disadvantage|better|worse)\b'
+        ],
+        ToolType.VISUALIZATION: [
+            r'\b(show|chart|graph|plot|heatmap)\b',
+            r'\b(visualize|display|see)\b'
+        ],
+        ToolType.CLIP_RETRIEVAL: [
+            r'\b(clips?|highlights?|video|footage|replay|shifts?)\b',
+            r'\b(show me|watch|see|display)\b.*\b(clips?|video|highlights?|shifts?)\b',
+            r'\b(my clips?|my highlights?|my video|my shifts?)\b',
+            r'\b(from last game|last \d+ games)\b.*\b(clips?|video|shifts?)\b',
+            r'\b(goals?|assists?|saves?|hits?)\b.*\b(clips?|video|shifts?)\b'
+        ]
+    }
+
+    def _classify_query_type(self, query):
+        scores = {}
+        for query_type, patterns in self.query_patterns.items():
+            scores[query_type] = sum(len(re.findall(p, query, re.IGNORECASE)) for p in patterns)
+        if max(scores.values()) > 0:
+            return max(scores, key=scores.get)
+        return QueryType.GENERAL_HOCKEY
+
+    def _identify_required_tools(self, query, user_role):
+        required_tools = []
+        for tool_type, patterns in self.tool_indicators.items():
+            for pattern in patterns:
+                if re.search(pattern, query, re.IGNORECASE):
+                    required_tools.append(tool_type)
+                    break
+
+        clip_keywords = [
+            'clips?', 'highlights?', 'video', 'footage', 'replay', 'shifts?',
+            'my clips?', 'my highlights?', 'my shifts?', 'my video'
+        ]
+        query_has_clips = any(re.search(rf'\b{keyword}\b', query, re.IGNORECASE)
+                              for keyword in clip_keywords)
+        event_visual_patterns = [
+            r'\b(goals?|assists?|saves?|hits?)\b.*\b(show|display|watch|see)\b',
+            r'\b(show|display|watch|see)\b.*\b(goals?|assists?|saves?|hits?)\b'
+        ]
+        has_event_visual = any(re.search(p, query, re.IGNORECASE) for p in event_visual_patterns)
+
+        if (query_has_clips or has_event_visual) and ToolType.CLIP_RETRIEVAL not in required_tools:
+            required_tools.append(ToolType.CLIP_RETRIEVAL)
+        if ToolType.VECTOR_SEARCH not in required_tools and not self._is_pure_stats_query(query):
+            required_tools.append(ToolType.VECTOR_SEARCH)
+        if (any(word in query for word in ['stats', 'performance', 'analysis', 'compare']) and
+                ToolType.PARQUET_QUERY not in required_tools):
+            required_tools.append(ToolType.PARQUET_QUERY)
+        return required_tools
+
+    def _assess_complexity(self, query):
+        complexity_indicators = {
+            "simple": [r'\b(what is|who is|when)\b'],
+            "moderate": [r'\b(how|why|compare|analyze)\b'],
+            "complex": [r'\b(strategy|tactical|multi-step|correlation|trend)\b']
+        }
+        for level, patterns in complexity_indicators.items():
+            for pattern in patterns:
+                if re.search(pattern, query, re.IGNORECASE):
+                    return level
+        if len(query.split()) > 15 or '?' in query and 'and' in query:
+            return "complex"
+        elif len(query.split()) > 8:
+            return "moderate"
+        return "simple"
+
+    def _needs_hockey_context(self, query):
+        return any(re.search(p, query, re.IGNORECASE) for p in [
+            r'\b(explain|what is|how does|definition|rules|strategy|tactics)\b',
+            r'\b(why|context|background|meaning)\b'
+        ])
+
+    def _needs_analytical_data(self, query):
+        return any(re.search(p, query, re.IGNORECASE) for p in [
+            r'\b(stats|statistics|numbers|metrics|data)\b',
+            r'\b(performance|analysis|compare|vs)\b',
+            r'\b(last \d+ games|this season|career)\b'
+        ])
+
+    def _is_pure_stats_query(self, query):
+        return any(re.search(p, query, re.IGNORECASE) for p in [
+            r'^\s*(what|how many|show me).*\b(goals|assists|points|games)\b',
+            r'^\s*\b(stats|statistics)\b.*\b(for|of)\b'
+        ])
+
+
+def analyze(analyzer, query: str) -> tuple:
+    """The intent fields IntentAnalyzerNode.process writes to state"""
+    return (
+        analyzer._classify_query_type(query),
+        tuple(analyzer._identify_required_tools(query, None)),
+        analyzer._assess_complexity(query),
+        analyzer._needs_hockey_context(query),
+        analyzer._needs_analytical_data(query),
+    )
+
+
+def time_per_query(analyzer, queries, rounds: int, clear_cache: bool = False) -> float:
+    """Mean microseconds per query"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        if clear_cache:
+            _scan_query.cache_clear()
+        for query in queries:
+            analyze(analyzer, query)
+    return (time.perf_counter() - start) / (rounds * len(queries)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent analysis")
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over the query corpus")
+    args = parser.parse_args()
+
+    queries = [query.lower() for query in SAMPLE_QUERIES]
+    legacy = LegacyIntentAnalyzer()
+    compiled = IntentAnalyzerNode()
+
+    mismatches = 0
+    for query in queries:
+        expected, actual = analyze(legacy, query), analyze(compiled, query)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH: {query}\n  legacy:   {expected}\n  compiled: {actual}")
+    print(f"Equivalence: {len(queries) - mismatches}/{len(queries)} queries identical")
+
+    # Warm regex module cache for the legacy path before timing
+    time_per_query(legacy, queries, 1)
+    legacy_us = time_per_query(legacy, queries, args.rounds)
+    cold_us = time_per_query(compiled, queries, args.rounds, clear_cache=True)
+    warm_us = time_per_query(compiled, queries, args.rounds)
+
+    print(f"\n{'Implementation':<28}{'us/query':>10}{'speedup':>10}")
+    print(f"{'per-pattern regex (legacy)':<28}{legacy_us:>10.1f}{'1.0x':>10}")
+    print(f"{'compiled single pass':<28}{cold_us:>10.1f}{legacy_us / cold_us:>9.1f}x")
+    print(f"{'compiled, repeated query':<28}{warm_us:>10.1f}{legacy_us / warm_us:>9.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+HeartBeat Engine - Clip Media Jobs
+Montreal Canadiens Advanced Analytics Assistant
+
+Batch/background jobs for clip media. Syncs the clip catalog, probes new
+clip files with ffprobe (duration, resolution, codec, bitrate, keyframe
+interval) and pre-generates thumbnails for every clip that does not have
+one yet, so the first gallery render after a game only hits ready-made
+images and the frontend gets durations without fetching video headers.
+"""
+
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from orchestrator.config.settings import settings
+from orchestrator.models.clip_models import get_clip_index_manager
+from orchestrator.utils.thumbnail_generator import ThumbnailGenerator, thumbnail_generator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
+async def pregenerate_thumbnails(clips_base_path: str, season: str, generator: ThumbnailGenerator,
+                                 force: bool = False, probe: bool = True) -> dict:
+    """Sync the catalog, probe new files, then generate thumbnails for clips that lack them"""
+    clip_index = get_clip_index_manager(clips_base_path)
+    sync_stats = clip_index.sync_catalog(season)
+
+    probe_stats = None
+    if probe:
+        probe_stats = await clip_index.probe_pending(season)
+        print(f"[{season}] probe: {probe_stats['probed']} files probed ({probe_stats['failed']} failed), "
+              f"{probe_stats['clips_updated']} clips updated")
+
+    clips = clip_index.catalog.all_clips(season)
+
+    started = time.perf_counter()
+    stats = await generator.pregenerate(clips, force_regenerate=force)
+    elapsed = time.perf_counter() - started
+
+    print(f"[{season}] catalog: {len(clips)} clips ({sync_stats['upserted']} new/changed, "
+          f"{sync_stats['removed']} removed) | thumbnails: {stats['generated']} generated, "
+          f"{stats['existing']} existing, {stats['failed']} failed in {elapsed:.1f}s")
+    return {'sync': sync_stats, 'probe': probe_stats, 'thumbnails': stats, 'seconds': elapsed}
+
+
+async def run(args) -> None:
+    generator = thumbnail_generator
+    if args.thumbnails_dir or args.workers:
+        generator = ThumbnailGenerator(
+            args.thumbnails_dir or str(thumbnail_generator.thumbnails_dir),
+            max_workers=args.workers or thumbnail_generator.max_workers
+        )
+
+    while True:
+        await pregenerate_thumbnails(args.clips_path, args.season, generator, args.force,
+                                     probe=not args.skip_probe)
+        if not args.watch:
+            break
+        await asyncio.sleep(args.watch)
+
+
+def main():
+    """Main execution function"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Probe clip media and pre-generate thumbnails for the clip catalog')
+    parser.add_argument('--clips-path', default=settings.clips_base_path)
+    parser.add_argument('--season', default="2024-2025")
+    parser.add_argument('--thumbnails-dir', default=None, help='Override the thumbnail output directory')
+    parser.add_argument('--workers', type=int, default=0, help='Concurrent ffmpeg processes')
+    parser.add_argument('--force', action='store_true', help='Regenerate existing thumbnails')
+    parser.add_argument('--skip-probe', action='store_true', help='Do not run ffprobe on new clips')
+    parser.add_argument('--watch', type=float, default=0,
+                        help='Keep running, re-syncing every N seconds to pick up new clips')
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
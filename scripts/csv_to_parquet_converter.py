@@ -12,6 +12,9 @@ from pathlib import Path
 import sys
 import logging
 
+sys.path.append(str(Path(__file__).parent))
+from schema_contract import compact_frame
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -49,6 +52,9 @@ def convert_csv_to_parquet(csv_path: str, output_dir: str = None) -> str:
         output_filename = csv_file.stem + ".parquet"
         output_path = output_directory / output_filename
 
+        # Compact dtypes so repeated labels are stored dictionary-encoded
+        df = compact_frame(df)
+
         # Convert to Parquet
         logger.info(f"Converting to Parquet format: {output_path}")
         df.to_parquet(output_path, index=False)
@@ -10,12 +10,16 @@ Hybrid Intelligence System combining:
 """
 
 import os
+import sys
 import json
 import requests
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 import logging
 
+sys.path.append(str(Path(__file__).parent.parent))
+from orchestrator.utils.entity_extractor import get_entity_extractor
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -287,11 +291,11 @@ class ParquetAnalyzer:
             return None
 
     def _extract_opponent(self, query: str) -> str:
-        """Extract opponent from query"""
-        opponents = ["Toronto", "Boston", "Tampa Bay", "Florida", "Ottawa", "Buffalo"]
-        for opponent in opponents:
-            if opponent.lower() in query.lower():
-                return opponent
+        """Extract opponent from query (short team name, as in the matchup reports)"""
+        extractor = get_entity_extractor()
+        opponents = extractor.opponents(query)
+        if opponents:
+            return extractor.teams[opponents[0].entity_id]["short_name"]
         return "Unknown"
 
 
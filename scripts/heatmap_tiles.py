@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Heatmap Tile Builder
+
+Precomputes shot/event location heatmap tiles from the unified PBP parquet:
+- Fixed rink grid binned with numpy.histogram2d
+- One tile per (player, team, strength, event_type, game)
+- Sparse cell/count/xG arrays stored per game in Parquet
+- Incremental builds (only games without tiles are processed)
+- Aggregation API that sums tiles over any game range
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import re
+
+# Fixed rink grid: NHL coordinates centered at (0,0), 5ft x 5ft cells
+RINK_X_RANGE = (-100.0, 100.0)
+RINK_Y_RANGE = (-42.5, 42.5)
+GRID_SHAPE = (40, 17)  # (x bins, y bins)
+
+X_EDGES = np.linspace(RINK_X_RANGE[0], RINK_X_RANGE[1], GRID_SHAPE[0] + 1)
+Y_EDGES = np.linspace(RINK_Y_RANGE[0], RINK_Y_RANGE[1], GRID_SHAPE[1] + 1)
+
+TILE_KEYS = ['player_id', 'team_abbr', 'strength', 'event_type', 'game_id']
+
+TILE_SCHEMA = pa.schema([
+    ('player_id', pa.dictionary(pa.int32(), pa.string())),
+    ('team_abbr', pa.dictionary(pa.int8(), pa.string())),
+    ('strength', pa.dictionary(pa.int8(), pa.string())),
+    ('event_type', pa.dictionary(pa.int8(), pa.string())),
+    ('game_id', pa.int32()),
+    ('event_count', pa.int32()),
+    ('cells', pa.list_(pa.uint16())),
+    ('counts', pa.list_(pa.uint16())),
+    ('xg', pa.list_(pa.float32())),
+])
+
+
+class HeatmapTileBuilder:
+    """Builds per-game heatmap tiles from the unified PBP table"""
+
+    def __init__(self, base_path: str = "/Users/xavier.bouchard/Desktop/HeartBeat", season: str = "2024-25"):
+        self.base_path = Path(base_path)
+        self.processed_path = self.base_path / "data" / "processed"
+        self.season = season
+        self.pbp_file = self.processed_path / "fact" / "pbp" / f"unified_pbp_{season}.parquet"
+        self.tiles_path = self.processed_path / "fact" / "heatmap_tiles" / f"season={season}"
+
+    def tiled_game_ids(self) -> List[int]:
+        """Return game ids that already have a tile file"""
+        if not self.tiles_path.exists():
+            return []
+        game_ids = []
+        for tile_file in self.tiles_path.glob("game_id=*.parquet"):
+            match = re.match(r"game_id=(\d+)\.parquet$", tile_file.name)
+            if match:
+                game_ids.append(int(match.group(1)))
+        return sorted(game_ids)
+
+    def build_tiles(self, game_ids: Optional[Iterable[int]] = None, force: bool = False) -> Dict[str, Any]:
+        """
+        Build tiles for the requested games (or every untiled game).
+
+        Args:
+            game_ids: Specific games to (re)build; defaults to all games in PBP
+            force: Rebuild games that already have tiles
+
+        Returns:
+            Build summary with processed game ids and tile counts
+        """
+        print(f"Building heatmap tiles from: {self.pbp_file}")
+
+        columns = TILE_KEYS + ['x_coord', 'y_coord', 'xg']
+        filters = None
+        if game_ids is not None:
+            filters = [('game_id', 'in', [int(g) for g in game_ids])]
+        df = pq.read_table(self.pbp_file, columns=columns, filters=filters).to_pandas()
+
+        existing = set() if force else set(self.tiled_game_ids())
+        pending = sorted(set(df['game_id'].unique()) - existing)
+
+        if not pending:
+            print("Heatmap tiles are up to date")
+            return {'processed_games': [], 'tiles_written': 0}
+
+        self.tiles_path.mkdir(parents=True, exist_ok=True)
+        df = df[df['game_id'].isin(pending)].dropna(subset=['x_coord', 'y_coord'])
+
+        games = dict(tuple(df.groupby('game_id', sort=True)))
+        tiles_written = 0
+        for game_id in pending:
+            # Games without located events get an empty tile file, so later
+            # incremental builds do not re-read them
+            if game_id in games:
+                tiles = self._bin_game(games[game_id])
+                table = pa.Table.from_pandas(tiles, schema=TILE_SCHEMA, preserve_index=False)
+            else:
+                table = TILE_SCHEMA.empty_table()
+            output_file = self.tiles_path / f"game_id={int(game_id)}.parquet"
+            pq.write_table(table, output_file, compression='zstd')
+            tiles_written += table.num_rows
+
+        print(f"Tiled {len(pending)} games ({tiles_written:,} tiles) into {self.tiles_path}")
+        return {'processed_games': [int(g) for g in pending], 'tiles_written': tiles_written}
+
+    def _bin_game(self, game_df: pd.DataFrame) -> pd.DataFrame:
+        """Bin one game's events into sparse tiles"""
+        records = []
+        game_id = int(game_df['game_id'].iloc[0])
+        x_values = game_df['x_coord'].to_numpy(dtype=np.float64)
+        y_values = game_df['y_coord'].to_numpy(dtype=np.float64)
+        xg_values = game_df['xg'].fillna(0.0).to_numpy(dtype=np.float64)
+
+        # dropna=False keeps events with no player (team/bench events) in the tiles
+        for key, idx in game_df.groupby(TILE_KEYS[:-1], sort=False, observed=True, dropna=False).indices.items():
+            counts, _, _ = np.histogram2d(x_values[idx], y_values[idx], bins=[X_EDGES, Y_EDGES])
+            xg_grid, _, _ = np.histogram2d(
+                x_values[idx], y_values[idx], bins=[X_EDGES, Y_EDGES], weights=xg_values[idx]
+            )
+            flat = counts.ravel()
+            cells = np.flatnonzero(flat)
+            if len(cells) == 0:
+                continue
+
+            player_id, team_abbr, strength, event_type = (None if pd.isna(value) else value for value in key)
+            records.append({
+                'player_id': player_id,
+                'team_abbr': team_abbr,
+                'strength': strength,
+                'event_type': event_type,
+                'game_id': game_id,
+                'event_count': int(flat.sum()),
+                'cells': cells.astype(np.uint16),
+                'counts': flat[cells].astype(np.uint16),
+                'xg': xg_grid.ravel()[cells].astype(np.float32),
+            })
+
+        return pd.DataFrame.from_records(records, columns=[f.name for f in TILE_SCHEMA])
+
+
+class HeatmapTileStore:
+    """Aggregates precomputed heatmap tiles into dense rink grids"""
+
+    def __init__(self, tiles_path: Path):
+        self.tiles_path = Path(tiles_path)
+
+    def is_available(self) -> bool:
+        return self.tiles_path.exists() and any(self.tiles_path.glob("game_id=*.parquet"))
+
+    def aggregate(
+        self,
+        player_ids: Optional[List[str]] = None,
+        teams: Optional[List[str]] = None,
+        strengths: Optional[List[str]] = None,
+        event_types: Optional[List[str]] = None,
+        game_ids: Optional[List[int]] = None,
+        game_range: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Sum tiles matching the filters into a dense grid.
+
+        Args:
+            player_ids: Canonical player ids (e.g. nhl_8480018)
+            teams: Team abbreviations
+            strengths: Strength codes (EV, PP, PK)
+            event_types: Normalized event types (SHOT, GOAL, ...)
+            game_ids: Explicit game ids
+            game_range: Inclusive (first_game_id, last_game_id) range
+
+        Returns:
+            Heatmap payload with counts/xG grids and grid geometry
+        """
+        tile_files = self._select_files(game_ids, game_range)
+
+        filters = []
+        if player_ids:
+            filters.append(('player_id', 'in', list(player_ids)))
+        if teams:
+            filters.append(('team_abbr', 'in', list(teams)))
+        if strengths:
+            filters.append(('strength', 'in', list(strengths)))
+        if event_types:
+            filters.append(('event_type', 'in', list(event_types)))
+
+        counts = np.zeros(GRID_SHAPE[0] * GRID_SHAPE[1], dtype=np.int64)
+        xg = np.zeros(GRID_SHAPE[0] * GRID_SHAPE[1], dtype=np.float64)
+        tiles_used = 0
+
+        for tile_file in tile_files:
+            table = pq.read_table(tile_file, columns=['cells', 'counts', 'xg'], filters=filters or None)
+            if table.num_rows == 0:
+                continue
+            cells = table.column('cells').combine_chunks().flatten().to_numpy()
+            np.add.at(counts, cells, table.column('counts').combine_chunks().flatten().to_numpy())
+            np.add.at(xg, cells, table.column('xg').combine_chunks().flatten().to_numpy())
+            tiles_used += table.num_rows
+
+        return {
+            'grid': counts.reshape(GRID_SHAPE).tolist(),
+            'xg_grid': np.round(xg, 4).reshape(GRID_SHAPE).tolist(),
+            'count': int(counts.sum()),
+            'xg_total': float(xg.sum()),
+            'tiles': tiles_used,
+            'games': len(tile_files),
+            'x_edges': X_EDGES.tolist(),
+            'y_edges': Y_EDGES.tolist(),
+        }
+
+    def _select_files(self, game_ids: Optional[List[int]], game_range: Optional[Tuple[int, int]]) -> List[Path]:
+        """Select per-game tile files by game id filters"""
+        selected = []
+        wanted = set(int(g) for g in game_ids) if game_ids else None
+
+        for tile_file in sorted(self.tiles_path.glob("game_id=*.parquet")):
+            match = re.match(r"game_id=(\d+)\.parquet$", tile_file.name)
+            if not match:
+                continue
+            game_id = int(match.group(1))
+            if wanted is not None and game_id not in wanted:
+                continue
+            if game_range and not (game_range[0] <= game_id <= game_range[1]):
+                continue
+            selected.append(tile_file)
+
+        return selected
+
+
+def main():
+    """Main execution function"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Build precomputed PBP heatmap tiles')
+    parser.add_argument('--base-path', default="/Users/xavier.bouchard/Desktop/HeartBeat")
+    parser.add_argument('--season', default="2024-25")
+    parser.add_argument('--games', type=int, nargs='*', help='Only (re)build these game ids')
+    parser.add_argument('--force', action='store_true', help='Rebuild games that already have tiles')
+
+    args = parser.parse_args()
+
+    builder = HeatmapTileBuilder(args.base_path, args.season)
+    started = datetime.now()
+    summary = builder.build_tiles(game_ids=args.games, force=args.force)
+    duration = (datetime.now() - started).total_seconds()
+
+    print(f"\nHeatmap tile build completed in {duration:.2f}s")
+    print(f"Games processed: {len(summary['processed_games'])}")
+    print(f"Tiles written: {summary['tiles_written']:,}")
+
+    return summary
+
+
+if __name__ == "__main__":
+    main()
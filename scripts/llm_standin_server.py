@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+HeartBeat Engine - LLM Stand-in Server
+Montreal Canadiens Advanced Analytics Assistant
+
+Local HTTP stand-in for both synthesis backends, for load-testing the
+shared LLM client layer (orchestrator/tools/llm_clients.py) offline:
+
+- POST /v1/chat/completions            OpenAI chat completions
+- POST /endpoints/<name>/invocations   SageMaker text generation; "inputs"
+                                       may be a string or a list (batch)
+- GET  /stats                          request counts and peak concurrency
+
+Latency, capacity and injected 429/503 errors are configurable, so retry
+and concurrency behaviour can be observed. Point the backend at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=standin
+    SAGEMAKER_RUNTIME_URL=http://127.0.0.1:8089 PRIMARY_MODEL_ENDPOINT=standin
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INVOCATIONS_PATH = re.compile(r"^/endpoints/([^/]+)/invocations$")
+
+
+class StandinState:
+    """Shared counters and simulated capacity"""
+
+    def __init__(self, latency_ms: float, jitter_ms: float, per_item_ms: float,
+                 error_rate: float, capacity: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_item_ms = per_item_ms
+        self.error_rate = error_rate
+        self.capacity = threading.BoundedSemaphore(capacity) if capacity > 0 else None
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "chat": 0, "invocations": 0, "batched_inputs": 0,
+                      "errors_injected": 0, "active": 0, "max_active": 0}
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self.lock:
+            self.stats[name] += amount
+
+    def simulate(self, items: int = 1) -> None:
+        """Sleep like a model server; a batch costs the base latency plus per-item time"""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms) + self.per_item_ms * max(items - 1, 0)
+        time.sleep(max(delay, 0) / 1000)
+
+
+def make_handler(state: StandinState):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body) -> None:
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                with state.lock:
+                    self._send(200, dict(state.stats))
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send(400, {"error": "invalid JSON"})
+                return
+
+            state.count("requests")
+            if random.random() < state.error_rate:
+                state.count("errors_injected")
+                status = random.choice((429, 503))
+                self._send(status, {"error": {"message": "injected failure", "code": status}})
+                return
+
+            if state.capacity:
+                state.capacity.acquire()
+            with state.lock:
+                state.stats["active"] += 1
+                state.stats["max_active"] = max(state.stats["max_active"], state.stats["active"])
+            try:
+                if self.path.rstrip("/") == "/v1/chat/completions":
+                    self._chat(body)
+                elif INVOCATIONS_PATH.match(self.path):
+                    self._invoke(body)
+                else:
+                    self._send(404, {"error": "not found"})
+            finally:
+                with state.lock:
+                    state.stats["active"] -= 1
+                if state.capacity:
+                    state.capacity.release()
+
+        def _chat(self, body):
+            state.count("chat")
+            state.simulate()
+            prompt = (body.get("messages") or [{}])[-1].get("content", "")
+            text = f"[stand-in {body.get('model', 'model')}] response to {len(prompt)} chars of prompt"
+            self._send(200, {
+                "id": f"chatcmpl-standin-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "standin"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(text) // 4,
+                          "total_tokens": (len(prompt) + len(text)) // 4},
+            })
+
+        def _invoke(self, body):
+            state.count("invocations")
+            inputs = body.get("inputs", "")
+            batch = inputs if isinstance(inputs, list) else [inputs]
+            state.count("batched_inputs", len(batch))
+            state.simulate(len(batch))
+            outputs = [{"generated_text": f"[stand-in endpoint] response to {len(str(text))} chars of prompt"}
+                       for text in batch]
+            self._send(200, outputs if isinstance(inputs, list) else outputs[:1])
+
+    return Handler
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenAI and SageMaker synthesis backends')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=200, help='Base response latency')
+    parser.add_argument('--jitter-ms', type=float, default=50, help='Random +/- latency')
+    parser.add_argument('--per-item-ms', type=float, default=20, help='Extra latency per additional input in a batch')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 429/503')
+    parser.add_argument('--capacity', type=int, default=0, help='Concurrent requests served at once (0 = unlimited)')
+    args = parser.parse_args()
+
+    state = StandinState(args.latency_ms, args.jitter_ms, args.per_item_ms, args.error_rate, args.capacity)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+    server.daemon_threads = True
+    print(f"LLM stand-in listening on http://{args.host}:{args.port} "
+          f"(latency {args.latency_ms}ms, error rate {args.error_rate}, capacity {args.capacity or 'unlimited'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,11 @@ exact rows from parquet files for deterministic metric computation.
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 import json
 try:
     import duckdb
@@ -17,6 +20,8 @@ try:
 except ImportError:
     DUCKDB_AVAILABLE = False
 
+from heatmap_tiles import HeatmapTileStore, TILE_KEYS, X_EDGES, Y_EDGES, GRID_SHAPE
+
 class ParquetRehydrator:
     """Rehydrates data from parquet files using structured selectors"""
     
@@ -24,6 +29,9 @@ class ParquetRehydrator:
         self.base_path = Path(base_path)
         self.processed_path = self.base_path / "data" / "processed"
         
+        # Precomputed heatmap tiles per season (see heatmap_tiles.py)
+        self._tile_stores: Dict[str, HeatmapTileStore] = {}
+        
         # Initialize DuckDB connection for advanced querying (optional)
         if DUCKDB_AVAILABLE:
             self.conn = duckdb.connect()
@@ -52,21 +60,13 @@ class ParquetRehydrator:
         if not file_path.exists():
             raise FileNotFoundError(f"Parquet file not found: {file_path}")
         
-        # Load data
+        # Load data (row_ids, partition and simple where filters applied in Arrow)
         print(f"Loading data from: {file_path}")
-        df = pd.read_parquet(file_path)
-        
-        # Apply row_ids filter first (most efficient)
-        if row_ids:
-            df = df[df['row_id'].isin(row_ids)]
+        df, remaining_where = self._load_frame(file_path, columns, row_ids, where_clause, partitions)
         
-        # Apply where clause filters
-        if where_clause:
-            df = self._apply_where_filters(df, where_clause)
-        
-        # Apply partition filters
-        if partitions:
-            df = self._apply_partition_filters(df, partitions)
+        # Apply where clause filters Arrow could not express
+        if remaining_where:
+            df = self._apply_where_filters(df, remaining_where)
         
         # Select specific columns
         if columns:
@@ -79,6 +79,114 @@ class ParquetRehydrator:
         print(f"Rehydrated {len(df)} rows with {len(df.columns)} columns")
         return df
 
+    def _load_frame(
+        self,
+        file_path: Path,
+        columns: Optional[List[str]] = None,
+        row_ids: Optional[List[Any]] = None,
+        where_clause: Optional[Dict[str, Any]] = None,
+        partitions: Optional[Dict[str, Any]] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Load a table, preferring the memory-mapped Arrow hot copy when current.
+        
+        Row filters and the column projection run on the Arrow table, so only
+        the selected rows and columns are converted to pandas.
+        
+        Returns:
+            (DataFrame, where conditions that still need the pandas filters)
+        """
+        arrow_file = file_path.with_suffix('.arrow')
+        
+        if arrow_file.exists() and arrow_file.stat().st_mtime >= file_path.stat().st_mtime:
+            with pa.memory_map(str(arrow_file), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+                expression, remaining_where, projection = self._arrow_plan(
+                    table.schema, columns, row_ids, where_clause, partitions
+                )
+                if expression is not None:
+                    table = table.filter(expression)
+                if projection is not None:
+                    table = table.select(projection)
+                return table.to_pandas(), remaining_where
+        
+        expression, remaining_where, projection = self._arrow_plan(
+            pq.read_schema(file_path), columns, row_ids, where_clause, partitions
+        )
+        return pq.read_table(file_path, columns=projection, filters=expression).to_pandas(), remaining_where
+
+    def _arrow_plan(
+        self,
+        schema: pa.Schema,
+        columns: Optional[List[str]],
+        row_ids: Optional[List[Any]],
+        where_clause: Optional[Dict[str, Any]],
+        partitions: Optional[Dict[str, Any]]
+    ) -> Tuple[Optional[pc.Expression], Dict[str, Any], Optional[List[str]]]:
+        """(filter expression, where conditions left for pandas, columns to read)"""
+        names = set(schema.names)
+        expression, remaining_where = self._arrow_filter(names, row_ids, where_clause or {}, partitions or {})
+        projection = None
+        if columns:
+            needed = [col for col in columns if col in names]
+            needed += [field for field in remaining_where if field in names]
+            projection = list(dict.fromkeys(needed))
+        return expression, remaining_where, projection
+
+    def _arrow_filter(
+        self,
+        names: set,
+        row_ids: Optional[List[Any]],
+        where_clause: Dict[str, Any],
+        partitions: Dict[str, Any]
+    ) -> Tuple[Optional[pc.Expression], Dict[str, Any]]:
+        """
+        Translate row_ids, partitions and where conditions into one Arrow
+        filter expression. Fields not in the table are ignored, like the
+        pandas filters do; operators Arrow cannot express are returned.
+        """
+        comparisons = {
+            '$eq': lambda field, value: field == value,
+            '$ne': lambda field, value: field != value,
+            '$gt': lambda field, value: field > value,
+            '$gte': lambda field, value: field >= value,
+            '$lt': lambda field, value: field < value,
+            '$lte': lambda field, value: field <= value,
+            '$in': lambda field, value: field.isin(list(value)),
+            '$nin': lambda field, value: ~field.isin(list(value)),
+        }
+        expressions = []
+        remaining: Dict[str, Any] = {}
+        
+        if row_ids and 'row_id' in names:
+            expressions.append(pc.field('row_id').isin(list(row_ids)))
+        
+        for key, value in partitions.items():
+            if key in names:
+                expressions.append(pc.field(key) == value)
+        
+        for field_name, condition in where_clause.items():
+            if field_name not in names:
+                continue
+            field = pc.field(field_name)
+            if not isinstance(condition, dict):
+                expressions.append(field == condition)
+                continue
+            for operator, value in condition.items():
+                if operator in comparisons:
+                    expressions.append(comparisons[operator](field, value))
+                elif operator == '$between':
+                    if len(value) != 2:
+                        raise ValueError(f"$between on {field_name} needs [low, high], got {value!r}")
+                    expressions.append((field >= value[0]) & (field <= value[1]))
+                else:
+                    remaining.setdefault(field_name, {})[operator] = value
+        
+        expression = None
+        for part in expressions:
+            expression = part if expression is None else expression & part
+        return expression, remaining
+
     def _resolve_file_path(self, table: str, partitions: Dict[str, Any]) -> Path:
         """Resolve the actual parquet file path from table and partitions"""
         
@@ -108,12 +216,13 @@ class ParquetRehydrator:
         else:
             raise ValueError(f"Unknown table: {table}")
 
-    def _apply_partition_filters(self, df: pd.DataFrame, partitions: Dict[str, Any]) -> pd.DataFrame:
-        """Apply partition-level filters"""
-        for key, value in partitions.items():
-            if key in df.columns:
-                df = df[df[key] == value]
-        return df
+    def _tile_store(self, season: str) -> HeatmapTileStore:
+        """Heatmap tile store for a PBP season (same season naming as the PBP files)"""
+        if season not in self._tile_stores:
+            self._tile_stores[season] = HeatmapTileStore(
+                self.processed_path / "fact" / "heatmap_tiles" / f"season={season}"
+            )
+        return self._tile_stores[season]
 
     def _apply_where_filters(self, df: pd.DataFrame, where_clause: Dict[str, Any]) -> pd.DataFrame:
         """Apply where clause filters using MongoDB-style operators"""
@@ -141,8 +250,9 @@ class ParquetRehydrator:
                     elif operator == '$lte':
                         df = df[df[field] <= value]
                     elif operator == '$between':
-                        if len(value) == 2:
-                            df = df[(df[field] >= value[0]) & (df[field] <= value[1])]
+                        if len(value) != 2:
+                            raise ValueError(f"$between on {field} needs [low, high], got {value!r}")
+                        df = df[(df[field] >= value[0]) & (df[field] <= value[1])]
                     elif operator == '$contains_all':
                         # For array fields
                         if hasattr(df[field].iloc[0], '__iter__'):
@@ -204,33 +314,88 @@ class ParquetRehydrator:
         return results
 
     def create_heatmap_data(self, row_selector: Dict[str, Any]) -> Dict[str, Any]:
-        """Create heatmap data from coordinate information"""
+        """
+        Create heatmap data (binned rink grid) for a PBP selector.
+        
+        Sums precomputed tiles when they exist for the season and the selector
+        only filters on tile dimensions; scans and bins the rehydrated rows on
+        the same grid when tiles are missing or cannot express the filters.
+        """
+        
+        tile_filters = self._selector_to_tile_filters(row_selector)
+        tile_store = self._tile_store(row_selector.get('partitions', {}).get('season', '2024-25'))
+        
+        if tile_filters is not None and tile_store.is_available():
+            heatmap = tile_store.aggregate(**tile_filters)
+            heatmap['source'] = 'heatmap_tiles'
+            return heatmap
         
         df = self.rehydrate_from_selector(row_selector)
         
         if df.empty or 'x_coord' not in df.columns or 'y_coord' not in df.columns:
             return {'error': 'No coordinate data available'}
         
-        # Filter out null coordinates
         coord_df = df.dropna(subset=['x_coord', 'y_coord'])
+        xg_weights = coord_df['xg'].fillna(0.0) if 'xg' in coord_df.columns else None
         
-        if coord_df.empty:
-            return {'error': 'No valid coordinates found'}
-        
-        heatmap_data = {
-            'coordinates': coord_df[['x_coord', 'y_coord']].values.tolist(),
-            'events': coord_df['event_type'].tolist() if 'event_type' in coord_df.columns else [],
-            'xg_values': coord_df['xg'].tolist() if 'xg' in coord_df.columns else [],
-            'count': len(coord_df),
-            'bounds': {
-                'x_min': float(coord_df['x_coord'].min()),
-                'x_max': float(coord_df['x_coord'].max()),
-                'y_min': float(coord_df['y_coord'].min()),
-                'y_max': float(coord_df['y_coord'].max())
-            }
+        counts, _, _ = np.histogram2d(coord_df['x_coord'], coord_df['y_coord'], bins=[X_EDGES, Y_EDGES])
+        if xg_weights is not None:
+            xg_grid, _, _ = np.histogram2d(
+                coord_df['x_coord'], coord_df['y_coord'], bins=[X_EDGES, Y_EDGES], weights=xg_weights
+            )
+        else:
+            xg_grid = np.zeros(GRID_SHAPE)
+        
+        return {
+            'grid': counts.astype(int).tolist(),
+            'xg_grid': np.round(xg_grid, 4).tolist(),
+            'count': int(counts.sum()),
+            'xg_total': float(xg_grid.sum()),
+            'x_edges': X_EDGES.tolist(),
+            'y_edges': Y_EDGES.tolist(),
+            'source': 'pbp_scan'
+        }
+
+    def _selector_to_tile_filters(self, row_selector: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Translate a PBP selector into tile store filters, or None if tiles cannot answer it"""
+        
+        if row_selector.get('table', 'pbp') != 'pbp' or row_selector.get('row_ids'):
+            return None
+        
+        argument_names = {
+            'player_id': 'player_ids',
+            'team_abbr': 'teams',
+            'strength': 'strengths',
+            'event_type': 'event_types',
+            'game_id': 'game_ids'
         }
+        filters: Dict[str, Any] = {}
+        
+        conditions = dict(row_selector.get('where', {}))
+        for key, value in row_selector.get('partitions', {}).items():
+            if key == 'season':
+                continue
+            conditions[key] = value
+        
+        for field, condition in conditions.items():
+            if field not in TILE_KEYS:
+                return None
+            
+            if not isinstance(condition, dict):
+                filters[argument_names[field]] = [condition]
+                continue
+            
+            for operator, value in condition.items():
+                if operator == '$eq':
+                    filters[argument_names[field]] = [value]
+                elif operator == '$in':
+                    filters[argument_names[field]] = list(value)
+                elif operator == '$between' and field == 'game_id' and len(value) == 2:
+                    filters['game_range'] = (int(value[0]), int(value[1]))
+                else:
+                    return None
         
-        return heatmap_data
+        return filters
 
     def validate_selector(self, row_selector: Dict[str, Any]) -> Dict[str, Any]:
         """Validate that a row_selector is properly formatted and executable"""
@@ -277,6 +442,9 @@ class ParquetRehydrator:
                 for operator in condition.keys():
                     if operator not in valid_operators:
                         validation_result['warnings'].append(f"Unknown operator: {operator}")
+                    elif operator == '$between' and len(condition[operator]) != 2:
+                        validation_result['errors'].append(f"$between on {field} needs [low, high]")
+                        validation_result['valid'] = False
         
         return validation_result
 
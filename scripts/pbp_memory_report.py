@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+PBP Memory Report
+
+Compares in-memory footprint and groupby latency of the unified PBP table
+(and optionally the analytics tables) before and after the compact schema
+contract in schema_contract.py.
+"""
+
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Any, List
+import time
+import sys
+
+sys.path.append(str(Path(__file__).parent))
+from schema_contract import apply_pbp_contract, compact_frame, memory_usage_mb, PBP_CATEGORICAL_COLUMNS
+
+
+def _as_plain_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Undo dictionary encoding so the 'before' numbers reflect plain string columns"""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('string')
+    return df
+
+
+def _time_groupbys(df: pd.DataFrame, repeats: int = 3) -> float:
+    """Best-of-N time (ms) for the groupbys the query paths run most often"""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        df.groupby(['team_abbr', 'event_type'], observed=True).size()
+        df.groupby(['player_id', 'strength'], observed=True)['xg'].sum()
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def report_pbp(pbp_file: Path) -> Dict[str, Any]:
+    """Before/after memory and groupby report for the unified PBP table"""
+    print(f"Loading PBP: {pbp_file}")
+    before_df = _as_plain_dtypes(pd.read_parquet(pbp_file))
+    after_df = apply_pbp_contract(before_df)
+
+    before = memory_usage_mb(before_df)
+    after = memory_usage_mb(after_df)
+
+    print(f"\n{'column':<22}{'before MB':>12}{'after MB':>12}  dtype")
+    for col in before_df.columns:
+        print(f"{col:<22}{before[col]:>12.2f}{after[col]:>12.2f}  {before_df[col].dtype} -> {after_df[col].dtype}")
+    print(f"{'TOTAL':<22}{before['total']:>12.2f}{after['total']:>12.2f}")
+
+    groupby_before = _time_groupbys(before_df)
+    groupby_after = _time_groupbys(after_df)
+
+    ratio = before['total'] / after['total'] if after['total'] else float('nan')
+    # Nested list columns (on_ice_ids) stay Python objects under the contract
+    flat_cols = [c for c in before_df.columns if before_df[c].dtype != object]
+    flat_before = sum(before[c] for c in flat_cols)
+    flat_after = sum(after[c] for c in flat_cols)
+    print(f"\nMemory reduction: {ratio:.1f}x overall, {flat_before / flat_after:.1f}x on flat columns")
+    print(f"Groupby latency: {groupby_before:.1f} ms -> {groupby_after:.1f} ms")
+
+    return {
+        'rows': len(before_df),
+        'before_mb': before['total'],
+        'after_mb': after['total'],
+        'reduction': ratio,
+        'flat_reduction': flat_before / flat_after,
+        'groupby_ms_before': groupby_before,
+        'groupby_ms_after': groupby_after,
+        'categorical_columns': [c for c in PBP_CATEGORICAL_COLUMNS if c in after_df.columns],
+    }
+
+
+def report_analytics(analytics_dir: Path, limit: int = 20) -> List[Dict[str, Any]]:
+    """Before/after memory for analytics parquet tables under a directory"""
+    results = []
+    files = sorted(analytics_dir.glob("**/*.parquet"))[:limit]
+
+    print(f"\n{'analytics table':<60}{'before MB':>12}{'after MB':>12}")
+    for parquet_file in files:
+        try:
+            df = _as_plain_dtypes(pd.read_parquet(parquet_file))
+        except Exception as e:
+            print(f"Skipping {parquet_file.name}: {e}")
+            continue
+        before = memory_usage_mb(df)['total']
+        after = memory_usage_mb(compact_frame(df))['total']
+        name = str(parquet_file.relative_to(analytics_dir))
+        print(f"{name[-58:]:<60}{before:>12.3f}{after:>12.3f}")
+        results.append({'file': name, 'before_mb': before, 'after_mb': after})
+
+    if results:
+        total_before = sum(r['before_mb'] for r in results)
+        total_after = sum(r['after_mb'] for r in results)
+        print(f"{'TOTAL':<60}{total_before:>12.3f}{total_after:>12.3f}")
+
+    return results
+
+
+def main():
+    """Main execution function"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Report PBP/analytics memory before and after the compact schema')
+    parser.add_argument('--base-path', default="/Users/xavier.bouchard/Desktop/HeartBeat")
+    parser.add_argument('--season', default="2024-25")
+    parser.add_argument('--analytics', action='store_true', help='Also report analytics tables')
+    parser.add_argument('--limit', type=int, default=20, help='Max analytics tables to report')
+
+    args = parser.parse_args()
+
+    processed_path = Path(args.base_path) / "data" / "processed"
+    pbp_file = processed_path / "fact" / "pbp" / f"unified_pbp_{args.season}.parquet"
+
+    if not pbp_file.exists():
+        print(f"PBP file not found: {pbp_file}")
+        return None
+
+    summary = report_pbp(pbp_file)
+
+    if args.analytics:
+        summary['analytics'] = report_analytics(processed_path / "analytics", args.limit)
+
+    return summary
+
+
+if __name__ == "__main__":
+    main()
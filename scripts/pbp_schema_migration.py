@@ -9,10 +9,13 @@ Upgrades unified PBP parquet to production-ready format with:
 - Event type categorization
 - Coordinate system normalization
 - Row-level selectors for rehydration
+- Compact dictionary-encoded/downcast dtypes (see schema_contract.py)
 """
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
 from pathlib import Path
 import time
 import json
@@ -20,6 +23,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 import re
 
+from schema_contract import apply_pbp_contract, memory_usage_mb
+
 class PBPSchemaMigrator:
     """Migrates PBP data to production schema with proper normalization"""
     
@@ -284,6 +289,13 @@ class PBPSchemaMigrator:
         # Update row_id to reflect new ordering
         df_new['row_id'] = np.arange(len(df_new), dtype='int64')
         
+        # Apply compact schema contract (categoricals become Arrow dictionaries)
+        print("Applying compact schema contract...")
+        before_mb = memory_usage_mb(df_new)['total']
+        df_new = apply_pbp_contract(df_new)
+        after_mb = memory_usage_mb(df_new)['total']
+        print(f"In-memory size: {before_mb:.1f} MB -> {after_mb:.1f} MB")
+        
         # Save migrated data
         print(f"Saving migrated parquet to: {output_file}")
         output_path = Path(output_file)
@@ -296,6 +308,9 @@ class PBPSchemaMigrator:
             index=False
         )
         
+        # Uncompressed Arrow IPC hot copy for memory-mapped loading
+        arrow_file = self.write_arrow_hot_copy(df_new, output_file)
+        
         # Print summary
         print("\n=== MIGRATION SUMMARY ===")
         print(f"Original rows: {len(df):,}")
@@ -305,9 +320,28 @@ class PBPSchemaMigrator:
         print(f"Unique games: {df_new['game_id'].nunique()}")
         print(f"Date range: {df_new['season'].iloc[0]}")
         print(f"File size: {Path(output_file).stat().st_size / (1024*1024):.2f} MB")
+        print(f"Arrow hot copy: {arrow_file} ({arrow_file.stat().st_size / (1024*1024):.2f} MB)")
         
         return df_new
 
+    def write_arrow_hot_copy(self, df: pd.DataFrame, parquet_file: str) -> Path:
+        """
+        Write an uncompressed Arrow IPC (Feather v2) copy next to the parquet file.
+        
+        Readers memory-map this file with pa.memory_map, so processes share the
+        OS page cache and skip zstd decompression on cold start.
+        """
+        arrow_file = Path(parquet_file).with_suffix('.arrow')
+        tmp_file = arrow_file.with_suffix('.arrow.tmp')
+        
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        feather.write_feather(table, str(tmp_file), compression='uncompressed')
+        
+        # Atomic swap so running readers never map a partially written file
+        tmp_file.replace(arrow_file)
+        
+        return arrow_file
+
     def _validate_migrated_data(self, df: pd.DataFrame):
         """Validate migrated data quality"""
         issues = []
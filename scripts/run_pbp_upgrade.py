@@ -21,6 +21,7 @@ from pbp_schema_migration import PBPSchemaMigrator
 from build_dimension_tables import DimensionTableBuilder  
 from production_chunk_generator import ProductionChunkGenerator
 from parquet_rehydrator import ParquetRehydrator
+from heatmap_tiles import HeatmapTileBuilder
 
 class PBPUpgradeOrchestrator:
     """Orchestrates the complete PBP upgrade process"""
@@ -39,6 +40,7 @@ class PBPUpgradeOrchestrator:
         
         results = {
             'migration': None,
+            'heatmap_tiles': None,
             'dimensions': None, 
             'chunks': None,
             'validation': None
@@ -64,6 +66,18 @@ class PBPUpgradeOrchestrator:
             else:
                 print("⏭️  STEP 1: Schema Migration (SKIPPED)\n")
             
+            # Step 1b: Heatmap tiles (incremental unless PBP was just re-migrated)
+            print("🔄 STEP 1b: Building Heatmap Tiles")
+            print("-" * 50)
+            tile_builder = HeatmapTileBuilder(str(self.base_path))
+            tile_summary = tile_builder.build_tiles(force=not skip_migration)
+            results['heatmap_tiles'] = {
+                'status': 'completed',
+                'games': len(tile_summary['processed_games']),
+                'tiles': tile_summary['tiles_written']
+            }
+            print("✅ Heatmap tiles built\n")
+            
             # Step 2: Build Dimension Tables  
             print("🔄 STEP 2: Building Dimension Tables")
             print("-" * 50)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Schema Contract
+
+Compact storage/in-memory dtypes shared by the PBP migration and the
+analytics parquet writers:
+- Low-cardinality string columns stored dictionary-encoded (pandas category)
+- Numeric columns downcast to the narrowest dtype that holds their range
+- Generic compaction for analytics tables with unknown column sets
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+# Dictionary-encoded PBP columns (tens to a few hundred distinct values each)
+PBP_CATEGORICAL_COLUMNS = [
+    'season',
+    'event_type',
+    'team_abbr',
+    'strength',
+    'zone',
+    'shot_result',
+    'possession_team',
+    'source_file',
+    'version',
+    'player_id',
+    'periodTime',
+]
+
+# Target numeric dtypes for PBP columns
+PBP_NUMERIC_DTYPES = {
+    'game_id': 'int32',
+    'row_id': 'int32',
+    'period': 'int8',
+    'period_seconds': 'int16',
+    'gameTime': 'int16',
+    'score_differential': 'int8',
+    'x_coord': 'float32',
+    'y_coord': 'float32',
+    'xg': 'float32',
+}
+
+
+def _fits(series: pd.Series, dtype: str) -> bool:
+    """Check that a numeric series fits in the target dtype without loss"""
+    target = np.dtype(dtype)
+    if target.kind == 'f':
+        return True
+    if series.isna().any():
+        return False
+    if len(series) == 0:
+        return True
+    info = np.iinfo(target)
+    return info.min <= series.min() and series.max() <= info.max
+
+
+def apply_pbp_contract(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cast a unified PBP frame to the compact schema contract.
+
+    Columns that are absent are skipped; integer downcasts are only applied
+    when every value fits, so the contract never truncates data.
+    """
+    df = df.copy()
+
+    for col in PBP_CATEGORICAL_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col, dtype in PBP_NUMERIC_DTYPES.items():
+        if col in df.columns and df[col].dtype != dtype and _fits(df[col], dtype):
+            df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    max_unique_ratio: float = 0.5,
+    downcast_floats: bool = False,
+    exclude: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Compact an arbitrary analytics table.
+
+    Args:
+        df: Frame to compact
+        max_unique_ratio: String columns with distinct/rows at or below this
+            ratio become categories
+        downcast_floats: Downcast float64 columns to float32 (off by default;
+            float32 values serialize with noisy trailing digits)
+        exclude: Columns to leave untouched
+
+    Returns:
+        Compacted copy of the frame
+    """
+    df = df.copy()
+    excluded = set(exclude or [])
+    n_rows = len(df)
+
+    for col in df.columns:
+        if col in excluded:
+            continue
+        series = df[col]
+
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        elif pd.api.types.is_integer_dtype(series) and not series.isna().any():
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(series) and downcast_floats:
+            df[col] = pd.to_numeric(series, downcast='float')
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            if n_rows == 0:
+                continue
+            # Skip columns holding lists/dicts; they cannot be categories
+            sample = series.dropna().head(100)
+            if not all(isinstance(value, str) for value in sample):
+                continue
+            if series.nunique(dropna=True) / n_rows <= max_unique_ratio:
+                df[col] = series.astype('category')
+
+    return df
+
+
+def memory_usage_mb(df: pd.DataFrame) -> Dict[str, float]:
+    """Deep per-column memory usage in MB, plus a 'total' entry"""
+    usage = df.memory_usage(deep=True, index=False)
+    report = {col: usage[col] / (1024 * 1024) for col in df.columns}
+    report['total'] = float(usage.sum()) / (1024 * 1024)
+    return report
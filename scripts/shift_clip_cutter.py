@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+HeartBeat Engine - Shift Clip Cutter
+Montreal Canadiens Advanced Analytics Assistant
+
+Slices per-player shift clips out of a full-game video using the unified
+PBP table:
+- Shift windows come from contiguous runs of a player's team events whose
+  on_ice_ids include the player (padded, and merged across short gaps)
+- Game clock maps to video time through a per-period offset map
+  (video second at which each period's clock reads 0:00)
+- Clips are cut with input seeking and stream copy (-c copy, no re-encode),
+  so cuts start on the keyframe at or before the window; ffmpeg jobs run
+  in a process pool
+- Output lands in the clips tree and is registered in the clip catalog
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PBP_COLUMNS = ['game_id', 'row_id', 'period', 'period_seconds', 'team_abbr', 'on_ice_ids']
+
+
+def player_slug(full_name: str) -> str:
+    """Directory name for a player (accents folded, lower snake case)"""
+    folded = unicodedata.normalize('NFKD', full_name).encode('ascii', 'ignore').decode('ascii')
+    return '_'.join(folded.lower().replace('.', '').replace("'", '').split())
+
+
+def parse_period_offsets(value: str) -> Dict[int, float]:
+    """Parse '1=312.5,2=4020,3=7410' or a JSON file {"1": 312.5, ...}"""
+    if value.endswith('.json'):
+        with open(value) as f:
+            raw = json.load(f)
+        return {int(period): float(offset) for period, offset in raw.items()}
+
+    offsets = {}
+    for item in value.split(','):
+        period, _, offset = item.partition('=')
+        offsets[int(period)] = float(offset)
+    return offsets
+
+
+def _cut_clip(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Cut one clip with stream copy (runs in a worker process)"""
+    output_path = Path(job['output_path'])
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Non-video suffix keeps a concurrent catalog sync from picking up partial files
+    temp_path = output_path.with_name(output_path.name + '.part')
+
+    cmd = [
+        'ffmpeg',
+        '-nostdin',
+        '-loglevel', 'error',
+        '-ss', f"{job['start']:.3f}",
+        '-i', job['video_path'],
+        '-t', f"{job['duration']:.3f}",
+        '-map', '0:v:0',
+        '-map', '0:a?',
+        '-c', 'copy',
+        '-avoid_negative_ts', 'make_zero',
+        '-movflags', '+faststart',
+        '-f', 'mp4',
+        '-y',
+        str(temp_path)
+    ]
+
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=job.get('timeout', 120))
+        if result.returncode != 0 or not temp_path.exists():
+            return {'output_path': str(output_path), 'success': False, 'error': result.stderr.strip()[-500:]}
+        os.replace(temp_path, output_path)
+        return {
+            'output_path': str(output_path),
+            'success': True,
+            'bytes': output_path.stat().st_size,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+    except (subprocess.TimeoutExpired, OSError) as e:
+        return {'output_path': str(output_path), 'success': False, 'error': str(e)}
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class ShiftClipCutter:
+    """Computes shift windows from PBP and cuts them out of a game video"""
+
+    def __init__(
+        self,
+        base_path: str,
+        clips_path: Optional[str] = None,
+        team: str = 'MTL',
+        pre_roll: float = 2.0,
+        post_roll: float = 3.0,
+        merge_gap: float = 4.0,
+        min_shift: float = 5.0,
+        max_event_gap: float = 30.0,
+        workers: int = 4
+    ):
+        self.base_path = Path(base_path)
+        self.processed_path = self.base_path / "data" / "processed"
+        self.clips_path = Path(clips_path) if clips_path else self.base_path / "data" / "clips"
+        self.team = team
+        self.pre_roll = pre_roll
+        self.post_roll = post_roll
+        self.merge_gap = merge_gap
+        self.min_shift = min_shift
+        self.max_event_gap = max_event_gap
+        self.workers = workers
+
+    # PBP
+
+    def load_game_events(self, game_id: int, pbp_season: str) -> pd.DataFrame:
+        """Team events for one game, in game order"""
+        pbp_file = self.processed_path / "fact" / "pbp" / f"unified_pbp_{pbp_season}.parquet"
+        table = pq.read_table(pbp_file, columns=PBP_COLUMNS, filters=[('game_id', '=', game_id)])
+        events = table.to_pandas()
+        events = events[events['team_abbr'] == self.team]
+        return events.sort_values(['period', 'period_seconds', 'row_id']).reset_index(drop=True)
+
+    def resolve_players(self, events: pd.DataFrame, names: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Map player_id -> full name.
+
+        With no names, every skater who appears on ice for the team in
+        the game is included (goalies play the whole game, so they are
+        only cut when named).
+        """
+        players = pd.read_parquet(self.processed_path / "dim" / "players.parquet",
+                                  columns=['player_id', 'full_name', 'position'])
+        id_to_name = dict(zip(players['player_id'], players['full_name']))
+        goalies = set(players.loc[players['position'] == 'G', 'player_id'])
+
+        on_ice = set()
+        for ids in events['on_ice_ids']:
+            on_ice.update(ids)
+
+        if not names:
+            return {pid: id_to_name.get(pid, pid) for pid in sorted(on_ice - goalies)}
+
+        wanted = {player_slug(name) for name in names}
+        selected = {pid: name for pid, name in id_to_name.items() if player_slug(name) in wanted and pid in on_ice}
+        missing = wanted - {player_slug(name) for name in selected.values()}
+        if missing:
+            logger.warning(f"Players not on ice for {self.team} in this game: {sorted(missing)}")
+        return selected
+
+    def compute_shifts(self, events: pd.DataFrame, player_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Shift windows per player: runs of consecutive team events with the
+        player on ice, split at period boundaries and at event gaps longer
+        than max_event_gap (the player may have changed in between), merged
+        across gaps of at most merge_gap seconds and padded by
+        pre_roll/post_roll.
+        """
+        exploded = events[['period', 'period_seconds', 'on_ice_ids']].explode('on_ice_ids')
+        exploded = exploded[exploded['on_ice_ids'].isin(player_ids)]
+
+        shifts: Dict[str, List[Dict[str, Any]]] = {}
+        for player_id, rows in exploded.groupby('on_ice_ids', sort=False):
+            seq = rows.index.to_numpy()
+            periods = rows['period'].to_numpy()
+            seconds = rows['period_seconds'].to_numpy()
+
+            # A run breaks where the player misses an event, the period changes
+            # or the team has no event for longer than max_event_gap
+            breaks = np.flatnonzero(
+                (np.diff(seq) != 1) | (np.diff(periods) != 0) | (np.diff(seconds) > self.max_event_gap)
+            ) + 1
+            starts = np.concatenate(([0], breaks))
+            ends = np.concatenate((breaks - 1, [len(seq) - 1]))
+
+            windows: List[Dict[str, Any]] = []
+            for first, last in zip(starts, ends):
+                period = int(periods[first])
+                start = float(seconds[first])
+                end = float(seconds[last])
+                if windows and windows[-1]['period'] == period and start - windows[-1]['end'] <= self.merge_gap:
+                    windows[-1]['end'] = end
+                    continue
+                windows.append({'period': period, 'start': start, 'end': end})
+
+            shifts[player_id] = [
+                {
+                    'period': w['period'],
+                    'start': max(0.0, w['start'] - self.pre_roll),
+                    'end': w['end'] + self.post_roll
+                }
+                for w in windows
+                if w['end'] - w['start'] >= self.min_shift
+            ]
+
+        return shifts
+
+    # Cutting
+
+    def plan_cuts(
+        self,
+        shifts: Dict[str, List[Dict[str, Any]]],
+        player_names: Dict[str, str],
+        video_path: str,
+        period_offsets: Dict[int, float],
+        game_id: int,
+        season: str,
+        opponent: str,
+        game_date: str,
+        force: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Turn shift windows into ffmpeg jobs (existing clips are skipped unless forced)"""
+        jobs = []
+        game_dir = f"vs_{opponent.lower()}_{game_date}" if game_date else f"vs_{opponent.lower()}"
+
+        for player_id, windows in shifts.items():
+            slug = player_slug(player_names.get(player_id, player_id))
+            out_dir = self.clips_path / season / "players" / slug / "shifts" / game_dir
+            for number, window in enumerate(windows, 1):
+                offset = period_offsets.get(window['period'])
+                if offset is None:
+                    continue
+                mmss = f"{int(window['start']) // 60:02d}{int(window['start']) % 60:02d}"
+                output_path = out_dir / f"{game_id}_p{window['period']}_s{number:02d}_{mmss}.mp4"
+                if output_path.exists() and not force:
+                    continue
+                jobs.append({
+                    'video_path': video_path,
+                    'output_path': str(output_path),
+                    'start': offset + window['start'],
+                    'duration': window['end'] - window['start'],
+                })
+
+        return jobs
+
+    def cut_clips(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run ffmpeg stream-copy jobs in a process pool"""
+        if not jobs:
+            return []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(_cut_clip, jobs))
+
+    def register(self, season: str, probe: bool = True) -> Dict[str, Any]:
+        """Sync new clips into the clip catalog (and probe their media)"""
+        from orchestrator.models.clip_models import get_clip_index_manager
+
+        clip_index = get_clip_index_manager(str(self.clips_path))
+        stats: Dict[str, Any] = {'sync': clip_index.sync_catalog(season)}
+        if probe:
+            import asyncio
+            stats['probe'] = asyncio.run(clip_index.probe_pending(season))
+        return stats
+
+    def run(
+        self,
+        video_path: str,
+        game_id: int,
+        period_offsets: Dict[int, float],
+        opponent: str,
+        game_date: str = "",
+        players: Optional[List[str]] = None,
+        pbp_season: str = "2024-25",
+        season: str = "2024-2025",
+        force: bool = False,
+        register: bool = True
+    ) -> Dict[str, Any]:
+        """Compute, cut and register shift clips for one game"""
+        started = time.perf_counter()
+
+        events = self.load_game_events(game_id, pbp_season)
+        if events.empty:
+            print(f"No {self.team} events for game {game_id}")
+            return {'error': f"No {self.team} events for game {game_id}"}
+
+        player_names = self.resolve_players(events, players)
+        shifts = self.compute_shifts(events, list(player_names))
+        jobs = self.plan_cuts(shifts, player_names, video_path, period_offsets,
+                              game_id, season, opponent, game_date, force)
+        planned = time.perf_counter()
+
+        results = self.cut_clips(jobs)
+        cut = time.perf_counter()
+
+        succeeded = [r for r in results if r['success']]
+        failed = [r for r in results if not r['success']]
+        for failure in failed[:5]:
+            print(f"  Failed: {failure['output_path']}: {failure['error']}")
+
+        total_shifts = sum(len(windows) for windows in shifts.values())
+        print(f"Game {game_id}: {len(player_names)} players, {total_shifts} shifts, "
+              f"{len(jobs)} to cut ({total_shifts - len(jobs)} existing/unmapped)")
+        print(f"Cut {len(succeeded)} clips ({len(failed)} failed), "
+              f"{sum(r['bytes'] for r in succeeded) / (1024 * 1024):.1f} MB in {cut - planned:.1f}s "
+              f"(planning {planned - started:.2f}s)")
+
+        summary: Dict[str, Any] = {
+            'players': len(player_names),
+            'shifts': total_shifts,
+            'cut': len(succeeded),
+            'failed': len(failed),
+            'seconds': round(cut - started, 2),
+        }
+        if register and succeeded:
+            summary['catalog'] = self.register(season)
+            print(f"Catalog: {summary['catalog']['sync']['upserted']} clips registered")
+
+        return summary
+
+
+def main():
+    """Main execution function"""
+    import argparse
+    parser = argparse.ArgumentParser(description='Cut per-player shift clips from a full-game video using PBP on-ice data')
+    parser.add_argument('video', help='Full-game video file')
+    parser.add_argument('--game-id', type=int, required=True)
+    parser.add_argument('--period-offsets', required=True,
+                        help="Video second where each period starts: '1=312.5,2=4020,3=7410' or a JSON file")
+    parser.add_argument('--opponent', required=True, help='Opponent abbreviation (e.g. TOR)')
+    parser.add_argument('--game-date', default="", help='YYYY-MM-DD')
+    parser.add_argument('--players', default="", help='Comma-separated player names (default: every player on ice)')
+    parser.add_argument('--team', default="MTL")
+    parser.add_argument('--base-path', default="/Users/xavier.bouchard/Desktop/HeartBeat")
+    parser.add_argument('--clips-path', default=None, help='Clips root (default: <base-path>/data/clips)')
+    parser.add_argument('--pbp-season', default="2024-25")
+    parser.add_argument('--season', default="2024-2025")
+    parser.add_argument('--pre-roll', type=float, default=2.0)
+    parser.add_argument('--post-roll', type=float, default=3.0)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--force', action='store_true', help='Re-cut clips that already exist')
+    parser.add_argument('--no-register', action='store_true', help='Do not sync the clip catalog')
+
+    args = parser.parse_args()
+
+    cutter = ShiftClipCutter(
+        base_path=args.base_path,
+        clips_path=args.clips_path,
+        team=args.team,
+        pre_roll=args.pre_roll,
+        post_roll=args.post_roll,
+        workers=args.workers
+    )
+
+    return cutter.run(
+        video_path=args.video,
+        game_id=args.game_id,
+        period_offsets=parse_period_offsets(args.period_offsets),
+        opponent=args.opponent,
+        game_date=args.game_date,
+        players=[name.strip() for name in args.players.split(',') if name.strip()],
+        pbp_season=args.pbp_season,
+        season=args.season,
+        force=args.force,
+        register=not args.no_register
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+HeartBeat Engine - Semantic Cache Test
+Montreal Canadiens Advanced Analytics Assistant
+
+Regression check for the semantic response cache: questions that differ
+only in the side of a stat (scored vs allowed, for vs against, offensive
+vs defensive zone) or in the order of compared players must never share
+an answer, while plain paraphrases still do. Needs the player/team dimension tables for entity recognition.
+"""
+
+from orchestrator.config.settings import UserRole
+from orchestrator.utils.semantic_cache import SemanticCache
+from orchestrator.utils.state import QueryType, UserContext
+
+# (cached question, follow-up question, query type, follow-up may reuse the answer)
+CASES = [
+    ("How many goals did the Habs score in the third period of the last game vs Toronto?",
+     "How many goals did the Habs allow in the third period of the last game vs Toronto?",
+     QueryType.GAME_ANALYSIS, False),
+    ("Goals scored by the Habs in the third period of our last game against Toronto",
+     "Goals allowed by the Habs in the third period of our last game against Toronto",
+     QueryType.GAME_ANALYSIS, False),
+    ("Habs shots for in the last game vs Toronto",
+     "Habs shots against in the last game vs Toronto",
+     QueryType.GAME_ANALYSIS, False),
+    ("Habs offensive zone faceoff wins this season",
+     "Habs defensive zone faceoff wins this season",
+     QueryType.TEAM_PERFORMANCE, False),
+    ("Habs goals at home this season",
+     "Habs goals on the road this season",
+     QueryType.TEAM_PERFORMANCE, False),
+    ("Habs 5v5 shots this season",
+     "Habs shorthanded shots this season",
+     QueryType.TEAM_PERFORMANCE, False),
+    ("Is Suzuki better than Caufield?",
+     "Is Caufield better than Suzuki?",
+     QueryType.MATCHUP_COMPARISON, False),
+    ("Suzuki stats this season",
+     "how is Nick Suzuki doing this year",
+     QueryType.PLAYER_ANALYSIS, True),
+    ("Show me Caufield highlights vs Boston",
+     "show me caufield clips against the bruins",
+     QueryType.CLIP_RETRIEVAL, True),
+]
+
+
+def test_semantic_cache():
+    """Store each first question, then look up its follow-up"""
+
+    print("=== HeartBeat Engine - Semantic Cache Test ===\n")
+
+    user = UserContext(user_id="test_coach_001", role=UserRole.COACH, team_access=["MTL"])
+    failures = 0
+
+    for cached, follow_up, query_type, should_hit in CASES:
+        cache = SemanticCache(data_version=lambda: "test")
+        if cache.signature(cached) is None:
+            print("Entity tables not available - skipping semantic cache test")
+            return False
+
+        # Different sides of a stat must differ in the guard, not just in wording
+        same_guard = cache.signature(cached).guard == cache.signature(follow_up).guard
+        cache.store(cached, user, query_type, {"final_response": cached})
+        _, status, similarity = cache.lookup(follow_up, user, query_type)
+        passed = (status == "hit") == should_hit and same_guard == should_hit
+        failures += not passed
+
+        print(f"{'PASS' if passed else 'FAIL'} [{status} {similarity:.2f}] expected {'hit' if should_hit else 'no hit'}")
+        print(f"  cached:    {cached}")
+        print(f"  follow-up: {follow_up}")
+        if not passed:
+            print(f"  guards:    {sorted(cache.signature(cached).guard)}")
+            print(f"             {sorted(cache.signature(follow_up).guard)}")
+
+    print(f"\n{len(CASES) - failures}/{len(CASES)} cases passed")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if test_semantic_cache() else 1)